@@ -0,0 +1,98 @@
+"""Stream TAR and ZIP archives of files without temporary files."""
+import io
+import tarfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+# Bytes read from a source file at a time
+READ_SIZE = 256 * 1024
+TAR_BLOCK = 512
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream that hands written bytes back to a generator."""
+    
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[bytes] = []
+        self.position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def _read_chunks(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+def iter_tar(files: Iterable[Tuple[Path, str]]) -> Iterator[bytes]:
+    """Yield a ustar/pax archive of (path, name in archive) pairs.
+    
+    Files that disappear before they are reached are skipped.
+    """
+    for path, name in files:
+        try:
+            stat_result = path.stat()
+        except OSError:
+            continue
+        info = tarfile.TarInfo(name)
+        info.size = stat_result.st_size
+        info.mtime = int(stat_result.st_mtime)
+        info.mode = 0o644
+        yield info.tobuf(format=tarfile.PAX_FORMAT)
+        
+        # The header promised size bytes: pad or cut if the file changed
+        written = 0
+        try:
+            for chunk in _read_chunks(path):
+                chunk = chunk[:info.size - written]
+                written += len(chunk)
+                yield chunk
+                if written == info.size:
+                    break
+        except OSError:
+            pass
+        if written < info.size:
+            yield bytes(info.size - written)
+        if info.size % TAR_BLOCK:
+            yield bytes(TAR_BLOCK - info.size % TAR_BLOCK)
+    yield bytes(2 * TAR_BLOCK)
+
+def iter_zip(files: Iterable[Tuple[Path, str]]) -> Iterator[bytes]:
+    """Yield a ZIP archive (stored, not compressed) of (path, name in archive) pairs.
+    
+    Entries are written with data descriptors, so sizes and CRCs are
+    computed while streaming. Files that disappear are skipped.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for path, name in files:
+            try:
+                stat_result = path.stat()
+                chunks = _read_chunks(path)
+                info = zipfile.ZipInfo(name, datetime.fromtimestamp(stat_result.st_mtime).timetuple()[:6])
+                with archive.open(info, "w", force_zip64=stat_result.st_size >= zipfile.ZIP64_LIMIT) as entry:
+                    for chunk in chunks:
+                        entry.write(chunk)
+                        yield sink.take()
+            except OSError:
+                continue
+            yield sink.take()
+    yield sink.take()
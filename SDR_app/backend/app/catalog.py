@@ -0,0 +1,353 @@
+"""SQLite catalog of finalized recordings."""
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+from backend.app.config import CATALOG_PATH, RECORDINGS_DIR
+from backend.app.models import Recording, ModulationType
+from backend.app.scanner.ogg import opus_duration
+
+logger = logging.getLogger("scanner")
+
+# Fixed-width timestamps so text order matches time order
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Opus bitrate assumed when a file's duration cannot be read from it
+ESTIMATE_BYTES_PER_SECOND = 8000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    id TEXT PRIMARY KEY,
+    freq_mhz REAL NOT NULL,
+    mode TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    duration_seconds REAL NOT NULL,
+    file_size_bytes INTEGER NOT NULL,
+    file_path TEXT NOT NULL,
+    label TEXT,
+    ctcss_tone REAL,
+    dcs_code INTEGER,
+    signal_strength_db REAL
+);
+CREATE INDEX IF NOT EXISTS idx_recordings_start ON recordings (start_time, id);
+CREATE INDEX IF NOT EXISTS idx_recordings_freq ON recordings (freq_mhz, start_time);
+CREATE INDEX IF NOT EXISTS idx_recordings_label ON recordings (label, start_time);
+CREATE TABLE IF NOT EXISTS peaks (
+    id TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COLUMNS = ("id", "freq_mhz", "mode", "start_time", "end_time", "duration_seconds",
+           "file_size_bytes", "file_path", "label", "ctcss_tone", "dcs_code", "signal_strength_db")
+
+def parse_recording_filename(filename: str) -> Optional[dict]:
+    """Parse recording filename to extract metadata.
+    
+    Format: YYYYMMDD_HHMMSS_FREQ_LABEL.ogg, where FREQ is written with an
+    underscore for the decimal point (e.g. 462_5625).
+    """
+    try:
+        stem = filename[:-len(".ogg")] if filename.endswith(".ogg") else filename
+        parts = stem.split("_")
+        
+        if len(parts) >= 3:
+            timestamp = datetime.strptime(parts[0] + parts[1], "%Y%m%d%H%M%S")
+            
+            freq_str = parts[2]
+            label_parts = parts[3:]
+            if label_parts and label_parts[0].isdigit():
+                freq_str += "." + label_parts.pop(0)
+            freq_mhz = float(freq_str)
+            
+            label = "_".join(label_parts) if label_parts else "unknown"
+            
+            return {
+                "timestamp": timestamp,
+                "freq_mhz": freq_mhz,
+                "label": label
+            }
+    except Exception as e:
+        logger.warning(f"Failed to parse filename {filename}: {e}")
+    
+    return None
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime(TIME_FORMAT) if value else None
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, TIME_FORMAT) if value else None
+
+class RecordingCatalog:
+    """Recording metadata in a WAL-mode SQLite database.
+    
+    One connection is shared by the API (event loop) and the recorder
+    threads; a lock serializes access. Every query used by the API is
+    covered by an index, so none of them touch the recordings directory.
+    """
+    
+    def __init__(self, db_path: Path = CATALOG_PATH):
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Bumped on every write; with the per-process epoch it versions query results
+        self.epoch = os.urandom(4).hex()
+        self.generation = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                # Refresh planner statistics so filtered queries pick good indexes
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+                self._conn = None
+    
+    def _row_to_recording(self, row: sqlite3.Row) -> Recording:
+        return Recording(
+            id=row["id"],
+            freq_mhz=row["freq_mhz"],
+            mode=row["mode"],
+            start_time=_parse_time(row["start_time"]),
+            end_time=_parse_time(row["end_time"]),
+            duration_seconds=row["duration_seconds"],
+            file_size_bytes=row["file_size_bytes"],
+            file_path=row["file_path"],
+            ctcss_tone=row["ctcss_tone"],
+            dcs_code=row["dcs_code"],
+            label=row["label"],
+            signal_strength_db=row["signal_strength_db"]
+        )
+    
+    def _recording_values(self, recording: Recording) -> tuple:
+        mode = recording.mode.value if isinstance(recording.mode, ModulationType) else recording.mode
+        return (recording.id, recording.freq_mhz, mode, _format_time(recording.start_time),
+                _format_time(recording.end_time), recording.duration_seconds,
+                recording.file_size_bytes, recording.file_path, recording.label,
+                recording.ctcss_tone, recording.dcs_code, recording.signal_strength_db)
+    
+    def add(self, recording: Recording, peaks: Optional[bytes] = None):
+        """Insert or replace a recording, with its waveform peaks if given."""
+        self.add_many([recording])
+        if peaks:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO peaks (id, data) VALUES (?, ?)",
+                                 (recording.id, peaks))
+    
+    def add_many(self, recordings: List[Recording]):
+        """Insert or replace several recordings in one transaction."""
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO recordings ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                    [self._recording_values(r) for r in recordings]
+                )
+            self.generation += 1
+    
+    def get(self, recording_id: str) -> Optional[Recording]:
+        """Look up one recording by ID."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT * FROM recordings WHERE id = ?", (recording_id,)
+            ).fetchone()
+        return self._row_to_recording(row) if row else None
+    
+    def get_peaks(self, recording_id: str) -> Optional[bytes]:
+        """Waveform peaks of a recording (see scanner.peaks), if stored."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT data FROM peaks WHERE id = ?", (recording_id,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def list(self, limit: Optional[int] = None, offset: int = 0) -> List[Recording]:
+        """List recordings, newest first."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT * FROM recordings ORDER BY start_time DESC, id DESC LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset)
+            ).fetchall()
+        return [self._row_to_recording(row) for row in rows]
+    
+    def query(self, freq_min: Optional[float] = None, freq_max: Optional[float] = None,
+              label: Optional[str] = None, mode: Optional[str] = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None,
+              min_duration: Optional[float] = None, after: Optional[Tuple[datetime, str]] = None,
+              descending: bool = True, limit: int = 100) -> List[Recording]:
+        """Filtered page of recordings ordered by (start_time, id).
+        
+        after is the (start_time, id) of the last row of the previous page;
+        seeking past it through the index keeps every page equally cheap,
+        however deep into the archive it is.
+        """
+        clauses = []
+        params: list = []
+        if freq_min is not None:
+            clauses.append("freq_mhz >= ?")
+            params.append(freq_min)
+        if freq_max is not None:
+            clauses.append("freq_mhz <= ?")
+            params.append(freq_max)
+        if label is not None:
+            clauses.append("label = ?")
+            params.append(label)
+        if mode is not None:
+            clauses.append("mode = ?")
+            params.append(mode)
+        if since is not None:
+            clauses.append("start_time >= ?")
+            params.append(_format_time(since))
+        if until is not None:
+            clauses.append("start_time < ?")
+            params.append(_format_time(until))
+        if min_duration is not None:
+            clauses.append("duration_seconds >= ?")
+            params.append(min_duration)
+        if after is not None:
+            clauses.append(f"(start_time, id) {'<' if descending else '>'} (?, ?)")
+            params.extend((_format_time(after[0]), after[1]))
+        
+        direction = "DESC" if descending else "ASC"
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT * FROM recordings {where} ORDER BY start_time {direction}, id {direction} LIMIT ?"
+        params.append(limit)
+        
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [self._row_to_recording(row) for row in rows]
+    
+    def count(self) -> int:
+        """Number of recordings."""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
+    
+    def delete(self, recording_id: str) -> bool:
+        """Remove a recording; returns False if it was not catalogued."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute("DELETE FROM recordings WHERE id = ?", (recording_id,))
+                conn.execute("DELETE FROM peaks WHERE id = ?", (recording_id,))
+            self.generation += 1
+        return cursor.rowcount > 0
+    
+    def delete_many(self, recording_ids: List[str]) -> int:
+        """Remove several recordings in one transaction; returns how many existed."""
+        if not recording_ids:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.executemany("DELETE FROM recordings WHERE id = ?",
+                                          [(recording_id,) for recording_id in recording_ids])
+                deleted = cursor.rowcount
+                conn.executemany("DELETE FROM peaks WHERE id = ?",
+                                 [(recording_id,) for recording_id in recording_ids])
+            self.generation += 1
+        return deleted
+    
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_meta(self, key: str, value: str):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+    
+    def import_directory(self, directory: Path = RECORDINGS_DIR, force: bool = False) -> int:
+        """Catalog session files recorded before the catalog existed.
+        
+        Runs once per database unless force is set. Chunk files of
+        unfinished sessions are skipped. Returns the number imported.
+        """
+        if not force and self._get_meta("imported_at"):
+            return 0
+        
+        file_paths = []
+        directory = Path(directory)
+        if directory.exists():
+            file_paths = [p for p in directory.glob("*.ogg") if "_part" not in p.stem]
+        imported = self.import_files(file_paths)
+        
+        self._set_meta("imported_at", _format_time(datetime.utcnow()))
+        logger.info(f"Imported {imported} existing recordings into catalog")
+        return imported
+    
+    def import_files(self, file_paths: List[Path]) -> int:
+        """Catalog session files from their names and Ogg headers.
+        
+        Durations come from the last page of each file (a read at each end).
+        Rows that already exist are kept. Returns the number of files read.
+        """
+        recordings = []
+        for file_path in file_paths:
+            file_path = Path(file_path)
+            metadata = parse_recording_filename(file_path.name)
+            if not metadata:
+                continue
+            try:
+                size = file_path.stat().st_size
+            except OSError:
+                continue
+            
+            duration = opus_duration(file_path)
+            end_time = None
+            if duration is None:
+                duration = size / ESTIMATE_BYTES_PER_SECOND
+            else:
+                end_time = metadata["timestamp"] + timedelta(seconds=duration)
+            # The mode is not kept in the file name
+            recordings.append(Recording(
+                id=file_path.stem,
+                freq_mhz=metadata["freq_mhz"],
+                mode=ModulationType.NFM,
+                start_time=metadata["timestamp"],
+                end_time=end_time,
+                duration_seconds=duration,
+                file_size_bytes=size,
+                file_path=file_path.name,
+                label=metadata["label"]
+            ))
+        
+        if recordings:
+            with self._lock:
+                conn = self._connect()
+                placeholders = ", ".join("?" for _ in COLUMNS)
+                with conn:
+                    # Keep metadata already recorded by the scanner
+                    conn.executemany(
+                        f"INSERT OR IGNORE INTO recordings ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                        [self._recording_values(r) for r in recordings]
+                    )
+                self.generation += 1
+        return len(recordings)
+
+# Global catalog instance
+recording_catalog = RecordingCatalog()
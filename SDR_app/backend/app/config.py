@@ -2,12 +2,14 @@
 import os
 from pathlib import Path
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 # Base paths
 BASE_DIR = Path("/home/pi/SDR_app")
 LOGS_DIR = BASE_DIR / "logs"
 RECORDINGS_DIR = BASE_DIR / "recordings"
+CATALOG_PATH = BASE_DIR / "recordings.db"  # SQLite recording catalog
+OCCUPANCY_DIR = BASE_DIR / "occupancy"  # Memory-mapped occupancy history
 STATIC_DIR = BASE_DIR / "backend" / "static"
 
 # Ensure directories exist
@@ -20,26 +22,83 @@ class ResourceThresholds(BaseModel):
     io_wait_percent_max: float = 10.0  # IO wait > 10% triggers throttle
     swap_growth_mb_max: float = 50.0  # Swap increase > 50MB triggers throttle
     memory_percent_max: float = 85.0  # Memory usage > 85% triggers throttle
-    usb_error_count_max: int = 10  # USB errors > 10 triggers throttle
+    usb_error_count_max: int = 10  # USB errors > 10 within the window triggers throttle
+    usb_error_window_seconds: int = 300  # Sliding window for counting USB errors
     hysteresis_seconds: int = 30  # Wait 30s before reverting throttle
 
 class ScannerConfig(BaseModel):
     """Scanner configuration parameters."""
     # Device assignment
     rtl_tcp_device: int = 0  # Device 0 for rtl_tcp server
+    rtl_tcp_host: str = "127.0.0.1"  # rtl_tcp server used by the "rtl_tcp" IQ source
+    rtl_tcp_port: int = 1234
+    rtl_tcp_retune_skip_bytes: int = 262144  # IQ dropped after a retune (one rtl_tcp USB transfer), plus the socket receive buffer
     scanner_device: int = 1  # Device 1 for scanning
+    recorder_devices: List[int] = []  # Dongles for parallel recordings (empty = scanner_device only)
     
     # Scan parameters
     default_dwell_seconds: float = 2.0  # Time to listen per frequency
     default_squelch_db: int = 40  # Squelch level (0-100)
     scan_delay_seconds: float = 0.1  # Delay between frequency hops
     
+    # Detection mode: "hop" (one frequency per hop), "sweep" (wideband FFT)
+    # or "channelizer" (record every channel of a passband from one dongle)
+    detection_mode: str = "hop"
+    
+    # Per-frequency (hop) detection
+    detect_block_seconds: float = 0.05  # IQ measured per decision step
+    detect_max_seconds: float = 1.0  # Longest listen before deciding
+    detect_snr_threshold_db: float = 10.0  # Channel power above noise floor to count as signal
+    detect_confidence_z: float = 3.0  # Standard errors required to stop early
+    
+    # Visit scheduling: "adaptive" (activity-weighted) or "round_robin"
+    scheduler_policy: str = "adaptive"
+    scheduler_backoff: float = 0.8  # Weight multiplier per empty visit on a quiet channel
+    scheduler_min_weight: float = 0.0625  # Dead channels keep at least 1/16 of a hot channel's visits
+    scheduler_hot_seconds: float = 60.0  # Channels stay hot this long after a hit
+    
+    # Activity history (/api/scanner/activity)
+    activity_max_frequencies: int = 16384  # Frequencies tracked; the longest-quiet one is replaced when full
+    activity_bucket_seconds: float = 60.0  # History bucket length
+    activity_history_buckets: int = 60  # Buckets kept per frequency (1 hour)
+    
+    # Occupancy history (/api/occupancy)
+    occupancy_enabled: bool = True  # Record every hop for the occupancy heatmap
+    occupancy_max_channels: int = 1024  # Frequencies tracked; the longest-quiet one is replaced when full
+    occupancy_raw_samples: int = 1048576  # 1 s samples kept (8 MB; a day at 12 hops/s)
+    occupancy_minute_buckets: int = 1440  # Minute rollups kept (1 day)
+    occupancy_hour_buckets: int = 720  # Hour rollups kept (30 days)
+    occupancy_max_columns: int = 2000  # Largest heatmap returned, in time buckets
+    
+    # Wideband sweep parameters
+    iq_source: str = "rtl_sdr"  # Raw IQ source: "rtl_sdr", "rtl_tcp" or "file"
+    iq_file_dir: Optional[str] = None  # Directory of .cu8 captures for the "file" source
+    sweep_sample_rate: int = 2400000  # IQ sample rate (2.4 MS/s)
+    sweep_usable_fraction: float = 0.8  # Usable share of the passband (edges roll off)
+    sweep_capture_seconds: float = 0.1  # IQ captured per passband
+    sweep_fft_size: int = 4096  # FFT length for the averaged PSD
+    sweep_snr_threshold_db: float = 10.0  # Channel power above noise floor to count as signal
+    
+    # Channelizer mode (uses the sweep sample rate and SNR threshold)
+    channelizer_max_recordings: int = 8  # Channels encoded at once (one ffmpeg each)
+    channelizer_block_seconds: float = 0.05  # IQ per channelizer block
+    channelizer_poll_seconds: float = 0.25  # How often the engine reads channel activity
+    
     # Audio parameters
     chunk_duration_seconds: int = 30  # Duration of each audio chunk
     max_session_duration_seconds: int = 300  # Max 5 minutes per session
+    preroll_seconds: float = 2.0  # Audio demodulated during detection that starts each recording (0 = off)
     opus_bitrate_kbps: int = 64  # Opus bitrate (64 kbps stereo)
     opus_sample_rate: int = 48000  # Output sample rate
     
+    # Squelch tones (CTCSS/DCS)
+    tone_decode_enabled: bool = True  # Decode the CTCSS tone or DCS code of recordings
+    tone_squelch: bool = False  # Discard recordings without the frequency's ctcss/dcs setting
+    tone_squelch_seconds: float = 3.0  # Time allowed to find the wanted tone
+    
+    # Waveform peaks (/api/recordings/{id}/peaks)
+    waveform_peaks_enabled: bool = True  # Store min/max per 100 ms of each recording
+    
     # Recording settings
     min_signal_duration_seconds: float = 1.0  # Minimum signal to record
     signal_timeout_seconds: float = 5.0  # Max silence before stopping record
@@ -47,11 +106,37 @@ class ScannerConfig(BaseModel):
     # Storage management
     retention_days: int = 14  # Keep recordings for 14 days
     storage_cap_gb: int = 60  # Maximum storage for recordings
+    storage_reconcile_seconds: int = 900  # Rescan recordings to correct the running size total
+    storage_high_water_fraction: float = 0.95  # Start pruning at this share of the cap...
+    storage_low_water_fraction: float = 0.90  # ...and delete the oldest down to this share
+    storage_min_free_gb: float = 1.0  # Also prune when free disk space falls below this
+    retention_interval_seconds: float = 600.0  # How often the retention manager runs
+    retention_batch_size: int = 50  # Files deleted per batch
+    retention_batch_pause_seconds: float = 0.5  # Pause between batches (spares the SD card)
     
     # Resource management
     nice_level: int = 19  # Process nice level (lower priority)
     ionice_class: int = 3  # IO scheduling class (idle)
     ffmpeg_threads: int = 1  # Single-threaded ffmpeg
+    resource_sample_seconds: float = 2.0  # Background resource sampling interval
+    resource_history_size: int = 150  # Samples kept in the ring buffer (5 minutes)
+    resource_smoothing_samples: int = 5  # Samples averaged for throttle decisions
+    
+    # Status caching
+    status_service_ttl_seconds: float = 30.0  # systemd service state
+    status_ip_ttl_seconds: float = 300.0  # IP address
+    status_recordings_ttl_seconds: float = 5.0  # Recording count
+    
+    # Event push (/api/events)
+    event_queue_size: int = 256  # Per-client queue; oldest events dropped when full
+    event_keepalive_seconds: float = 15.0  # SSE comment sent when idle
+    
+    # Live audio (/api/live)
+    audio_source: str = "rtl_fm"  # PCM source for recordings: "rtl_fm" or "synthetic" (testing)
+    live_audio_enabled: bool = True  # Tee encoded audio to live listeners
+    live_buffer_pages: int = 64  # Ogg pages kept per recorder; slow listeners skip ahead
+    live_page_duration_ms: int = 100  # Ogg page duration (live stream latency)
+    session_flush_seconds: float = 5.0  # Session file synced this often (audio lost on a crash)
     
     # Service startup
     scanner_startup_delay_seconds: int = 10  # Wait after rtltcp starts
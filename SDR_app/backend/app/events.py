@@ -0,0 +1,92 @@
+"""In-process pub/sub event bus for pushing scanner changes to clients."""
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional, Set
+from backend.app.config import scanner_config
+
+logger = logging.getLogger("scanner")
+
+class Subscription:
+    """A subscriber's bounded queue; the oldest events are dropped when full."""
+    
+    def __init__(self, maxsize: int):
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+    
+    def put(self, event: Dict[str, Any]):
+        """Queue an event without blocking (runs on the event loop)."""
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(event)
+        self._ready.set()
+    
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait for the next event; None on timeout."""
+        if not self.events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.events.popleft()
+
+class EventBus:
+    """Fan events out to any number of subscribers.
+    
+    publish() never blocks: each subscriber has a bounded queue and a slow
+    client only loses its own oldest events. It can be called from worker
+    threads too; delivery is then handed to the event loop.
+    """
+    
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+    
+    def subscribe(self, maxsize: Optional[int] = None) -> Subscription:
+        """Register a subscriber (call from the event loop)."""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(maxsize or self.queue_size)
+        self.subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber."""
+        self.subscribers.discard(subscription)
+    
+    def publish(self, event_type: str, data: Any = None):
+        """Send an event to every subscriber."""
+        if not self.subscribers:
+            return
+        with self._lock:
+            event_id = next(self._ids)
+        event = {
+            "id": event_id,
+            "type": event_type,
+            "time": datetime.utcnow().isoformat(),
+            "data": data
+        }
+        
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        
+        if running is not None and running is self._loop:
+            self._deliver(event)
+        elif self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, event)
+    
+    def _deliver(self, event: Dict[str, Any]):
+        for subscription in list(self.subscribers):
+            subscription.put(event)
+
+# Global event bus instance
+event_bus = EventBus(scanner_config.event_queue_size)
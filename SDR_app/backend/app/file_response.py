@@ -0,0 +1,137 @@
+"""File responses with byte ranges, strong validators and zero-copy sending."""
+import os
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# ASGI extension for sending straight from a file descriptor (sendfile)
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """Strong ETag from inode, modification time and size."""
+    return f'"{stat_result.st_ino:x}-{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """First byte range of a Range header as (start, end inclusive).
+    
+    Returns None when the header should be ignored (not bytes, several
+    ranges, malformed, or last byte before first, per RFC 7233 2.1);
+    raises ValueError when it cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    if not first:
+        # Suffix range: the last N bytes
+        if not last.isdigit():
+            return None
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    if not first.isdigit() or (last and not last.isdigit()):
+        return None
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+class RangedFileResponse(Response):
+    """Send a file, or one byte range of it.
+    
+    With the zerocopysend ASGI extension the server sends the bytes with
+    sendfile(); otherwise they are read in chunks on a worker thread.
+    """
+    chunk_size = 64 * 1024
+    
+    def __init__(self, path: Path, start: int, length: int, status_code: int,
+                 headers: Dict[str, str], media_type: str, send_body: bool = True):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = Path(path)
+        self.start = start
+        self.length = length
+        self.send_body = send_body
+        self.headers["content-length"] = str(length)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        
+        if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False
+                })
+            return
+        
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = self.length
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    # The file shrank since it was stat'ed. Content-Length is
+                    # already sent, so abort rather than end the body short:
+                    # the server drops the connection and the client sees an
+                    # incomplete response instead of a truncated "complete" one.
+                    raise OSError(f"{self.path} ended {remaining} bytes early")
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+
+def etag_listed(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def file_response(request: Request, path: Path, media_type: str, cache_control: str,
+                  filename: Optional[str] = None) -> Response:
+    """Conditional, range-aware response for a file (raises FileNotFoundError).
+    
+    Handles HEAD, If-None-Match (304), Range (206/416) and If-Range.
+    """
+    stat_result = path.stat()
+    size = stat_result.st_size
+    etag = file_etag(stat_result)
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "accept-ranges": "bytes",
+        "cache-control": cache_control,
+    }
+    if filename:
+        headers["content-disposition"] = f'attachment; filename="{filename}"'
+    
+    if etag_listed(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    send_body = request.method != "HEAD"
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range (the file changed) asks for the whole file
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            headers["content-range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            return RangedFileResponse(path, start, end - start + 1, 206, headers, media_type, send_body)
+    
+    return RangedFileResponse(path, 0, size, 200, headers, media_type, send_body)
@@ -1,80 +1,84 @@
 """Frequency group definitions for SDR scanner."""
-from typing import Dict, List
+from typing import Callable, Dict, List, Tuple
 from backend.app.models import FrequencyGroup, FrequencyEntry, ModulationType
 
-# GMRS Channels (462-467 MHz)
-GMRS_CHANNELS = [
-    FrequencyEntry(freq_mhz=462.5625, mode=ModulationType.NFM, label="GMRS 1"),
-    FrequencyEntry(freq_mhz=462.5875, mode=ModulationType.NFM, label="GMRS 2"),
-    FrequencyEntry(freq_mhz=462.6125, mode=ModulationType.NFM, label="GMRS 3"),
-    FrequencyEntry(freq_mhz=462.6375, mode=ModulationType.NFM, label="GMRS 4"),
-    FrequencyEntry(freq_mhz=462.6625, mode=ModulationType.NFM, label="GMRS 5"),
-    FrequencyEntry(freq_mhz=462.6875, mode=ModulationType.NFM, label="GMRS 6"),
-    FrequencyEntry(freq_mhz=462.7125, mode=ModulationType.NFM, label="GMRS 7"),
-    FrequencyEntry(freq_mhz=467.5625, mode=ModulationType.NFM, label="GMRS 8"),
-    FrequencyEntry(freq_mhz=467.5875, mode=ModulationType.NFM, label="GMRS 9"),
-    FrequencyEntry(freq_mhz=467.6125, mode=ModulationType.NFM, label="GMRS 10"),
-    FrequencyEntry(freq_mhz=467.6375, mode=ModulationType.NFM, label="GMRS 11"),
-    FrequencyEntry(freq_mhz=467.6625, mode=ModulationType.NFM, label="GMRS 12"),
-    FrequencyEntry(freq_mhz=467.6875, mode=ModulationType.NFM, label="GMRS 13"),
-    FrequencyEntry(freq_mhz=467.7125, mode=ModulationType.NFM, label="GMRS 14"),
-    # Repeater inputs
-    FrequencyEntry(freq_mhz=462.550, mode=ModulationType.NFM, label="GMRS 15 (RPT)"),
-    FrequencyEntry(freq_mhz=462.575, mode=ModulationType.NFM, label="GMRS 16 (RPT)"),
-    FrequencyEntry(freq_mhz=462.600, mode=ModulationType.NFM, label="GMRS 17 (RPT)"),
-    FrequencyEntry(freq_mhz=462.625, mode=ModulationType.NFM, label="GMRS 18 (RPT)"),
-    FrequencyEntry(freq_mhz=462.650, mode=ModulationType.NFM, label="GMRS 19 (RPT)"),
-    FrequencyEntry(freq_mhz=462.675, mode=ModulationType.NFM, label="GMRS 20 (RPT)"),
-    FrequencyEntry(freq_mhz=462.700, mode=ModulationType.NFM, label="GMRS 21 (RPT)"),
-    FrequencyEntry(freq_mhz=462.725, mode=ModulationType.NFM, label="GMRS 22 (RPT)"),
-    # Repeater outputs
-    FrequencyEntry(freq_mhz=467.550, mode=ModulationType.NFM, label="GMRS 15 OUT"),
-    FrequencyEntry(freq_mhz=467.575, mode=ModulationType.NFM, label="GMRS 16 OUT"),
-    FrequencyEntry(freq_mhz=467.600, mode=ModulationType.NFM, label="GMRS 17 OUT"),
-    FrequencyEntry(freq_mhz=467.625, mode=ModulationType.NFM, label="GMRS 18 OUT"),
-    FrequencyEntry(freq_mhz=467.650, mode=ModulationType.NFM, label="GMRS 19 OUT"),
-    FrequencyEntry(freq_mhz=467.675, mode=ModulationType.NFM, label="GMRS 20 OUT"),
-    FrequencyEntry(freq_mhz=467.700, mode=ModulationType.NFM, label="GMRS 21 OUT"),
-    FrequencyEntry(freq_mhz=467.725, mode=ModulationType.NFM, label="GMRS 22 OUT"),
-]
+def generate_gmrs() -> List[FrequencyEntry]:
+    """Generate GMRS channels including repeaters (462-467 MHz)."""
+    return [
+        FrequencyEntry(freq_mhz=462.5625, mode=ModulationType.NFM, label="GMRS 1"),
+        FrequencyEntry(freq_mhz=462.5875, mode=ModulationType.NFM, label="GMRS 2"),
+        FrequencyEntry(freq_mhz=462.6125, mode=ModulationType.NFM, label="GMRS 3"),
+        FrequencyEntry(freq_mhz=462.6375, mode=ModulationType.NFM, label="GMRS 4"),
+        FrequencyEntry(freq_mhz=462.6625, mode=ModulationType.NFM, label="GMRS 5"),
+        FrequencyEntry(freq_mhz=462.6875, mode=ModulationType.NFM, label="GMRS 6"),
+        FrequencyEntry(freq_mhz=462.7125, mode=ModulationType.NFM, label="GMRS 7"),
+        FrequencyEntry(freq_mhz=467.5625, mode=ModulationType.NFM, label="GMRS 8"),
+        FrequencyEntry(freq_mhz=467.5875, mode=ModulationType.NFM, label="GMRS 9"),
+        FrequencyEntry(freq_mhz=467.6125, mode=ModulationType.NFM, label="GMRS 10"),
+        FrequencyEntry(freq_mhz=467.6375, mode=ModulationType.NFM, label="GMRS 11"),
+        FrequencyEntry(freq_mhz=467.6625, mode=ModulationType.NFM, label="GMRS 12"),
+        FrequencyEntry(freq_mhz=467.6875, mode=ModulationType.NFM, label="GMRS 13"),
+        FrequencyEntry(freq_mhz=467.7125, mode=ModulationType.NFM, label="GMRS 14"),
+        # Repeater inputs
+        FrequencyEntry(freq_mhz=462.550, mode=ModulationType.NFM, label="GMRS 15 (RPT)"),
+        FrequencyEntry(freq_mhz=462.575, mode=ModulationType.NFM, label="GMRS 16 (RPT)"),
+        FrequencyEntry(freq_mhz=462.600, mode=ModulationType.NFM, label="GMRS 17 (RPT)"),
+        FrequencyEntry(freq_mhz=462.625, mode=ModulationType.NFM, label="GMRS 18 (RPT)"),
+        FrequencyEntry(freq_mhz=462.650, mode=ModulationType.NFM, label="GMRS 19 (RPT)"),
+        FrequencyEntry(freq_mhz=462.675, mode=ModulationType.NFM, label="GMRS 20 (RPT)"),
+        FrequencyEntry(freq_mhz=462.700, mode=ModulationType.NFM, label="GMRS 21 (RPT)"),
+        FrequencyEntry(freq_mhz=462.725, mode=ModulationType.NFM, label="GMRS 22 (RPT)"),
+        # Repeater outputs
+        FrequencyEntry(freq_mhz=467.550, mode=ModulationType.NFM, label="GMRS 15 OUT"),
+        FrequencyEntry(freq_mhz=467.575, mode=ModulationType.NFM, label="GMRS 16 OUT"),
+        FrequencyEntry(freq_mhz=467.600, mode=ModulationType.NFM, label="GMRS 17 OUT"),
+        FrequencyEntry(freq_mhz=467.625, mode=ModulationType.NFM, label="GMRS 18 OUT"),
+        FrequencyEntry(freq_mhz=467.650, mode=ModulationType.NFM, label="GMRS 19 OUT"),
+        FrequencyEntry(freq_mhz=467.675, mode=ModulationType.NFM, label="GMRS 20 OUT"),
+        FrequencyEntry(freq_mhz=467.700, mode=ModulationType.NFM, label="GMRS 21 OUT"),
+        FrequencyEntry(freq_mhz=467.725, mode=ModulationType.NFM, label="GMRS 22 OUT"),
+    ]
 
-# MURS Channels (151-154 MHz)
-MURS_CHANNELS = [
-    FrequencyEntry(freq_mhz=151.820, mode=ModulationType.NFM, label="MURS 1"),
-    FrequencyEntry(freq_mhz=151.880, mode=ModulationType.NFM, label="MURS 2"),
-    FrequencyEntry(freq_mhz=151.940, mode=ModulationType.NFM, label="MURS 3"),
-    FrequencyEntry(freq_mhz=154.570, mode=ModulationType.NFM, label="MURS 4"),
-    FrequencyEntry(freq_mhz=154.600, mode=ModulationType.NFM, label="MURS 5"),
-]
+def generate_murs() -> List[FrequencyEntry]:
+    """Generate MURS channels (151-154 MHz)."""
+    return [
+        FrequencyEntry(freq_mhz=151.820, mode=ModulationType.NFM, label="MURS 1"),
+        FrequencyEntry(freq_mhz=151.880, mode=ModulationType.NFM, label="MURS 2"),
+        FrequencyEntry(freq_mhz=151.940, mode=ModulationType.NFM, label="MURS 3"),
+        FrequencyEntry(freq_mhz=154.570, mode=ModulationType.NFM, label="MURS 4"),
+        FrequencyEntry(freq_mhz=154.600, mode=ModulationType.NFM, label="MURS 5"),
+    ]
 
-# FRS Channels (462-467 MHz, overlaps with GMRS)
-FRS_CHANNELS = [
-    FrequencyEntry(freq_mhz=462.5625, mode=ModulationType.NFM, label="FRS 1"),
-    FrequencyEntry(freq_mhz=462.5875, mode=ModulationType.NFM, label="FRS 2"),
-    FrequencyEntry(freq_mhz=462.6125, mode=ModulationType.NFM, label="FRS 3"),
-    FrequencyEntry(freq_mhz=462.6375, mode=ModulationType.NFM, label="FRS 4"),
-    FrequencyEntry(freq_mhz=462.6625, mode=ModulationType.NFM, label="FRS 5"),
-    FrequencyEntry(freq_mhz=462.6875, mode=ModulationType.NFM, label="FRS 6"),
-    FrequencyEntry(freq_mhz=462.7125, mode=ModulationType.NFM, label="FRS 7"),
-    FrequencyEntry(freq_mhz=467.5625, mode=ModulationType.NFM, label="FRS 8"),
-    FrequencyEntry(freq_mhz=467.5875, mode=ModulationType.NFM, label="FRS 9"),
-    FrequencyEntry(freq_mhz=467.6125, mode=ModulationType.NFM, label="FRS 10"),
-    FrequencyEntry(freq_mhz=467.6375, mode=ModulationType.NFM, label="FRS 11"),
-    FrequencyEntry(freq_mhz=467.6625, mode=ModulationType.NFM, label="FRS 12"),
-    FrequencyEntry(freq_mhz=467.6875, mode=ModulationType.NFM, label="FRS 13"),
-    FrequencyEntry(freq_mhz=467.7125, mode=ModulationType.NFM, label="FRS 14"),
-]
+def generate_frs() -> List[FrequencyEntry]:
+    """Generate FRS channels (462-467 MHz, overlaps with GMRS)."""
+    return [
+        FrequencyEntry(freq_mhz=462.5625, mode=ModulationType.NFM, label="FRS 1"),
+        FrequencyEntry(freq_mhz=462.5875, mode=ModulationType.NFM, label="FRS 2"),
+        FrequencyEntry(freq_mhz=462.6125, mode=ModulationType.NFM, label="FRS 3"),
+        FrequencyEntry(freq_mhz=462.6375, mode=ModulationType.NFM, label="FRS 4"),
+        FrequencyEntry(freq_mhz=462.6625, mode=ModulationType.NFM, label="FRS 5"),
+        FrequencyEntry(freq_mhz=462.6875, mode=ModulationType.NFM, label="FRS 6"),
+        FrequencyEntry(freq_mhz=462.7125, mode=ModulationType.NFM, label="FRS 7"),
+        FrequencyEntry(freq_mhz=467.5625, mode=ModulationType.NFM, label="FRS 8"),
+        FrequencyEntry(freq_mhz=467.5875, mode=ModulationType.NFM, label="FRS 9"),
+        FrequencyEntry(freq_mhz=467.6125, mode=ModulationType.NFM, label="FRS 10"),
+        FrequencyEntry(freq_mhz=467.6375, mode=ModulationType.NFM, label="FRS 11"),
+        FrequencyEntry(freq_mhz=467.6625, mode=ModulationType.NFM, label="FRS 12"),
+        FrequencyEntry(freq_mhz=467.6875, mode=ModulationType.NFM, label="FRS 13"),
+        FrequencyEntry(freq_mhz=467.7125, mode=ModulationType.NFM, label="FRS 14"),
+    ]
 
-# Weather Radio Channels
-WEATHER_CHANNELS = [
-    FrequencyEntry(freq_mhz=162.400, mode=ModulationType.NFM, label="WX 1"),
-    FrequencyEntry(freq_mhz=162.425, mode=ModulationType.NFM, label="WX 2"),
-    FrequencyEntry(freq_mhz=162.450, mode=ModulationType.NFM, label="WX 3"),
-    FrequencyEntry(freq_mhz=162.475, mode=ModulationType.NFM, label="WX 4"),
-    FrequencyEntry(freq_mhz=162.500, mode=ModulationType.NFM, label="WX 5"),
-    FrequencyEntry(freq_mhz=162.525, mode=ModulationType.NFM, label="WX 6"),
-    FrequencyEntry(freq_mhz=162.550, mode=ModulationType.NFM, label="WX 7"),
-]
+def generate_weather() -> List[FrequencyEntry]:
+    """Generate NOAA weather radio channels (162 MHz)."""
+    return [
+        FrequencyEntry(freq_mhz=162.400, mode=ModulationType.NFM, label="WX 1"),
+        FrequencyEntry(freq_mhz=162.425, mode=ModulationType.NFM, label="WX 2"),
+        FrequencyEntry(freq_mhz=162.450, mode=ModulationType.NFM, label="WX 3"),
+        FrequencyEntry(freq_mhz=162.475, mode=ModulationType.NFM, label="WX 4"),
+        FrequencyEntry(freq_mhz=162.500, mode=ModulationType.NFM, label="WX 5"),
+        FrequencyEntry(freq_mhz=162.525, mode=ModulationType.NFM, label="WX 6"),
+        FrequencyEntry(freq_mhz=162.550, mode=ModulationType.NFM, label="WX 7"),
+    ]
 
 def generate_ham_2m() -> List[FrequencyEntry]:
     """Generate 2M ham band frequencies (144-148 MHz)."""
@@ -172,86 +176,51 @@ def generate_business_band() -> List[FrequencyEntry]:
         freqs.append(FrequencyEntry(freq_mhz=float(f), mode=ModulationType.NFM, label=f"Business {f} MHz"))
     return freqs
 
-# Define all frequency groups
-FREQUENCY_GROUPS: Dict[str, FrequencyGroup] = {
-    "GMRS": FrequencyGroup(
-        name="GMRS",
-        display_name="GMRS (General Mobile Radio Service)",
-        frequencies=GMRS_CHANNELS,
-        description="30 GMRS channels including repeaters (462-467 MHz)"
-    ),
-    "MURS": FrequencyGroup(
-        name="MURS",
-        display_name="MURS (Multi-Use Radio Service)",
-        frequencies=MURS_CHANNELS,
-        description="5 MURS channels (151-154 MHz)"
-    ),
-    "FRS": FrequencyGroup(
-        name="FRS",
-        display_name="FRS (Family Radio Service)",
-        frequencies=FRS_CHANNELS,
-        description="14 FRS channels (462-467 MHz)"
-    ),
-    "WEATHER": FrequencyGroup(
-        name="WEATHER",
-        display_name="NOAA Weather Radio",
-        frequencies=WEATHER_CHANNELS,
-        description="7 NOAA weather channels (162 MHz)"
-    ),
-    "2M_HAM": FrequencyGroup(
-        name="2M_HAM",
-        display_name="2M Ham Band (144-148 MHz)",
-        frequencies=generate_ham_2m(),
-        description="2 meter amateur radio band"
-    ),
-    "70CM_HAM": FrequencyGroup(
-        name="70CM_HAM",
-        display_name="70cm Ham Band (420-450 MHz)",
-        frequencies=generate_ham_70cm(),
-        description="70 centimeter amateur radio band"
-    ),
-    "1_25M_HAM": FrequencyGroup(
-        name="1_25M_HAM",
-        display_name="1.25M Ham Band (219-225 MHz)",
-        frequencies=generate_ham_1_25m(),
-        description="1.25 meter amateur radio band"
-    ),
-    "6M_HAM": FrequencyGroup(
-        name="6M_HAM",
-        display_name="6M Ham Band (50-54 MHz)",
-        frequencies=generate_ham_6m(),
-        description="6 meter amateur radio band"
-    ),
-    "AIRCRAFT": FrequencyGroup(
-        name="AIRCRAFT",
-        display_name="Aircraft Band (118-137 MHz)",
-        frequencies=generate_aircraft(),
-        description="Aviation communications (AM)"
-    ),
-    "MARINE": FrequencyGroup(
-        name="MARINE",
-        display_name="Marine VHF (156-163 MHz)",
-        frequencies=generate_marine(),
-        description="Marine VHF radio channels"
-    ),
-    "FM_BROADCAST": FrequencyGroup(
-        name="FM_BROADCAST",
-        display_name="FM Broadcast (88-108 MHz)",
-        frequencies=generate_fm_broadcast(),
-        description="Commercial FM radio broadcast band"
-    ),
-    "BUSINESS": FrequencyGroup(
-        name="BUSINESS",
-        display_name="Business Band (450-470 MHz)",
-        frequencies=generate_business_band(),
-        description="Business and industrial frequencies"
-    ),
+# Group name -> (display name, generator, description). Groups are built
+# on first use rather than at import.
+GROUP_DEFINITIONS: Dict[str, Tuple[str, Callable[[], List[FrequencyEntry]], str]] = {
+    "GMRS": ("GMRS (General Mobile Radio Service)", generate_gmrs,
+             "30 GMRS channels including repeaters (462-467 MHz)"),
+    "MURS": ("MURS (Multi-Use Radio Service)", generate_murs,
+             "5 MURS channels (151-154 MHz)"),
+    "FRS": ("FRS (Family Radio Service)", generate_frs,
+            "14 FRS channels (462-467 MHz)"),
+    "WEATHER": ("NOAA Weather Radio", generate_weather,
+                "7 NOAA weather channels (162 MHz)"),
+    "2M_HAM": ("2M Ham Band (144-148 MHz)", generate_ham_2m,
+               "2 meter amateur radio band"),
+    "70CM_HAM": ("70cm Ham Band (420-450 MHz)", generate_ham_70cm,
+                 "70 centimeter amateur radio band"),
+    "1_25M_HAM": ("1.25M Ham Band (219-225 MHz)", generate_ham_1_25m,
+                  "1.25 meter amateur radio band"),
+    "6M_HAM": ("6M Ham Band (50-54 MHz)", generate_ham_6m,
+               "6 meter amateur radio band"),
+    "AIRCRAFT": ("Aircraft Band (118-137 MHz)", generate_aircraft,
+                 "Aviation communications (AM)"),
+    "MARINE": ("Marine VHF (156-163 MHz)", generate_marine,
+               "Marine VHF radio channels"),
+    "FM_BROADCAST": ("FM Broadcast (88-108 MHz)", generate_fm_broadcast,
+                     "Commercial FM radio broadcast band"),
+    "BUSINESS": ("Business Band (450-470 MHz)", generate_business_band,
+                 "Business and industrial frequencies"),
 }
 
-def get_all_groups() -> Dict[str, FrequencyGroup]:
-    """Return all frequency groups."""
-    return FREQUENCY_GROUPS
+_groups: Dict[str, FrequencyGroup] = {}
 
 def get_group(name: str) -> FrequencyGroup:
-    """Get a specific frequency group by name."""
-    return FREQUENCY_GROUPS[name]
+    """Get a specific frequency group by name (KeyError if unknown)."""
+    group = _groups.get(name)
+    if group is None:
+        display_name, generate, description = GROUP_DEFINITIONS[name]
+        group = FrequencyGroup(
+            name=name,
+            display_name=display_name,
+            frequencies=generate(),
+            description=description
+        )
+        _groups[name] = group
+    return group
+
+def get_all_groups() -> Dict[str, FrequencyGroup]:
+    """Return all frequency groups."""
+    return {name: get_group(name) for name in GROUP_DEFINITIONS}
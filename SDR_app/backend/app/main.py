@@ -3,6 +3,7 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pathlib import Path
+import asyncio
 import logging.config
 import os
 
@@ -14,7 +15,7 @@ if logging_conf_path.exists():
 logger = logging.getLogger("uvicorn")
 
 # Import routes
-from backend.app.routes import status, scanner, recordings
+from backend.app.routes import status, scanner, recordings, events, live, occupancy, metrics
 from backend.app.config import API_TITLE, API_VERSION, API_DESCRIPTION, STATIC_DIR
 
 # Create FastAPI app
@@ -28,6 +29,10 @@ app = FastAPI(
 app.include_router(status.router)
 app.include_router(scanner.router)
 app.include_router(recordings.router)
+app.include_router(events.router)
+app.include_router(live.router)
+app.include_router(occupancy.router)
+app.include_router(metrics.router)
 
 # Mount static files if they exist (React build)
 if STATIC_DIR.exists():
@@ -56,6 +61,33 @@ async def health():
 async def startup_event():
     """Application startup."""
     logger.info(f"Starting {API_TITLE} v{API_VERSION}")
+    
+    # Catalog recordings made before the catalog existed (first start only)
+    from backend.app.catalog import recording_catalog
+    await asyncio.to_thread(recording_catalog.import_directory)
+    
+    # Finalize sessions cut short by a crash or power loss
+    from backend.app.scanner.audio_pipeline import recover_sessions
+    recovered = await asyncio.to_thread(recover_sessions)
+    if recovered:
+        await asyncio.to_thread(recording_catalog.import_files, recovered)
+    
+    # Keep the recordings size total reconciled with the disk
+    from backend.app.scanner.storage import storage_accountant
+    storage_accountant.start()
+    
+    # Delete expired recordings and keep the archive under its cap
+    from backend.app.scanner.retention import retention_manager
+    retention_manager.start()
+    
+    # Sample resources and drive throttling in the background
+    from backend.app.scanner.resource_monitor import resource_monitor
+    resource_monitor.start()
+    
+    # Keep service state and IP address cached for /api/status
+    from backend.app.status_cache import status_aggregator
+    status_aggregator.start()
+    
     logger.info("Scanner engine initialized")
 
 @app.on_event("shutdown")
@@ -65,4 +97,22 @@ async def shutdown_event():
     if scanner_engine.is_running():
         logger.info("Stopping scanner...")
         await scanner_engine.stop_scan()
+    
+    from backend.app.status_cache import status_aggregator
+    await status_aggregator.stop()
+    
+    from backend.app.scanner.resource_monitor import resource_monitor
+    await resource_monitor.stop()
+    
+    from backend.app.scanner.retention import retention_manager
+    await retention_manager.stop()
+    
+    from backend.app.scanner.storage import storage_accountant
+    await storage_accountant.stop()
+    
+    from backend.app.scanner.occupancy import occupancy_store
+    occupancy_store.flush()
+    
+    from backend.app.catalog import recording_catalog
+    recording_catalog.close()
     logger.info("Application shutdown complete")
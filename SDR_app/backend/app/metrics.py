@@ -0,0 +1,264 @@
+"""Low-overhead counters, gauges and histograms with Prometheus text output."""
+import math
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Quantiles reported for each histogram
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Family:
+    """A named metric with optional labels; one child per label combination."""
+    kind = "untyped"
+    
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(self, *values: str):
+        """Child for the given label values (created on first use)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+    
+    def _samples(self, values: Tuple[str, ...], child) -> List[str]:
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = sorted(self._children.items(), key=lambda item: item[0])
+        for values, child in children:
+            lines.extend(self._samples(values, child))
+        return lines
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+    
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+class Counter(_Family):
+    """Monotonically increasing count."""
+    kind = "counter"
+    
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, label_names)
+        if not self.label_names:
+            self._default = self.labels()
+    
+    def _new_child(self):
+        return _CounterValue()
+    
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+    
+    def _samples(self, values, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, values)} {_format_value(child.value)}"]
+
+class Gauge(_Family):
+    """Value read from a callback when the metrics are rendered."""
+    kind = "gauge"
+    
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.read = read
+        self._children[()] = None
+    
+    def _samples(self, values, child) -> List[str]:
+        try:
+            value = float(self.read())
+        except Exception:
+            return []
+        return [f"{self.name} {_format_value(value)}"]
+
+class HdrHistogram:
+    """Fixed-memory histogram with logarithmic buckets, HdrHistogram style.
+    
+    Each power of two between lowest and highest is split into
+    sub_buckets linear buckets, so every value is kept to within
+    1 / sub_buckets (6% by default) whatever its magnitude. Recording is
+    one frexp and one array increment; memory is fixed at construction
+    (about 4 KB for 1 us to 1 hour).
+    """
+    
+    def __init__(self, lowest: float = 1e-6, highest: float = 3600.0, sub_buckets: int = 16):
+        self.lowest = lowest
+        self.sub_buckets = sub_buckets
+        self.min_exponent = math.frexp(lowest)[1]
+        self.max_exponent = math.frexp(highest)[1]
+        # Bucket 0 holds values below lowest, the last one values above highest
+        size = (self.max_exponent - self.min_exponent + 1) * sub_buckets + 2
+        self.counts = array("q", bytes(8 * size))
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+    
+    def _index(self, value: float) -> int:
+        if value < self.lowest:
+            return 0
+        mantissa, exponent = math.frexp(value)
+        if exponent > self.max_exponent:
+            return len(self.counts) - 1
+        return 1 + (exponent - self.min_exponent) * self.sub_buckets + int((mantissa - 0.5) * 2 * self.sub_buckets)
+    
+    def _upper_bound(self, index: int) -> float:
+        if index == 0:
+            return self.lowest
+        if index == len(self.counts) - 1:
+            return self.max
+        exponent, sub = divmod(index - 1, self.sub_buckets)
+        return math.ldexp(0.5 + (sub + 1) / (2 * self.sub_buckets), exponent + self.min_exponent)
+    
+    def observe(self, value: float):
+        """Record one value."""
+        index = self._index(value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+    
+    @contextmanager
+    def time(self):
+        """Observe the duration of a with block (monotonic seconds)."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start)
+    
+    def quantiles(self, quantiles=QUANTILES) -> List[float]:
+        """Upper bounds of the buckets holding each quantile (0.0 if empty)."""
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+            largest = self.max
+        if not total:
+            return [0.0 for _ in quantiles]
+        cumulative = list(accumulate(counts))
+        results = []
+        index = 0
+        for q in quantiles:
+            rank = max(1, math.ceil(q * total))
+            while cumulative[index] < rank:
+                index += 1
+            results.append(min(self._upper_bound(index), largest))
+        return results
+
+class Histogram(_Family):
+    """Distribution of durations, exported as a Prometheus summary."""
+    kind = "summary"
+    
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 lowest: float = 1e-6, highest: float = 3600.0):
+        super().__init__(name, help_text, label_names)
+        self.lowest = lowest
+        self.highest = highest
+        if not self.label_names:
+            self._default = self.labels()
+    
+    def _new_child(self):
+        return HdrHistogram(self.lowest, self.highest)
+    
+    def observe(self, value: float):
+        self._default.observe(value)
+    
+    def time(self):
+        return self._default.time()
+    
+    def _samples(self, values, child) -> List[str]:
+        lines = []
+        for q, value in zip(QUANTILES, child.quantiles()):
+            labels = _format_labels(self.label_names, values, f'quantile="{q}"')
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        labels = _format_labels(self.label_names, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+class MetricsRegistry:
+    """Every metric of the process, rendered together for /metrics."""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Family] = {}
+    
+    def _register(self, metric: _Family) -> _Family:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+    
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> Gauge:
+        return self._register(Gauge(name, help_text, read))
+    
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names))
+    
+    def get(self, name: str) -> Optional[_Family]:
+        return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Global registry
+metrics = MetricsRegistry()
+
+# Scan instrumentation
+scan_hops = metrics.counter("sdr_scan_hops_total", "Hops (frequencies or passbands) scanned")
+scan_hop_seconds = metrics.histogram("sdr_scan_hop_seconds", "Duration of one hop, including dwell")
+scan_pass_seconds = metrics.histogram("sdr_scan_pass_seconds", "Duration of a full pass over the scan plan")
+scan_stage_seconds = metrics.histogram(
+    "sdr_scan_stage_seconds",
+    "Time spent in each stage of scanning and recording",
+    ("stage",)
+)
+detection_to_record_seconds = metrics.histogram(
+    "sdr_detection_to_record_seconds",
+    "Delay from a detection to its recorder running"
+)
+subprocess_spawns = metrics.counter(
+    "sdr_subprocess_spawns_total",
+    "External processes started",
+    ("program",)
+)
@@ -47,6 +47,26 @@ class Detection(BaseModel):
     last_seen: datetime = Field(..., description="Last detection time")
     recording_id: Optional[str] = Field(None, description="Associated recording ID")
 
+class ChannelActivity(BaseModel):
+    """Activity statistics of one frequency."""
+    freq_mhz: float = Field(..., description="Frequency in MHz")
+    window_hits: int = Field(..., description="Scans with a signal in the requested window")
+    hits: int = Field(..., description="Scans with a signal since tracking started")
+    visits: int = Field(..., description="Scans since tracking started")
+    duty_cycle: float = Field(..., description="Share of scans with a signal")
+    mean_power_db: Optional[float] = Field(None, description="Mean signal strength of hits")
+    max_power_db: Optional[float] = Field(None, description="Strongest hit")
+    first_seen: Optional[datetime] = Field(None, description="First hit")
+    last_seen: Optional[datetime] = Field(None, description="Last hit")
+
+class OccupancyHeatmap(BaseModel):
+    """Occupancy over time: rows are frequencies, columns time buckets."""
+    resolution_seconds: int = Field(..., description="Length of each time bucket")
+    start: float = Field(..., description="Unix time of the first bucket")
+    frequencies_mhz: List[float] = Field(..., description="Frequency of each row, ascending")
+    occupancy: List[List[Optional[float]]] = Field(..., description="Share of scans with a signal (null = not scanned)")
+    peak_power_db: List[List[Optional[int]]] = Field(..., description="Strongest signal (null = none)")
+
 class Recording(BaseModel):
     """A recording session."""
     id: str = Field(..., description="Unique recording ID")
@@ -60,6 +80,14 @@ class Recording(BaseModel):
     ctcss_tone: Optional[float] = Field(None, description="CTCSS tone if detected")
     dcs_code: Optional[int] = Field(None, description="DCS code if detected")
     label: Optional[str] = Field(None, description="Frequency label")
+    signal_strength_db: Optional[float] = Field(None, description="Strongest detection during the session")
+
+class RecordingPeaks(BaseModel):
+    """Waveform of a recording: signed 8-bit min/max per interval."""
+    id: str = Field(..., description="Recording ID")
+    interval_seconds: float = Field(..., description="Audio covered by each min/max pair")
+    min: List[int] = Field(..., description="Lowest sample of each interval (-128..127)")
+    max: List[int] = Field(..., description="Highest sample of each interval (-128..127)")
 
 class ResourceUsage(BaseModel):
     """System resource usage."""
@@ -86,11 +114,25 @@ class SystemStatus(BaseModel):
     resources: ResourceUsage = Field(..., description="Resource usage")
     throttle_active: bool = Field(..., description="Throttle active")
     throttle_reason: Optional[str] = Field(None, description="Throttle reason")
-    usb_errors: int = Field(0, description="USB error count")
+    usb_errors: int = Field(0, description="USB errors within the sliding window")
     active_detections: int = Field(0, description="Number of active detections")
     total_recordings: int = Field(0, description="Total number of recordings")
     ip_address: str = Field(..., description="System IP address")
 
+class ScanStats(BaseModel):
+    """Scan throughput and recorder state."""
+    hops_total: int = Field(0, description="Hops (frequencies or passbands) scanned")
+    hops_per_second: float = Field(0.0, description="Overall scan rate")
+    hops_during_finalize: int = Field(0, description="Hops scanned while sessions were finalizing")
+    hops_per_second_during_finalize: float = Field(0.0, description="Scan rate while sessions were finalizing")
+    finalize_seconds: float = Field(0.0, description="Scan time spent while sessions were finalizing")
+    active_recordings: int = Field(0, description="Sessions currently recording")
+    finalizing_sessions: int = Field(0, description="Sessions being stopped or assembled")
+    recorders: int = Field(0, description="Number of recorders (dongles)")
+    frequencies: int = Field(0, description="Frequencies in the scan plan")
+    duplicates_removed: int = Field(0, description="Repeated frequencies dropped from the plan")
+    estimated_pass_seconds: float = Field(0.0, description="Estimated time for one pass with no activity")
+
 class ConfigUpdateRequest(BaseModel):
     """Request to update configuration."""
     dwell_seconds: Optional[float] = None
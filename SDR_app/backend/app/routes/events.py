@@ -0,0 +1,56 @@
+"""Server-sent events stream of scanner changes."""
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from backend.app.events import event_bus
+from backend.app.config import scanner_config, throttle_state
+from backend.app.scanner.engine import scanner_engine
+import json
+import logging
+
+logger = logging.getLogger("uvicorn")
+router = APIRouter(prefix="/api", tags=["events"])
+
+def format_sse(event: dict) -> str:
+    """Encode an event in text/event-stream format."""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+@router.get("/events")
+async def stream_events(request: Request):
+    """Stream events as server-sent events.
+    
+    The first event is a snapshot of active detections and throttle
+    state; after that only changes are sent: detection_start/update/end,
+    recording_start/finalized, throttle, resources and scanner.
+    """
+    subscription = event_bus.subscribe()
+    
+    async def generate():
+        try:
+            snapshot = {
+                "id": 0,
+                "type": "snapshot",
+                "data": {
+                    "scan_active": scanner_engine.is_running(),
+                    "detections": [d.model_dump(mode="json") for d in scanner_engine.get_detections()],
+                    "throttle": throttle_state.model_dump()
+                }
+            }
+            yield format_sse(snapshot)
+            
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=scanner_config.event_keepalive_seconds)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                if subscription.dropped:
+                    yield format_sse({"id": event["id"], "type": "dropped", "data": {"count": subscription.dropped}})
+                    subscription.dropped = 0
+                yield format_sse(event)
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,56 @@
+"""Live audio routes."""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from backend.app.scanner.engine import scanner_engine
+from backend.app.scanner.live_audio import LiveAudioBuffer
+import logging
+from typing import List, Dict, Optional
+
+logger = logging.getLogger("uvicorn")
+router = APIRouter(prefix="/api/live", tags=["live"])
+
+def _get_buffer(recorder: int) -> Optional[LiveAudioBuffer]:
+    """Live buffer of a recorder, if it is recording."""
+    slots = scanner_engine.recording_manager.slots
+    if recorder < 0 or recorder >= len(slots):
+        return None
+    buffer = slots[recorder].pipeline.live_buffer
+    if buffer is None or buffer.closed:
+        return None
+    return buffer
+
+@router.get("", response_model=List[Dict])
+async def list_live_streams():
+    """List recorders that can be listened to."""
+    try:
+        streams = []
+        for slot in scanner_engine.recording_manager.slots:
+            buffer = slot.pipeline.live_buffer
+            freq_entry = slot.pipeline.freq_entry
+            if buffer is None or buffer.closed or freq_entry is None:
+                continue
+            streams.append({
+                "recorder": slot.index,
+                "freq_mhz": freq_entry.freq_mhz,
+                "label": freq_entry.label,
+                "mode": freq_entry.mode,
+                "listeners": buffer.listeners,
+                "url": f"/api/live/{slot.index}"
+            })
+        return streams
+    except Exception as e:
+        logger.error(f"Error listing live streams: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{recorder}")
+async def stream_live_audio(recorder: int):
+    """Stream the audio of an active recording as Ogg/Opus."""
+    buffer = _get_buffer(recorder)
+    if buffer is None:
+        raise HTTPException(status_code=404, detail="Recorder is not recording")
+    
+    return StreamingResponse(
+        buffer.stream(),
+        media_type="audio/ogg",
+        headers={"Cache-Control": "no-store"}
+    )
@@ -0,0 +1,29 @@
+"""Prometheus metrics route."""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from backend.app.config import throttle_state
+from backend.app.metrics import metrics
+from backend.app.scanner.engine import scanner_engine
+from backend.app.scanner.storage import storage_accountant
+import logging
+
+logger = logging.getLogger("uvicorn")
+router = APIRouter(tags=["metrics"])
+
+# State read at scrape time
+metrics.gauge("sdr_scan_running", "1 while the scanner is running", lambda: scanner_engine.is_running())
+metrics.gauge("sdr_hops_per_second", "Average hop rate of the current scan",
+              lambda: scanner_engine.get_stats().hops_per_second)
+metrics.gauge("sdr_active_recordings", "Sessions being recorded",
+              lambda: len(scanner_engine.recording_manager.sessions))
+metrics.gauge("sdr_finalizing_sessions", "Sessions being assembled and catalogued",
+              lambda: scanner_engine.recording_manager.finalizing_count)
+metrics.gauge("sdr_throttle_paused", "1 while scanning is paused by the resource monitor",
+              lambda: throttle_state.paused)
+metrics.gauge("sdr_recordings_bytes", "Size of the recordings directory",
+              lambda: storage_accountant.total_bytes)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
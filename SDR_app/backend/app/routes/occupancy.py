@@ -0,0 +1,49 @@
+"""Spectrum occupancy routes."""
+from fastapi import APIRouter, HTTPException, Query
+from backend.app.models import OccupancyHeatmap
+from backend.app.scanner.occupancy import occupancy_store
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger("uvicorn")
+router = APIRouter(prefix="/api/occupancy", tags=["occupancy"])
+
+@router.get("", response_model=OccupancyHeatmap)
+async def get_occupancy(
+    since: Optional[datetime] = Query(None, description="Start of the window (UTC, default 24 hours ago)"),
+    until: Optional[datetime] = Query(None, description="End of the window (UTC, default now)"),
+    resolution: Optional[str] = Query(None, pattern="^(second|minute|hour)$",
+                                      description="Bucket size; by default the finest that fits"),
+    freq_min: Optional[float] = Query(None, description="Lowest frequency in MHz"),
+    freq_max: Optional[float] = Query(None, description="Highest frequency in MHz"),
+    max_columns: Optional[int] = Query(None, ge=1, le=10000, description="Most time buckets to return")
+):
+    """Occupancy heatmap: one row per frequency, one column per time bucket."""
+    now = datetime.now(timezone.utc)
+    until = until or now
+    since = since or until - timedelta(days=1)
+    # Naive times are UTC
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    
+    try:
+        return await asyncio.to_thread(
+            occupancy_store.heatmap,
+            since.timestamp(),
+            until.timestamp(),
+            resolution,
+            int(round(freq_min * 1e6)) if freq_min is not None else None,
+            int(round(freq_max * 1e6)) if freq_max is not None else None,
+            max_columns
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error building occupancy heatmap: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
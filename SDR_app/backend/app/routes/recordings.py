@@ -1,108 +1,218 @@
 """Recordings management routes."""
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from backend.app.models import Recording
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from backend.app.archive import iter_tar, iter_zip
+from backend.app.file_response import etag_listed, file_response
+from backend.app.models import Recording, RecordingPeaks, ModulationType
+from backend.app.catalog import recording_catalog, TIME_FORMAT
 from backend.app.config import RECORDINGS_DIR
-from datetime import datetime
-from typing import List
+from backend.app.scanner.peaks import PEAK_INTERVAL_SECONDS, unpack_peaks
+from backend.app.scanner.retention import retention_manager
+from backend.app.scanner.storage import storage_accountant
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+import asyncio
+import base64
+import hashlib
 import logging
-import os
 
 logger = logging.getLogger("uvicorn")
 router = APIRouter(prefix="/api/recordings", tags=["recordings"])
 
-def parse_recording_filename(filename: str) -> dict:
-    """Parse recording filename to extract metadata.
+MAX_PAGE_SIZE = 1000
+# Finished recordings never change; sessions still being written do
+FINALIZED_CACHE_CONTROL = "public, max-age=86400"
+
+def encode_cursor(recording: Recording) -> str:
+    """Opaque cursor pointing just past a recording."""
+    raw = f"{recording.start_time.strftime(TIME_FORMAT)}|{recording.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    start, recording_id = raw.split("|", 1)
+    return datetime.strptime(start, TIME_FORMAT), recording_id
+
+def to_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Catalog times are naive UTC; convert aware query times to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag."""
+    return etag_listed(request.headers.get("if-none-match"), etag)
+
+@router.get("", response_model=List[Recording])
+async def list_recordings(
+    request: Request,
+    response: Response,
+    freq_min: Optional[float] = Query(None, description="Lowest frequency in MHz"),
+    freq_max: Optional[float] = Query(None, description="Highest frequency in MHz"),
+    label: Optional[str] = Query(None, description="Exact frequency label"),
+    mode: Optional[ModulationType] = Query(None, description="Modulation type"),
+    since: Optional[datetime] = Query(None, description="Recordings started at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Recordings started before this time (UTC)"),
+    min_duration: Optional[float] = Query(None, description="Minimum duration in seconds"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Sort by start time"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page")
+):
+    """List recordings one page at a time, newest first by default.
     
-    Format: YYYYMMDD_HHMMSS_FREQ_LABEL.ogg
+    The next page's cursor is returned in the X-Next-Cursor and Link
+    headers. Responses carry an ETag; an unchanged page returns 304.
     """
-    try:
-        stem = filename.replace(".ogg", "")
-        parts = stem.split("_")
-        
-        if len(parts) >= 3:
-            timestamp_str = parts[0] + parts[1]  # YYYYMMDDHHMMSS
-            timestamp = datetime.strptime(timestamp_str, "%Y%m%d%H%M%S")
-            
-            freq_str = parts[2].replace("_", ".")
-            freq_mhz = float(freq_str)
-            
-            label = "_".join(parts[3:]) if len(parts) > 3 else "unknown"
-            
-            return {
-                "timestamp": timestamp,
-                "freq_mhz": freq_mhz,
-                "label": label
-            }
-    except Exception as e:
-        logger.warning(f"Failed to parse filename {filename}: {e}")
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    return None
-
-@router.get("", response_model=List[Recording])
-async def list_recordings():
-    """List all recordings."""
-    try:
-        recordings = []
-        
-        if not RECORDINGS_DIR.exists():
-            return recordings
-        
-        for file_path in sorted(RECORDINGS_DIR.glob("*.ogg"), key=lambda p: p.stat().st_mtime, reverse=True):
-            try:
-                stat = file_path.stat()
-                metadata = parse_recording_filename(file_path.name)
-                
-                if metadata:
-                    # Get duration from file (simple approximation: size / bitrate)
-                    # 64 kbps = 8 KB/s, so duration ≈ file_size / 8000
-                    duration_seconds = stat.st_size / 8000
-                    
-                    recording = Recording(
-                        id=file_path.stem,
-                        freq_mhz=metadata["freq_mhz"],
-                        mode="nfm",  # Default, would need to parse from filename if stored
-                        start_time=metadata["timestamp"],
-                        end_time=metadata["timestamp"],  # Would need actual end time
-                        duration_seconds=duration_seconds,
-                        file_size_bytes=stat.st_size,
-                        file_path=file_path.name,
-                        label=metadata["label"]
-                    )
-                    recordings.append(recording)
-            except Exception as e:
-                logger.warning(f"Error processing recording {file_path}: {e}")
-        
-        return recordings
+    # The catalog generation changes on every write, so the ETag can be
+    # checked without running the query
+    query_key = str(sorted(request.query_params.multi_items()))
+    etag = '"{}-{}-{}"'.format(
+        recording_catalog.epoch,
+        recording_catalog.generation,
+        hashlib.sha1(query_key.encode()).hexdigest()[:16]
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     
+    try:
+        # SQLite blocks; keep it off the event loop (SSE and live audio share it)
+        recordings = await asyncio.to_thread(
+            recording_catalog.query,
+            freq_min=freq_min,
+            freq_max=freq_max,
+            label=label,
+            mode=mode.value if mode else None,
+            since=to_utc_naive(since),
+            until=to_utc_naive(until),
+            min_duration=min_duration,
+            after=after,
+            descending=order == "desc",
+            limit=limit
+        )
     except Exception as e:
         logger.error(f"Error listing recordings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    if len(recordings) == limit:
+        next_cursor = encode_cursor(recordings[-1])
+        params = dict(request.query_params)
+        params["cursor"] = next_cursor
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.path}?{urlencode(params)}>; rel="next"'
+    
+    return recordings
+
+def export_files(since: Optional[datetime], until: Optional[datetime]) -> Iterator[Tuple[Path, str]]:
+    """(path, archive name) of every finished recording in a time range, oldest first."""
+    after = None
+    while True:
+        page = recording_catalog.query(since=since, until=until, after=after,
+                                       descending=False, limit=MAX_PAGE_SIZE)
+        for recording in page:
+            if "_part" not in recording.id:
+                yield RECORDINGS_DIR / f"{recording.id}.ogg", f"{recording.id}.ogg"
+        if len(page) < MAX_PAGE_SIZE:
+            return
+        after = (page[-1].start_time, page[-1].id)
+
+@router.get("/export")
+async def export_recordings(
+    since: Optional[datetime] = Query(None, description="Recordings started at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Recordings started before this time (UTC)"),
+    format: str = Query("zip", pattern="^(zip|tar)$", description="Archive format")
+):
+    """Download the recordings of a time range as one archive.
+    
+    The archive is generated while it is sent, reading the catalog a page
+    at a time and each file in chunks; nothing is staged on disk.
+    """
+    since, until = to_utc_naive(since), to_utc_naive(until)
+    files = export_files(since, until)
+    if format == "tar":
+        body, media_type = iter_tar(files), "application/x-tar"
+    else:
+        body, media_type = iter_zip(files), "application/zip"
+    
+    name = "recordings"
+    if since:
+        name += f"_{since.strftime('%Y%m%d_%H%M%S')}"
+    if until:
+        name += f"_to_{until.strftime('%Y%m%d_%H%M%S')}"
+    logger.info(f"Exporting recordings as {format} (since={since}, until={until})")
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'}
+    )
 
-@router.get("/{recording_id}")
-async def get_recording(recording_id: str):
-    """Download a recording."""
+@router.post("/prune")
+async def prune_recordings():
+    """Run a retention pass now (scripts/prune_storage.sh calls this)."""
+    plan = await retention_manager.run()
+    return {
+        "status": "pruned",
+        "files": len(plan.files),
+        "expired": plan.expired,
+        "bytes": plan.bytes
+    }
+
+@router.api_route("/{recording_id}", methods=["GET", "HEAD"])
+async def get_recording(recording_id: str, request: Request):
+    """Download a recording.
+    
+    Supports HEAD, byte ranges (206) and conditional requests on a strong
+    ETag. Finished recordings may be cached by clients.
+    """
     file_path = RECORDINGS_DIR / f"{recording_id}.ogg"
+    cache_control = "no-cache" if "_part" in recording_id else FINALIZED_CACHE_CONTROL
     
-    if not file_path.exists():
+    try:
+        return file_response(request, file_path, "audio/ogg", cache_control, filename=file_path.name)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Recording not found")
+
+@router.get("/{recording_id}/peaks", response_model=RecordingPeaks)
+async def get_recording_peaks(recording_id: str, request: Request, response: Response):
+    """Waveform peaks of a recording, stored when it was finalized."""
+    data = await asyncio.to_thread(recording_catalog.get_peaks, recording_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="No peaks for this recording")
     
-    return FileResponse(
-        path=file_path,
-        media_type="audio/ogg",
-        filename=file_path.name
-    )
+    # Peaks never change once stored
+    etag = f'"{hashlib.sha1(data).hexdigest()[:16]}"'
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = FINALIZED_CACHE_CONTROL
+    
+    minimums, maximums = unpack_peaks(data)
+    return RecordingPeaks(id=recording_id, interval_seconds=PEAK_INTERVAL_SECONDS,
+                          min=minimums, max=maximums)
 
 @router.delete("/{recording_id}")
 async def delete_recording(recording_id: str):
     """Delete a recording."""
     file_path = RECORDINGS_DIR / f"{recording_id}.ogg"
     
-    if not file_path.exists():
+    catalogued = await asyncio.to_thread(recording_catalog.delete, recording_id)
+    if not catalogued and not file_path.exists():
         raise HTTPException(status_code=404, detail="Recording not found")
     
     try:
-        file_path.unlink()
+        file_path.unlink(missing_ok=True)
+        storage_accountant.remove_file(file_path)
         logger.info(f"Deleted recording: {recording_id}")
         return {"status": "deleted", "id": recording_id}
     except Exception as e:
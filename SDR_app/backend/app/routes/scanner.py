@@ -1,16 +1,18 @@
 """Scanner control routes."""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from backend.app.models import (
     ScanStartRequest, 
     Detection, 
+    ChannelActivity,
     FrequencyGroup,
-    ConfigUpdateRequest
+    ConfigUpdateRequest,
+    ScanStats
 )
 from backend.app.scanner.engine import scanner_engine
 from backend.app.frequency_groups import get_all_groups
 from backend.app.config import scanner_config, resource_thresholds
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 logger = logging.getLogger("uvicorn")
 router = APIRouter(prefix="/api/scanner", tags=["scanner"])
@@ -59,6 +61,25 @@ async def get_detections():
         logger.error(f"Error getting detections: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/activity", response_model=List[ChannelActivity])
+async def get_activity(limit: int = Query(20, ge=1, le=1000),
+                       window_seconds: Optional[float] = Query(3600, gt=0)):
+    """Get the busiest frequencies by hits in the last window_seconds."""
+    try:
+        return scanner_engine.activity.top(limit, window_seconds)
+    except Exception as e:
+        logger.error(f"Error getting activity: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stats", response_model=ScanStats)
+async def get_stats():
+    """Get scan throughput and recorder state."""
+    try:
+        return scanner_engine.get_stats()
+    except Exception as e:
+        logger.error(f"Error getting scanner stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/frequency-groups", response_model=Dict[str, FrequencyGroup])
 async def get_frequency_groups():
     """Get all available frequency groups."""
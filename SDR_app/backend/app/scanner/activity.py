@@ -0,0 +1,131 @@
+"""Compact per-frequency activity statistics with a time-bucketed history."""
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from backend.app.config import scanner_config
+
+# One row per frequency
+RECORD_DTYPE = np.dtype([
+    ("freq_hz", np.int64),
+    ("visits", np.uint32),  # Scans of the frequency
+    ("hits", np.uint32),  # Scans that found a signal
+    ("power_sum", np.float64),  # Sum of the signal power of hits (dB)
+    ("power_max", np.float32),
+    ("first_seen", np.float64),  # Unix time of the first hit (0 = never)
+    ("last_seen", np.float64),  # Unix time of the last hit (0 = never)
+])
+
+class ActivityStore:
+    """Activity of every scanned frequency, in preallocated NumPy arrays.
+    
+    Frequencies are keyed by integer Hz. Each row holds lifetime counters
+    plus a ring of hit counts per time bucket (by default 60 one-minute
+    buckets). Memory is fixed by max_frequencies; when full, the row of the
+    frequency that has been quiet the longest is reused.
+    """
+    
+    def __init__(self, max_frequencies: Optional[int] = None, bucket_seconds: Optional[float] = None,
+                 history_buckets: Optional[int] = None, clock=time.time):
+        self.max_frequencies = max_frequencies or scanner_config.activity_max_frequencies
+        self.bucket_seconds = bucket_seconds or scanner_config.activity_bucket_seconds
+        self.history_buckets = history_buckets or scanner_config.activity_history_buckets
+        self.clock = clock
+        self.records = np.zeros(self.max_frequencies, dtype=RECORD_DTYPE)
+        self.history = np.zeros((self.max_frequencies, self.history_buckets), dtype=np.uint16)
+        # Absolute bucket number held by each history column (-1 = unused)
+        self.bucket_ids = np.full(self.history_buckets, -1, dtype=np.int64)
+        self.rows: Dict[int, int] = {}  # freq_hz -> row
+        self.size = 0
+        self._lock = threading.Lock()
+    
+    def _row(self, freq_hz: int) -> int:
+        row = self.rows.get(freq_hz)
+        if row is not None:
+            return row
+        if self.size < self.max_frequencies:
+            row = self.size
+            self.size += 1
+        else:
+            row = int(np.argmin(self.records["last_seen"]))
+            del self.rows[int(self.records[row]["freq_hz"])]
+        self.records[row] = (freq_hz, 0, 0, 0.0, -np.inf, 0.0, 0.0)
+        self.history[row] = 0
+        self.rows[freq_hz] = row
+        return row
+    
+    def _column(self, now: float) -> int:
+        """History column for the current bucket, clearing it if it is new."""
+        bucket = int(now // self.bucket_seconds)
+        column = bucket % self.history_buckets
+        if self.bucket_ids[column] != bucket:
+            self.history[:, column] = 0
+            self.bucket_ids[column] = bucket
+        return column
+    
+    def record(self, freq_hz: int, has_signal: bool, power_db: Optional[float] = None):
+        """Count one scan of a frequency."""
+        now = self.clock()
+        with self._lock:
+            row = self._row(freq_hz)
+            record = self.records[row]
+            record["visits"] += 1
+            if not has_signal:
+                return
+            record["hits"] += 1
+            if power_db is not None:
+                record["power_sum"] += power_db
+                record["power_max"] = max(float(record["power_max"]), power_db)
+            if record["first_seen"] == 0:
+                record["first_seen"] = now
+            record["last_seen"] = now
+            column = self._column(now)
+            if self.history[row, column] < np.iinfo(np.uint16).max:
+                self.history[row, column] += 1
+    
+    def last_seen(self, freq_hz: int) -> Optional[float]:
+        """Unix time of the last hit on a frequency, if any."""
+        row = self.rows.get(freq_hz)
+        if row is None or self.records[row]["last_seen"] == 0:
+            return None
+        return float(self.records[row]["last_seen"])
+    
+    def recent_hits(self, seconds: float) -> np.ndarray:
+        """Hits per row over the last seconds (whole buckets)."""
+        now = self.clock()
+        current = int(now // self.bucket_seconds)
+        buckets = min(self.history_buckets, max(1, int(np.ceil(seconds / self.bucket_seconds))))
+        columns = np.flatnonzero(self.bucket_ids > current - buckets)
+        return self.history[:self.size][:, columns].sum(axis=1, dtype=np.int64)
+    
+    def top(self, count: int, seconds: Optional[float] = None) -> List[Dict]:
+        """The count busiest frequencies, by hits in the last seconds (or ever)."""
+        with self._lock:
+            if seconds is None:
+                hits = self.records["hits"][:self.size].astype(np.int64)
+            else:
+                hits = self.recent_hits(seconds)
+            busiest: List[Tuple[int, int]] = heapq.nlargest(
+                count, ((h, row) for row, h in enumerate(hits.tolist()) if h > 0)
+            )
+            return [self._describe(row, window_hits) for window_hits, row in busiest]
+    
+    def _describe(self, row: int, window_hits: int) -> Dict:
+        record = self.records[row]
+        visits, hits = int(record["visits"]), int(record["hits"])
+        return {
+            "freq_mhz": int(record["freq_hz"]) / 1e6,
+            "window_hits": window_hits,
+            "hits": hits,
+            "visits": visits,
+            "duty_cycle": hits / visits if visits else 0.0,
+            "mean_power_db": float(record["power_sum"]) / hits if hits else None,
+            "max_power_db": float(record["power_max"]) if hits else None,
+            "first_seen": float(record["first_seen"]) or None,
+            "last_seen": float(record["last_seen"]) or None,
+        }
+    
+    def memory_bytes(self) -> int:
+        """Size of the arrays (fixed at construction)."""
+        return self.records.nbytes + self.history.nbytes + self.bucket_ids.nbytes
@@ -1,80 +1,120 @@
 """Audio recording pipeline using rtl_fm and ffmpeg."""
 import subprocess
 import logging
-import os
+import threading
 import time
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import BinaryIO, Callable, Dict, List, Optional
 from backend.app.config import scanner_config, RECORDINGS_DIR
-from backend.app.models import FrequencyEntry, ModulationType
+from backend.app.metrics import subprocess_spawns
+from backend.app.models import FrequencyEntry
+from backend.app.scanner.live_audio import LiveAudioBuffer
+from backend.app.scanner.ogg import stitch_files
+from backend.app.scanner.pcm_source import PcmSource, create_pcm_source, pcm_seconds
+from backend.app.scanner.peaks import PeakMeter
+from backend.app.scanner.session_writer import OggSessionWriter, recover_session
+from backend.app.scanner.storage import storage_accountant
+from backend.app.scanner.tone_decoder import ToneDecoder
 
 logger = logging.getLogger("scanner")
 
+# Read size of the PCM pump (about 50 ms of audio)
+PCM_PUMP_BYTES = 4800
+
 class AudioPipeline:
     """Manage audio recording pipeline."""
     
-    def __init__(self):
-        self.rtl_fm_process: Optional[subprocess.Popen] = None
+    def __init__(self, device: Optional[int] = None,
+                 source_factory: Optional[Callable[[], PcmSource]] = None):
+        self.device = scanner_config.scanner_device if device is None else device
+        self.source_factory = source_factory  # Overrides the configured PCM source
+        self.pcm_source: Optional[PcmSource] = None
         self.ffmpeg_process: Optional[subprocess.Popen] = None
         self.current_recording_path: Optional[Path] = None
         self.recording_start_time: Optional[datetime] = None
+        self.live_buffer: Optional[LiveAudioBuffer] = None
+        self.session_writer: Optional[OggSessionWriter] = None
+        self.pcm_pump: Optional[threading.Thread] = None
+        self.freq_entry: Optional[FrequencyEntry] = None
+        self.tone_decoder: Optional[ToneDecoder] = None
+        self.peak_meter: Optional[PeakMeter] = None
     
-    def _get_rtl_fm_params(self, freq_entry: FrequencyEntry) -> list:
-        """Get rtl_fm parameters based on modulation."""
-        freq_hz = int(freq_entry.freq_mhz * 1e6)
-        
-        # Base parameters
-        params = [
-            "rtl_fm",
-            "-d", str(scanner_config.scanner_device),
-            "-f", str(freq_hz),
-            "-g", str(scanner_config.default_squelch_db),
-        ]
+    def _get_session_path(self, freq_entry: FrequencyEntry) -> Path:
+        """Path of the session file while it is being written.
         
-        # Modulation-specific parameters
-        if freq_entry.mode == ModulationType.NFM:
-            params.extend(["-M", "fm", "-s", "24k", "-r", "48k"])
-        elif freq_entry.mode == ModulationType.FM:
-            params.extend(["-M", "fm", "-s", "50k", "-r", "48k"])
-        elif freq_entry.mode == ModulationType.WFM:
-            params.extend(["-M", "wbfm", "-s", "200k", "-r", "48k"])
-        elif freq_entry.mode == ModulationType.AM:
-            params.extend(["-M", "am", "-s", "24k", "-r", "48k"])
-        else:
-            # Default to NFM
-            params.extend(["-M", "fm", "-s", "24k", "-r", "48k"])
-        
-        params.append("-")  # Output to stdout
-        return params
-    
-    def _get_chunk_path(self, freq_entry: FrequencyEntry, chunk_num: int) -> Path:
-        """Generate chunk file path."""
+        The _part000 suffix marks it as unfinished (the catalog and crash
+        recovery rely on it); finalizing just renames it.
+        """
         timestamp = self.recording_start_time.strftime("%Y%m%d_%H%M%S")
         freq_str = f"{freq_entry.freq_mhz:.4f}".replace('.', '_')
         label = freq_entry.label.replace(' ', '_') if freq_entry.label else "unknown"
-        filename = f"{timestamp}_{freq_str}_{label}_part{chunk_num:03d}.ogg"
+        filename = f"{timestamp}_{freq_str}_{label}_part000.ogg"
         return RECORDINGS_DIR / filename
     
-    def start_recording(self, freq_entry: FrequencyEntry) -> bool:
-        """Start recording on a frequency."""
+    def _pump_pcm(self, preroll: bytes, source: BinaryIO, sink: BinaryIO, pcm_source: PcmSource,
+                  tone_decoder: Optional[ToneDecoder], peak_meter: Optional[PeakMeter]):
+        """Feed the encoder the pre-roll, then the live PCM (runs in a thread).
+        
+        The squelch tone decoder and the peak meter see the same audio on
+        the way through.
+        """
+        buffer = bytearray(PCM_PUMP_BYTES)
+        view = memoryview(buffer)
+        taps = [tap for tap in (tone_decoder, peak_meter) if tap is not None]
         try:
-            self.recording_start_time = datetime.utcnow()
-            chunk_path = self._get_chunk_path(freq_entry, 0)
-            chunk_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Start rtl_fm
-            rtl_fm_params = self._get_rtl_fm_params(freq_entry)
-            logger.info(f"Starting rtl_fm: {' '.join(rtl_fm_params)}")
+            sink.write(preroll)
+            if preroll:
+                for tap in taps:
+                    tap.feed(preroll)
+            while True:
+                count = source.readinto(buffer)
+                if not count:
+                    break
+                sink.write(view[:count])
+                for tap in taps:
+                    tap.feed(view[:count])
+        except (OSError, ValueError):
+            # Encoder exited or the source was closed by stop_recording()
+            pass
+        finally:
+            try:
+                sink.close()
+            except OSError:
+                pass
+            pcm_source.release_output()
+    
+    def start_recording(self, freq_entry: FrequencyEntry, preroll: Optional[bytes] = None,
+                        tone_decoder: Optional[ToneDecoder] = None,
+                        peak_meter: Optional[PeakMeter] = None,
+                        start_time: Optional[datetime] = None) -> bool:
+        """Start recording on a frequency.
+        
+        preroll is PCM captured before the call (during detection); the
+        recording starts with it and continues with the live audio.
+        tone_decoder and peak_meter, if given, are fed the recorded PCM.
+        start_time, used for the file name, defaults to now minus the pre-roll.
+        """
+        try:
+            if start_time is None:
+                start_time = datetime.utcnow() - timedelta(seconds=pcm_seconds(preroll))
+            self.recording_start_time = start_time
+            self.freq_entry = freq_entry
+            self.tone_decoder = tone_decoder
+            self.peak_meter = peak_meter
+            pump = bool(preroll) or tone_decoder is not None or peak_meter is not None
+            session_path = self._get_session_path(freq_entry)
+            session_path.parent.mkdir(parents=True, exist_ok=True)
             
-            self.rtl_fm_process = subprocess.Popen(
-                ["nice", "-n", str(scanner_config.nice_level)] + rtl_fm_params,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                preexec_fn=os.setsid  # Create new process group
-            )
+            # Start demodulator
+            if self.source_factory:
+                self.pcm_source = self.source_factory()
+            else:
+                self.pcm_source = create_pcm_source(self.device)
+            pcm_stream = self.pcm_source.start(freq_entry)
             
-            # Start ffmpeg with Opus encoding
+            # Start ffmpeg with Opus encoding; it writes one Ogg stream to
+            # stdout and the session writer copies its pages to disk
             ffmpeg_params = [
                 "nice", "-n", str(scanner_config.nice_level),
                 "ionice", "-c", str(scanner_config.ionice_class),
@@ -87,24 +127,43 @@ class AudioPipeline:
                 "-c:a", "libopus",
                 "-b:a", f"{scanner_config.opus_bitrate_kbps}k",
                 "-ac", "2",  # Stereo output
-                "-f", "segment",
-                "-segment_time", str(scanner_config.chunk_duration_seconds),
-                "-segment_format", "ogg",
-                "-reset_timestamps", "1",
-                str(chunk_path).replace("_part000.ogg", "_part%03d.ogg")
+                "-f", "ogg",
+                "-page_duration", str(scanner_config.live_page_duration_ms * 1000),
+                "-flush_packets", "1",
+                "pipe:1"
             ]
             
             logger.info(f"Starting ffmpeg: {' '.join(ffmpeg_params)}")
             
             self.ffmpeg_process = subprocess.Popen(
                 ffmpeg_params,
-                stdin=self.rtl_fm_process.stdout,
+                stdin=subprocess.PIPE if pump else pcm_stream,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+                stderr=subprocess.DEVNULL,
+                bufsize=0
+            )
+            subprocess_spawns.labels("ffmpeg").inc()
+            if pump:
+                # Pre-roll first, then copy the demodulator's output
+                self.pcm_pump = threading.Thread(
+                    target=self._pump_pcm,
+                    args=(preroll or b"", pcm_stream, self.ffmpeg_process.stdin, self.pcm_source,
+                          tone_decoder, peak_meter),
+                    daemon=True
+                )
+                self.pcm_pump.start()
+            else:
+                self.pcm_source.release_output()
+            
+            if scanner_config.live_audio_enabled:
+                self.live_buffer = LiveAudioBuffer(scanner_config.live_buffer_pages)
+            self.session_writer = OggSessionWriter(
+                session_path, self.live_buffer, scanner_config.session_flush_seconds
             )
+            self.session_writer.start(self.ffmpeg_process.stdout)
             
-            self.current_recording_path = chunk_path
-            logger.info(f"Recording started: {freq_entry.freq_mhz} MHz -> {chunk_path.parent}")
+            self.current_recording_path = session_path
+            logger.info(f"Recording started: {freq_entry.freq_mhz} MHz -> {session_path}")
             return True
             
         except Exception as e:
@@ -113,7 +172,7 @@ class AudioPipeline:
             return False
     
     def stop_recording(self) -> Optional[list[Path]]:
-        """Stop recording and return list of chunk files."""
+        """Stop recording and return the session file (as a one-item list)."""
         chunk_files = []
         
         try:
@@ -127,34 +186,44 @@ class AudioPipeline:
                     self.ffmpeg_process.wait()
                 self.ffmpeg_process = None
             
-            # Stop rtl_fm
-            if self.rtl_fm_process:
-                try:
-                    self.rtl_fm_process.terminate()
-                    self.rtl_fm_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    self.rtl_fm_process.kill()
-                    self.rtl_fm_process.wait()
-                self.rtl_fm_process = None
+            # Stop demodulator
+            if self.pcm_source:
+                self.pcm_source.stop()
+                self.pcm_source = None
+            if self.pcm_pump:
+                self.pcm_pump.join(timeout=2)
+                self.pcm_pump = None
             
-            # Find all chunk files
-            if self.current_recording_path:
-                pattern = self.current_recording_path.stem.rsplit('_part', 1)[0] + "_part*.ogg"
-                chunk_files = sorted(self.current_recording_path.parent.glob(pattern))
-                logger.info(f"Recording stopped: {len(chunk_files)} chunks created")
+            # Wait for the writer to copy the final pages
+            if self.session_writer:
+                if not self.session_writer.join(timeout=5):
+                    logger.warning(f"Session writer still running for {self.current_recording_path}")
+                if self.current_recording_path and self.current_recording_path.exists():
+                    chunk_files = [self.current_recording_path]
+                    storage_accountant.add_files(chunk_files)
+                    logger.info(f"Recording stopped: {self.session_writer.bytes_written} bytes "
+                                f"in {self.session_writer.pages_written} pages")
             
         except Exception as e:
             logger.error(f"Error stopping recording: {e}")
         
         finally:
+            if self.live_buffer:
+                # The writer also closes it at EOF; this covers a failed start
+                self.live_buffer.close()
+                self.live_buffer = None
+            self.session_writer = None
             self.current_recording_path = None
             self.recording_start_time = None
+            self.freq_entry = None
+            self.tone_decoder = None
+            self.peak_meter = None
         
         return chunk_files if chunk_files else None
     
     def is_recording(self) -> bool:
         """Check if currently recording."""
-        return self.rtl_fm_process is not None and self.rtl_fm_process.poll() is None
+        return self.pcm_source is not None and self.pcm_source.is_running()
 
 def assemble_session(chunk_files: list[Path], output_path: Path) -> bool:
     """Assemble chunks into a single session file."""
@@ -162,36 +231,54 @@ def assemble_session(chunk_files: list[Path], output_path: Path) -> bool:
         if len(chunk_files) == 1:
             # Single chunk, just rename
             chunk_files[0].rename(output_path)
+            storage_accountant.remove_file(chunk_files[0])
+            storage_accountant.add_file(output_path)
             logger.info(f"Single chunk session: {output_path}")
             return True
         
-        # Multiple chunks, use ffmpeg concat
-        concat_list = output_path.parent / f"concat_{output_path.stem}.txt"
-        with open(concat_list, 'w') as f:
-            for chunk in chunk_files:
-                f.write(f"file '{chunk.absolute()}'\n")
-        
-        # Concat without re-encoding
-        result = subprocess.run([
-            "ffmpeg",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", str(concat_list),
-            "-c", "copy",
-            str(output_path)
-        ], capture_output=True, timeout=30)
+        # Multiple chunks: stitch their pages into one stream
+        start = time.monotonic()
+        pages = stitch_files(chunk_files, output_path)
+        for chunk in chunk_files:
+            chunk.unlink()
+        storage_accountant.remove_files(chunk_files)
+        storage_accountant.add_file(output_path)
+        logger.info(f"Session assembled: {output_path} ({len(chunk_files)} chunks, {pages} pages "
+                    f"rewritten in {(time.monotonic() - start) * 1000:.1f} ms)")
+        return True
         
-        if result.returncode == 0:
-            # Remove chunks and concat list
-            for chunk in chunk_files:
-                chunk.unlink()
-            concat_list.unlink()
-            logger.info(f"Session assembled: {output_path}")
-            return True
-        else:
-            logger.error(f"Failed to assemble session: {result.stderr.decode()}")
-            return False
-            
     except Exception as e:
         logger.error(f"Error assembling session: {e}")
+        # Keep the chunks and drop any partial output
+        if len(chunk_files) > 1 and all(chunk.exists() for chunk in chunk_files):
+            output_path.unlink(missing_ok=True)
         return False
+
+def recover_sessions(directory: Path = RECORDINGS_DIR) -> List[Path]:
+    """Finalize sessions left unfinished by a crash; returns the session files.
+    
+    Call before any recording starts. Sessions from the old segmenting
+    pipeline (several chunks) are assembled as usual.
+    """
+    sessions: Dict[str, List[Path]] = {}
+    for file_path in Path(directory).glob("*_part*.ogg"):
+        sessions.setdefault(file_path.name.rsplit('_part', 1)[0], []).append(file_path)
+    
+    recovered = []
+    for name, chunk_files in sessions.items():
+        chunk_files.sort()
+        session_path = chunk_files[0].parent / f"{name}.ogg"
+        try:
+            if len(chunk_files) == 1:
+                ok = recover_session(chunk_files[0], session_path)
+            else:
+                ok = assemble_session(chunk_files, session_path)
+        except Exception as e:
+            logger.error(f"Failed to recover session {name}: {e}")
+            continue
+        if ok:
+            recovered.append(session_path)
+    
+    if recovered:
+        logger.info(f"Recovered {len(recovered)} unfinished sessions")
+    return recovered
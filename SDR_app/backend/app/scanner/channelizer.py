@@ -0,0 +1,335 @@
+"""FFT channelizer: record several narrowband channels from one wideband IQ stream."""
+import logging
+import os
+import threading
+from typing import BinaryIO, Dict, List, Optional, Tuple
+import numpy as np
+from backend.app.config import scanner_config
+from backend.app.models import FrequencyEntry, ModulationType
+from backend.app.scanner.demod import AUDIO_SAMPLE_RATE, MODE_DEVIATION_HZ, lowpass_taps
+from backend.app.scanner.iq_source import IQSource
+from backend.app.scanner.pcm_source import PcmSource
+from backend.app.scanner.sweep_detector import MODE_BANDWIDTH_HZ, Passband
+
+logger = logging.getLogger("scanner")
+
+# Audio buffered per listener pipe before blocks are dropped
+MAX_PENDING_BYTES = AUDIO_SAMPLE_RATE * 2
+
+def channelizer_sizes(sample_rate: int, audio_rate: int = AUDIO_SAMPLE_RATE) -> Tuple[int, int]:
+    """FFT sizes (input N, channel M) with sample_rate * M / N == audio_rate.
+    
+    Both are multiples of 8 so an eighth of each frame can be trimmed at
+    either end.
+    """
+    for channel_size in range(256, 2049, 8):
+        fft_size, remainder = divmod(sample_rate * channel_size, audio_rate)
+        if remainder == 0 and fft_size % 8 == 0:
+            return fft_size, channel_size
+    raise ValueError(f"No channelizer FFT size for {sample_rate} S/s at {audio_rate} Hz audio")
+
+class FFTChannelizer:
+    """Overlap-save FFT filter bank with per-channel NFM/AM demodulation.
+    
+    Each frame of N input samples is transformed once. Every channel then
+    takes the M bins around its centre, weighted by a low-pass prototype,
+    and an M-point inverse FFT gives its baseband directly at the audio
+    rate. All channels are filtered, tuned and demodulated together as
+    2-D arrays, so the cost per channel is small.
+    """
+    
+    def __init__(self, sample_rate: int, offsets_hz: List[float], bandwidths_hz: List[float],
+                 modes: List[ModulationType], audio_rate: int = AUDIO_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.audio_rate = audio_rate
+        self.fft_size, self.channel_size = channelizer_sizes(sample_rate, audio_rate)
+        self.overlap = self.fft_size // 4
+        self.step = self.fft_size - self.overlap
+        # The filter is zero-phase, so circular wrap-around spoils an eighth
+        # of each frame at both ends
+        self.trim = self.channel_size // 8
+        
+        offsets = np.asarray(offsets_hz, dtype=np.float64)
+        bin_hz = sample_rate / self.fft_size
+        self.centre_bins = np.round(offsets / bin_hz).astype(np.int64)
+        # What is left after bin-aligned extraction is removed with a fine mixer
+        self.residual_hz = offsets - self.centre_bins * bin_hz
+        
+        # Bin indices in inverse-FFT order (channel centre first)
+        relative = np.fft.ifftshift(np.arange(self.channel_size) - self.channel_size // 2)
+        self.bins = (self.centre_bins[:, None] + relative[None, :]) % self.fft_size
+        
+        # Frequency response of each channel's low-pass prototype; the
+        # M/N factor undoes the size change between the two transforms
+        self.weights = np.empty((len(offsets), self.channel_size), dtype=np.complex64)
+        self.in_band = np.zeros((len(offsets), self.channel_size), dtype=bool)
+        for index, bandwidth in enumerate(bandwidths_hz):
+            # Odd length: an integer group delay, so the zero-phase filter
+            # spans at most an eighth of the frame either side
+            taps = lowpass_taps(bandwidth / 2, sample_rate, self.overlap - 1, "blackman")
+            response = np.fft.fft(taps, self.fft_size)[relative % self.fft_size]
+            # Undo the prototype's group delay so its phase is flat
+            delay = (len(taps) - 1) / 2
+            response *= np.exp(2j * np.pi * (relative % self.fft_size) * delay / self.fft_size)
+            self.weights[index] = response * (self.channel_size / self.fft_size)
+            self.in_band[index] = np.abs(relative) * bin_hz <= bandwidth / 2
+        # Noise power a channel collects, in bins (for SNR against the median bin)
+        self.noise_bins = np.maximum(1, self.in_band.sum(axis=1))
+        
+        self.modes = list(modes)
+        self.am_rows = np.array([m == ModulationType.AM for m in modes], dtype=bool)
+        deviation = np.array([MODE_DEVIATION_HZ.get(m, MODE_DEVIATION_HZ[ModulationType.NFM]) for m in modes])
+        self.fm_gain = (audio_rate / (2 * np.pi * deviation) * 0.5).astype(np.float32)
+        
+        self._pending = np.zeros(0, dtype=np.complex64)
+        self._frame_start = 0  # Input index of the next frame, modulo N
+        self._output_index = 0  # Audio samples produced per channel
+        self._last = np.ones(len(offsets), dtype=np.complex64)
+        self._dc: Optional[np.ndarray] = None
+    
+    def process(self, iq: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Channelize and demodulate a block of IQ.
+        
+        Returns (pcm, power_dbfs, snr_db): pcm is int16 with one row per
+        channel. power_dbfs is each channel's filtered power (a full-scale
+        tone reads 0 dBFS) and snr_db compares it with the noise a channel
+        of that bandwidth would collect, taken from the median FFT bin.
+        """
+        samples = np.concatenate((self._pending, iq)) if len(self._pending) else iq
+        frames = (len(samples) - self.overlap) // self.step if len(samples) >= self.fft_size else 0
+        channels = len(self.centre_bins)
+        if frames <= 0:
+            self._pending = samples
+            return np.zeros((channels, 0), dtype=np.int16), np.full(channels, -200.0), np.full(channels, -200.0)
+        
+        starts = np.arange(frames) * self.step
+        index = starts[:, None] + np.arange(self.fft_size)[None, :]
+        spectrum = np.fft.fft(samples[index], axis=1)
+        self._pending = samples[frames * self.step:]
+        
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        noise_floor = max(float(np.median(power)) / self.fft_size ** 2, 1e-20)
+        
+        # (frames, channels, M) -> baseband at the audio rate
+        baseband = np.fft.ifft(spectrum[:, self.bins] * self.weights[None, :, :], axis=2)
+        # Each frame restarts the bin shift; rotate it to follow on from the last
+        frame_phase = np.exp(-2j * np.pi * np.outer((self._frame_start + starts) % self.fft_size,
+                                                    self.centre_bins) / self.fft_size)
+        baseband = baseband[:, :, self.trim:self.channel_size - self.trim] * frame_phase[:, :, None]
+        baseband = baseband.transpose(1, 0, 2).reshape(channels, -1).astype(np.complex64)
+        self._frame_start = (self._frame_start + frames * self.step) % self.fft_size
+        channel_power = (baseband.real ** 2 + baseband.imag ** 2).mean(axis=1)
+        
+        # Fine tuning for the part of each offset that is not bin-aligned
+        n = self._output_index + np.arange(baseband.shape[1])
+        self._output_index += baseband.shape[1]
+        baseband *= np.exp(-2j * np.pi * np.outer(self.residual_hz, n) / self.audio_rate).astype(np.complex64)
+        
+        audio = np.empty(baseband.shape, dtype=np.float32)
+        fm = ~self.am_rows
+        if fm.any():
+            rows = baseband[fm]
+            previous = np.concatenate((self._last[fm, None], rows[:, :-1]), axis=1)
+            audio[fm] = np.angle(rows * np.conj(previous)) * self.fm_gain[fm, None]
+        if self.am_rows.any():
+            envelope = np.abs(baseband[self.am_rows])
+            # Track the carrier level to remove it, starting from the first block
+            level = envelope.mean(axis=1)
+            if self._dc is None:
+                self._dc = level
+            else:
+                self._dc += 0.2 * (level - self._dc)
+            audio[self.am_rows] = (envelope - self._dc[:, None]) * 2.0
+        self._last = baseband[:, -1].copy()
+        
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        power_dbfs = 10 * np.log10(np.maximum(channel_power, 1e-20))
+        snr_db = power_dbfs - 10 * np.log10(noise_floor * self.noise_bins)
+        return pcm, power_dbfs, snr_db
+
+class _Tap:
+    """A pipe carrying one channel's PCM to an encoder."""
+    __slots__ = ("read_file", "write_fd", "pending", "dropped_bytes")
+    
+    def __init__(self):
+        read_fd, self.write_fd = os.pipe()
+        os.set_blocking(self.write_fd, False)
+        self.read_file: BinaryIO = os.fdopen(read_fd, "rb", buffering=0)
+        self.pending = b""
+        self.dropped_bytes = 0
+    
+    def write(self, pcm: bytes) -> bool:
+        """Queue audio without blocking; False once the reader has gone."""
+        data = self.pending + pcm
+        try:
+            written = os.write(self.write_fd, data)
+        except BlockingIOError:
+            written = 0
+        except (BrokenPipeError, OSError):
+            return False
+        rest = data[written:]
+        if len(rest) > MAX_PENDING_BYTES:
+            # The encoder is not keeping up: drop whole samples, never stall the channelizer
+            keep = len(rest) % 2
+            self.dropped_bytes += len(rest) - keep
+            rest = rest[:keep]
+        self.pending = rest
+        return True
+    
+    def close(self):
+        try:
+            os.close(self.write_fd)
+        except OSError:
+            pass
+
+class ChannelMonitor:
+    """Run the channelizer over one passband in a background thread.
+    
+    Every narrowband entry of the passband is measured on every block; the
+    engine polls the strongest reading since its last poll. Recordings
+    subscribe to a channel through a tap (see ChannelPcmSource).
+    """
+    
+    def __init__(self, source: IQSource, block_seconds: float = 0.05):
+        self.source = source
+        self.block_seconds = block_seconds
+        self.passband: Optional[Passband] = None
+        self.entries: List[FrequencyEntry] = []
+        self.blocks = 0
+        self._channel_index: Dict[float, int] = {}
+        self._taps: Dict[float, _Tap] = {}
+        self._peak_snr: Optional[np.ndarray] = None
+        self._peak_power: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def tune(self, passband: Passband):
+        """Start monitoring a passband (blocking while the old one stops)."""
+        self.stop()
+        narrow = [e for e in passband.entries
+                  if MODE_BANDWIDTH_HZ.get(e.mode, 12500) <= AUDIO_SAMPLE_RATE * 0.8]
+        skipped = len(passband.entries) - len(narrow)
+        if skipped:
+            logger.warning(f"Channelizer skips {skipped} wideband channel(s) at {passband.center_freq_hz / 1e6:.4f} MHz")
+        
+        channelizer = FFTChannelizer(
+            passband.sample_rate,
+            [e.freq_mhz * 1e6 - passband.center_freq_hz for e in narrow],
+            [MODE_BANDWIDTH_HZ.get(e.mode, 12500) for e in narrow],
+            [e.mode for e in narrow]
+        )
+        with self._lock:
+            self.passband = passband
+            self.entries = narrow
+            self._channel_index = {e.freq_mhz: i for i, e in enumerate(narrow)}
+            self._peak_snr = np.full(len(narrow), -200.0)
+            self._peak_power = np.full(len(narrow), -200.0)
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(channelizer, passband), daemon=True)
+        self._thread.start()
+        logger.info(f"Channelizer on {len(narrow)} channels at {passband.center_freq_hz / 1e6:.4f} MHz "
+                    f"(FFT {channelizer.fft_size}/{channelizer.channel_size})")
+    
+    def _run(self, channelizer: FFTChannelizer, passband: Passband):
+        block_samples = int(passband.sample_rate * self.block_seconds)
+        stream = self.source.stream_iq(passband.center_freq_hz, passband.sample_rate, block_samples)
+        try:
+            for iq in stream:
+                if self._stop.is_set():
+                    break
+                pcm, power, snr = channelizer.process(iq)
+                if pcm.shape[1] == 0:
+                    continue
+                self.blocks += 1
+                with self._lock:
+                    np.maximum(self._peak_snr, snr, out=self._peak_snr)
+                    np.maximum(self._peak_power, power, out=self._peak_power)
+                    taps = [(freq, tap, self._channel_index[freq]) for freq, tap in self._taps.items()]
+                for freq, tap, index in taps:
+                    if not tap.write(pcm[index].astype("<i2").tobytes()):
+                        self.close_tap(freq)
+        except Exception as e:
+            logger.error(f"Channelizer stopped: {e}", exc_info=True)
+        finally:
+            stream.close()
+            with self._lock:
+                taps = list(self._taps.values())
+                self._taps = {}
+            for tap in taps:
+                tap.close()
+    
+    def poll(self) -> Dict[float, Tuple[bool, float]]:
+        """Per-entry (has_signal, strength_dbfs) since the last poll."""
+        with self._lock:
+            if self._peak_snr is None:
+                return {}
+            snr = self._peak_snr.copy()
+            power = self._peak_power.copy()
+            self._peak_snr.fill(-200.0)
+            self._peak_power.fill(-200.0)
+            entries = self.entries
+        
+        threshold = scanner_config.sweep_snr_threshold_db
+        return {e.freq_mhz: (bool(snr[i] >= threshold), float(power[i])) for i, e in enumerate(entries)}
+    
+    def open_tap(self, freq_mhz: float) -> BinaryIO:
+        """Subscribe to a channel's PCM; returns the read end of its pipe."""
+        with self._lock:
+            if freq_mhz not in self._channel_index or not self.is_running():
+                raise ValueError(f"{freq_mhz} MHz is not in the monitored passband")
+            old = self._taps.pop(freq_mhz, None)
+            tap = _Tap()
+            self._taps[freq_mhz] = tap
+        if old:
+            old.close()
+        return tap.read_file
+    
+    def close_tap(self, freq_mhz: float):
+        """Stop feeding a channel's pipe (its reader sees end of stream)."""
+        with self._lock:
+            tap = self._taps.pop(freq_mhz, None)
+        if tap:
+            if tap.dropped_bytes:
+                logger.warning(f"Channel {freq_mhz} MHz: encoder fell behind, dropped {tap.dropped_bytes} bytes")
+            tap.close()
+    
+    def has_tap(self, freq_mhz: float) -> bool:
+        return freq_mhz in self._taps
+    
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def stop(self):
+        """Stop the channelizer thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+class ChannelPcmSource(PcmSource):
+    """PCM for one channel of the running channelizer."""
+    
+    def __init__(self, monitor: ChannelMonitor):
+        self.monitor = monitor
+        self.freq_mhz: Optional[float] = None
+        self._output: Optional[BinaryIO] = None
+    
+    def start(self, freq_entry: FrequencyEntry) -> BinaryIO:
+        self.freq_mhz = freq_entry.freq_mhz
+        self._output = self.monitor.open_tap(freq_entry.freq_mhz)
+        return self._output
+    
+    def release_output(self):
+        if self._output:
+            self._output.close()
+            self._output = None
+    
+    def stop(self):
+        if self.freq_mhz is not None:
+            self.monitor.close_tap(self.freq_mhz)
+        self.release_output()
+    
+    def is_running(self) -> bool:
+        return self.freq_mhz is not None and self.monitor.has_tap(self.freq_mhz)
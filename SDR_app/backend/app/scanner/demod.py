@@ -0,0 +1,151 @@
+"""Vectorized demodulation of narrowband channels from IQ blocks."""
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from backend.app.models import ModulationType
+
+AUDIO_SAMPLE_RATE = 48000
+FILTER_TAPS = 64
+
+# Peak FM deviation mapped to half of full scale
+MODE_DEVIATION_HZ = {
+    ModulationType.NFM: 2500,
+    ModulationType.FM: 5000,
+    ModulationType.WFM: 75000,
+}
+
+@lru_cache(maxsize=16)
+def lowpass_taps(cutoff_hz: float, sample_rate: float, num_taps: int = FILTER_TAPS,
+                 window: str = "hamming") -> np.ndarray:
+    """Windowed-sinc low-pass filter, unity gain at DC.
+    
+    window is "hamming" or "blackman" (wider transition, deeper stopband).
+    """
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    shape = np.blackman(num_taps) if window == "blackman" else np.hamming(num_taps)
+    taps = np.sinc(2 * cutoff_hz / sample_rate * n) * shape
+    return (taps / taps.sum()).astype(np.float32)
+
+class Demodulator:
+    """Demodulate one channel of an IQ stream to 48 kHz int16 PCM.
+    
+    The channel sits offset_hz from the tuned centre. Blocks are processed
+    in order and all state (mixer phase, filter history, resampler
+    position) carries over, so consecutive blocks give continuous audio.
+    """
+    
+    def __init__(self, mode: ModulationType, sample_rate: int, offset_hz: float,
+                 bandwidth_hz: float, audio_rate: int = AUDIO_SAMPLE_RATE):
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.offset_hz = offset_hz
+        self.audio_rate = audio_rate
+        # Decimate as far as the channel allows before demodulating
+        self.decimation = max(1, int(sample_rate // max(audio_rate, 2 * bandwidth_hz)))
+        self.if_rate = sample_rate / self.decimation
+        self.taps = lowpass_taps(bandwidth_hz / 2, sample_rate)
+        deviation = MODE_DEVIATION_HZ.get(mode, MODE_DEVIATION_HZ[ModulationType.NFM])
+        self.fm_gain = self.if_rate / (2 * np.pi * deviation) * 0.5
+        self.reset()
+    
+    def reset(self):
+        """Forget all stream state (e.g. after retuning)."""
+        self._sample_index = 0
+        self._history = np.zeros(len(self.taps) - 1, dtype=np.complex64)
+        self._skip = 0  # Input samples to skip before the next decimated output
+        self._last_if = np.complex64(1)
+        self._dc = 0.0
+        self._resample_pos = 0.0
+        self._last_audio = np.float32(0)
+    
+    def _mix_and_decimate(self, iq: np.ndarray) -> np.ndarray:
+        """Shift the channel to DC, low-pass and keep every decimation-th sample."""
+        n = self._sample_index + np.arange(len(iq))
+        self._sample_index += len(iq)
+        mixer = np.exp(-2j * np.pi * self.offset_hz / self.sample_rate * n).astype(np.complex64)
+        samples = np.concatenate((self._history, iq * mixer))
+        self._history = samples[len(samples) - len(self._history):]
+        
+        # Only the outputs that survive decimation are computed
+        windows = sliding_window_view(samples, len(self.taps))[self._skip::self.decimation]
+        consumed = self._skip + len(windows) * self.decimation
+        self._skip = consumed - (len(samples) - len(self.taps) + 1)
+        return windows @ self.taps[::-1]
+    
+    def _demodulate(self, baseband: np.ndarray) -> np.ndarray:
+        """Baseband samples to audio in [-1, 1] at the IF rate."""
+        if len(baseband) == 0:
+            return np.zeros(0, dtype=np.float32)
+        if self.mode == ModulationType.AM:
+            envelope = np.abs(baseband)
+            # Slow DC tracker removes the carrier level
+            self._dc += 0.05 * (float(envelope.mean()) - self._dc)
+            return ((envelope - self._dc) * 2.0).astype(np.float32)
+        
+        previous = np.concatenate(([self._last_if], baseband[:-1]))
+        self._last_if = baseband[-1]
+        return (np.angle(baseband * np.conj(previous)) * self.fm_gain).astype(np.float32)
+    
+    def _resample(self, audio: np.ndarray) -> np.ndarray:
+        """Linear-interpolate from the IF rate to the audio rate."""
+        if self.if_rate == self.audio_rate or len(audio) == 0:
+            return audio
+        step = self.if_rate / self.audio_rate
+        # Positions are relative to the last sample of the previous block
+        source = np.concatenate(([self._last_audio], audio))
+        positions = np.arange(self._resample_pos, len(audio), step)
+        self._resample_pos = (positions[-1] + step - len(audio)) if len(positions) else self._resample_pos - len(audio)
+        self._last_audio = audio[-1]
+        return np.interp(positions, np.arange(len(source)), source).astype(np.float32)
+    
+    def process(self, iq: np.ndarray) -> np.ndarray:
+        """Demodulate one IQ block; returns int16 PCM at the audio rate."""
+        audio = self._resample(self._demodulate(self._mix_and_decimate(iq)))
+        return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+class PcmRingBuffer:
+    """Fixed-size ring of the most recent int16 PCM samples.
+    
+    The storage is allocated once; writes copy into it in place.
+    """
+    
+    def __init__(self, seconds: float, sample_rate: int = AUDIO_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.buffer = np.zeros(max(1, int(seconds * sample_rate)), dtype=np.int16)
+        self.position = 0  # Next write index
+        self.filled = 0
+        self.tag: Optional[int] = None  # What the audio belongs to (e.g. frequency in Hz)
+    
+    def clear(self, tag: Optional[int] = None):
+        self.position = 0
+        self.filled = 0
+        self.tag = tag
+    
+    def write(self, samples: np.ndarray):
+        size = len(self.buffer)
+        if len(samples) >= size:
+            self.buffer[:] = samples[-size:]
+            self.position = 0
+            self.filled = size
+            return
+        end = self.position + len(samples)
+        if end <= size:
+            self.buffer[self.position:end] = samples
+        else:
+            first = size - self.position
+            self.buffer[self.position:] = samples[:first]
+            self.buffer[:end - size] = samples[first:]
+        self.position = end % size
+        self.filled = min(size, self.filled + len(samples))
+    
+    def seconds(self) -> float:
+        return self.filled / self.sample_rate
+    
+    def to_bytes(self) -> bytes:
+        """The buffered samples, oldest first, as s16le bytes."""
+        start = (self.position - self.filled) % len(self.buffer)
+        if start + self.filled <= len(self.buffer):
+            return self.buffer[start:start + self.filled].astype("<i2").tobytes()
+        return (self.buffer[start:].astype("<i2").tobytes()
+                + self.buffer[:self.position].astype("<i2").tobytes())
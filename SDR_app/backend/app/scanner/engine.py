@@ -8,14 +8,30 @@ from typing import List, Dict, Optional
 from collections import defaultdict
 
 from backend.app.config import scanner_config, throttle_state, RECORDINGS_DIR
-from backend.app.models import FrequencyEntry, Detection, ModulationType
-from backend.app.frequency_groups import get_all_groups, get_group
-from backend.app.scanner.audio_pipeline import AudioPipeline, assemble_session
+from backend.app.models import FrequencyEntry, Detection, ModulationType, ScanStats
+from backend.app.events import event_bus
+from backend.app.metrics import scan_hops, scan_hop_seconds, scan_pass_seconds, scan_stage_seconds
+from backend.app.scanner.activity import ActivityStore
+from backend.app.scanner.occupancy import occupancy_store
+from backend.app.scanner.channelizer import ChannelMonitor, ChannelPcmSource
+from backend.app.scanner.frequency_plan import FrequencyPlan, plan_cache
+from backend.app.scanner.recorder import RecordingManager
 from backend.app.scanner.resource_monitor import resource_monitor
 from backend.app.scanner.signal_detector import SignalDetector
+from backend.app.scanner.sweep_detector import SweepDetector, Passband
+from backend.app.scanner.iq_source import IQSource, create_iq_source
+from backend.app.scanner.scheduler import ScanScheduler, create_scheduler
 
 logger = logging.getLogger("scanner")
 
+# Detections not seen for this long are no longer active
+DETECTION_ACTIVE_SECONDS = 60
+
+# Stage timers of the scan loop
+_stage_detect = scan_stage_seconds.labels("detect")
+_stage_dwell = scan_stage_seconds.labels("dwell")
+_stage_scan_delay = scan_stage_seconds.labels("scan_delay")
+
 class ScannerEngine:
     """Main scanner engine."""
     
@@ -23,12 +39,27 @@ class ScannerEngine:
         self.running = False
         self.scan_task: Optional[asyncio.Task] = None
         self.frequency_list: List[FrequencyEntry] = []
-        self.detections: Dict[float, Detection] = {}  # freq_mhz -> Detection
-        self.audio_pipeline = AudioPipeline()
+        self.plan: Optional[FrequencyPlan] = None
+        self.detections: Dict[float, Detection] = {}  # freq_mhz -> Detection, active ones only, oldest last_seen first
+        self.activity = ActivityStore()  # Per-frequency statistics, kept across scans
+        self.active_detections: set = set()  # freq_mhz with a detection_end still to publish
+        self.tone_rejected: Dict[float, datetime] = {}  # freq_mhz -> last hit of a tone-squelched signal
+        self.recording_manager = RecordingManager(on_finalized=self._on_session_finalized)
         self.signal_detector = SignalDetector()
-        self.current_freq_index = 0
-        self.recording_freq: Optional[float] = None
-        self.recording_start_time: Optional[datetime] = None
+        self.iq_source: Optional[IQSource] = None  # Opened per scan
+        self.sweep_detector: Optional[SweepDetector] = None
+        self.passbands: List[Passband] = []
+        self.channel_monitor: Optional[ChannelMonitor] = None  # Channelizer mode only
+        self.passband_since = 0.0  # When the channelizer last tuned or saw activity
+        self.scheduler: ScanScheduler = create_scheduler()
+        self.current_passband_index = 0
+        
+        # Throughput counters (monotonic seconds)
+        self.hops_total = 0
+        self.scan_seconds = 0.0
+        self.hops_during_finalize = 0
+        self.finalize_seconds = 0.0
+        self.pass_started = 0.0
     
     async def start_scan(self, 
                         frequency_groups: List[str],
@@ -40,39 +71,71 @@ class ScannerEngine:
             logger.warning("Scanner already running")
             return False
         
-        # Build frequency list from groups
-        self.frequency_list = []
-        all_groups = get_all_groups()
-        
-        for group_name in frequency_groups:
-            if group_name in all_groups:
-                group = all_groups[group_name]
-                self.frequency_list.extend(group.frequencies)
-                logger.info(f"Added {len(group.frequencies)} frequencies from {group_name}")
-            else:
-                logger.warning(f"Unknown frequency group: {group_name}")
-        
-        # Add custom frequencies
-        self.frequency_list.extend(custom_frequencies)
-        
-        if not self.frequency_list:
-            logger.error("No frequencies to scan")
-            return False
-        
-        logger.info(f"Starting scan with {len(self.frequency_list)} frequencies")
-        
         # Apply config overrides
         if dwell_seconds is not None:
             scanner_config.default_dwell_seconds = dwell_seconds
         if squelch_db is not None:
             scanner_config.default_squelch_db = squelch_db
         
+        # Deduplicated frequency list from the groups and custom entries
+        plan = plan_cache.get(frequency_groups, custom_frequencies)
+        for group_name in plan.unknown_groups:
+            logger.warning(f"Unknown frequency group: {group_name}")
+        if not plan.entries:
+            logger.error("No frequencies to scan")
+            return False
+        self.plan = plan
+        self.frequency_list = list(plan.entries)
+        
+        logger.info(f"Starting scan with {len(self.frequency_list)} frequencies "
+                    f"({plan.duplicates_removed} duplicates removed, {len(plan.windows)} tuner windows, "
+                    f"~{plan.estimated_pass_seconds(scanner_config.detection_mode):.1f}s per quiet pass)")
+        
+        # Open the IQ source once per scan; rtl_tcp keeps a single connection
+        self.iq_source = create_iq_source()
+        self.signal_detector.iq_source = self.iq_source
+        
+        if scanner_config.detection_mode in ("sweep", "channelizer"):
+            self.passbands = plan.windows
+            logger.info(f"{scanner_config.detection_mode.capitalize()} mode: {len(self.frequency_list)} "
+                        f"frequencies in {len(self.passbands)} passbands")
+        if scanner_config.detection_mode == "sweep":
+            self.sweep_detector = SweepDetector(self.iq_source)
+        elif scanner_config.detection_mode == "channelizer":
+            self.channel_monitor = ChannelMonitor(self.iq_source, scanner_config.channelizer_block_seconds)
+        
+        # Seed the scheduler with activity from the previous scan
+        self.scheduler = create_scheduler()
+        self.scheduler.reset(self.frequency_list, self.activity)
+        
         self.running = True
-        self.current_freq_index = 0
+        self.current_passband_index = 0
         self.detections = {}
+        self.active_detections = set()
+        self.tone_rejected = {}
+        self.hops_total = 0
+        self.scan_seconds = 0.0
+        self.hops_during_finalize = 0
+        self.finalize_seconds = 0.0
+        self.pass_started = time.monotonic()
+        
+        resource_monitor.start()
+        if self.channel_monitor:
+            # Recorders encode channels of the channelizer instead of opening dongles
+            monitor = self.channel_monitor
+            self.recording_manager.start(lambda: ChannelPcmSource(monitor),
+                                         scanner_config.channelizer_max_recordings)
+        else:
+            self.recording_manager.start()
         
         # Start scan loop
         self.scan_task = asyncio.create_task(self._scan_loop())
+        event_bus.publish("scanner", {
+            "running": True,
+            "frequencies": len(self.frequency_list),
+            "duplicates_removed": plan.duplicates_removed,
+            "estimated_pass_seconds": plan.estimated_pass_seconds(scanner_config.detection_mode)
+        })
         return True
     
     async def stop_scan(self) -> bool:
@@ -83,10 +146,6 @@ class ScannerEngine:
         logger.info("Stopping scanner...")
         self.running = False
         
-        # Stop any active recording
-        if self.audio_pipeline.is_recording():
-            await self._stop_recording()
-        
         # Cancel scan task
         if self.scan_task:
             self.scan_task.cancel()
@@ -96,6 +155,20 @@ class ScannerEngine:
                 pass
             self.scan_task = None
         
+        # Stop any active recordings and wait for them to be finalized
+        await self.recording_manager.shutdown()
+        
+        if self.channel_monitor:
+            await asyncio.to_thread(self.channel_monitor.stop)
+            self.channel_monitor = None
+        
+        # Release the IQ source (frees the rtl_tcp server for other clients)
+        if self.iq_source:
+            self.iq_source.close()
+            self.iq_source = None
+            self.signal_detector.iq_source = None
+        
+        event_bus.publish("scanner", {"running": False})
         logger.info("Scanner stopped")
         return True
     
@@ -103,30 +176,50 @@ class ScannerEngine:
         """Main scanning loop."""
         try:
             while self.running:
-                # Monitor resources and adjust throttling
-                await asyncio.to_thread(resource_monitor.monitor_and_adjust)
-                
+                # Throttling is updated by the background resource sampler
                 # Check if paused by throttle
                 if throttle_state.paused:
                     logger.info("Scan paused by throttle")
                     await asyncio.sleep(5)
                     continue
                 
+                hop_start = time.monotonic()
+                finalizing = self.recording_manager.finalizing_count > 0
+                
+                if scanner_config.detection_mode == "sweep":
+                    if await self._sweep_step():
+                        self._record_hop(hop_start, finalizing)
+                    continue
+                
+                if self.channel_monitor:
+                    await self._channelizer_step()
+                    self._record_hop(hop_start, finalizing)
+                    continue
+                
                 # Get next frequency to scan
                 freq_entry = self._get_next_frequency()
                 if not freq_entry:
-                    # Reached end of list, wrap around
-                    self.current_freq_index = 0
+                    # End of pass, the scheduler wraps around
+                    self._end_pass()
                     await asyncio.sleep(scanner_config.scan_delay_seconds)
                     continue
                 
                 # Scan this frequency
-                await self._scan_frequency(freq_entry)
+                has_signal = await self._scan_frequency(freq_entry)
+                self.scheduler.record_result(freq_entry, has_signal)
                 
-                # Apply dwell time with throttle multiplier
-                dwell = scanner_config.default_dwell_seconds * throttle_state.dwell_multiplier
-                await asyncio.sleep(dwell)
+                # Dwell (with throttle multiplier) only on active channels;
+                # empty ones move straight on to the next hop
+                if has_signal:
+                    dwell = scanner_config.default_dwell_seconds * throttle_state.dwell_multiplier
+                    with _stage_dwell.time():
+                        await asyncio.sleep(dwell)
+                else:
+                    with _stage_scan_delay.time():
+                        await asyncio.sleep(scanner_config.scan_delay_seconds)
                 
+                self._record_hop(hop_start, finalizing)
+        
         except asyncio.CancelledError:
             logger.info("Scan loop cancelled")
         except Exception as e:
@@ -135,129 +228,313 @@ class ScannerEngine:
             self.running = False
     
     def _get_next_frequency(self) -> Optional[FrequencyEntry]:
-        """Get next frequency to scan, applying skip if throttled."""
-        if self.current_freq_index >= len(self.frequency_list):
+        """Get next frequency to scan from the scheduler (None at end of pass)."""
+        return self.scheduler.next_frequency()
+    
+    def _get_next_passband(self) -> Optional[Passband]:
+        """Get next passband to sweep, applying skip if throttled."""
+        if self.current_passband_index >= len(self.passbands):
             return None
         
-        freq_entry = self.frequency_list[self.current_freq_index]
+        passband = self.passbands[self.current_passband_index]
+        self.current_passband_index += throttle_state.skip_frequencies + 1
+        return passband
+    
+    def _record_hop(self, hop_start: float, finalizing: bool):
+        """Account one hop for the throughput statistics."""
+        elapsed = time.monotonic() - hop_start
+        self.hops_total += 1
+        self.scan_seconds += elapsed
+        scan_hops.inc()
+        scan_hop_seconds.observe(elapsed)
+        if finalizing:
+            self.hops_during_finalize += 1
+            self.finalize_seconds += elapsed
+    
+    def _end_pass(self):
+        """Expire stale detections and time the pass that just ended."""
+        self._expire_detections()
+        now = time.monotonic()
+        scan_pass_seconds.observe(now - self.pass_started)
+        self.pass_started = now
+    
+    async def _sweep_step(self) -> bool:
+        """Capture one passband and act on every channel in it.
+        
+        Returns False at the end of the plan (no capture was made).
+        """
+        passband = self._get_next_passband()
+        if not passband:
+            # Reached end of plan, wrap around
+            self.current_passband_index = 0
+            self._end_pass()
+            await asyncio.sleep(scanner_config.scan_delay_seconds)
+            return False
+        
+        found = await self._scan_passband(passband)
+        
+        # Linger like a normal dwell only when something is active
+        if found:
+            await asyncio.sleep(scanner_config.default_dwell_seconds * throttle_state.dwell_multiplier)
+        else:
+            await asyncio.sleep(scanner_config.scan_delay_seconds)
+        return True
+    
+    async def _channelizer_step(self):
+        """Act on channel activity from the channelizer, moving on when idle.
+        
+        The channelizer stays on a passband while any of its channels is
+        active or recording; after a dwell with nothing happening it
+        retunes to the next passband.
+        """
+        if not self.passbands:
+            await asyncio.sleep(scanner_config.channelizer_poll_seconds)
+            return
+        
+        passband = self.passbands[self.current_passband_index % len(self.passbands)]
+        if self.channel_monitor.passband is not passband or not self.channel_monitor.is_running():
+            await asyncio.to_thread(self.channel_monitor.tune, passband)
+            self.passband_since = time.monotonic()
+        
+        await asyncio.sleep(scanner_config.channelizer_poll_seconds)
+        results = self.channel_monitor.poll()
+        found = self._handle_passband_results(passband, results)
         
-        # Apply frequency skip if throttled
-        skip = throttle_state.skip_frequencies + 1
-        self.current_freq_index += skip
+        self._expire_detections()
         
-        return freq_entry
+        if found or self.recording_manager.sessions:
+            self.passband_since = time.monotonic()
+        elif time.monotonic() - self.passband_since >= scanner_config.default_dwell_seconds:
+            step = throttle_state.skip_frequencies + 1
+            self.current_passband_index = (self.current_passband_index + step) % len(self.passbands)
     
-    async def _scan_frequency(self, freq_entry: FrequencyEntry):
-        """Scan a single frequency."""
+    async def _scan_passband(self, passband: Passband) -> bool:
+        """Sweep a passband; returns True if any channel had a signal."""
         try:
-            # Check for signal
-            has_signal, signal_strength = await asyncio.to_thread(
-                self.signal_detector.detect_signal,
-                freq_entry
+            results = await asyncio.to_thread(self.sweep_detector.detect_passband, passband)
+            return self._handle_passband_results(passband, results)
+        except Exception as e:
+            logger.error(f"Error sweeping passband at {passband.center_freq_hz / 1e6:.4f} MHz: {e}")
+            return False
+    
+    def _record_activity(self, freq_entry: FrequencyEntry, has_signal: bool, signal_strength: float):
+        """Count a hop in the activity statistics and the occupancy history."""
+        freq_hz = int(round(freq_entry.freq_mhz * 1e6))
+        self.activity.record(freq_hz, has_signal, signal_strength)
+        if scanner_config.occupancy_enabled:
+            occupancy_store.record(freq_hz, has_signal, signal_strength)
+    
+    def _handle_passband_results(self, passband: Passband, results: Dict[float, tuple]) -> bool:
+        """Update detections and recordings for a passband; True if any channel had a signal."""
+        hits = []
+        for freq_entry in passband.entries:
+            has_signal, signal_strength = results.get(freq_entry.freq_mhz, (False, 0.0))
+            self._record_activity(freq_entry, has_signal, signal_strength)
+            if has_signal:
+                detection = self._update_detection(freq_entry, signal_strength)
+                hits.append((freq_entry, detection))
+            elif self.recording_manager.is_recording(freq_entry.freq_mhz):
+                # Check recorded channels that went quiet for timeout
+                self._handle_recording(freq_entry, None, False)
+        
+        # Keep recordings whose channel is still active, then give idle
+        # recorders to the strongest new channels. If nothing in this
+        # passband is being recorded, the strongest may take a busy recorder.
+        manager = self.recording_manager
+        recorded = [h for h in hits if manager.is_recording(h[0].freq_mhz)]
+        new = sorted((h for h in hits if not manager.is_recording(h[0].freq_mhz)),
+                     key=lambda h: h[1].signal_strength_db, reverse=True)
+        for freq_entry, detection in recorded:
+            self._handle_recording(freq_entry, detection, True)
+        for freq_entry, detection in new:
+            if not manager.has_free_recorder() and recorded:
+                break
+            self._handle_recording(freq_entry, detection, True)
+            recorded.append((freq_entry, detection))
+        
+        return bool(hits)
+    
+    def _update_detection(self, freq_entry: FrequencyEntry, signal_strength: float) -> Detection:
+        """Update or create the detection for a frequency with a signal."""
+        if freq_entry.freq_mhz in self.detections:
+            # Move to the end so the dict stays ordered by last_seen
+            detection = self.detections.pop(freq_entry.freq_mhz)
+            detection.last_seen = datetime.utcnow()
+            detection.signal_strength_db = signal_strength
+            self.detections[freq_entry.freq_mhz] = detection
+        else:
+            detection = Detection(
+                freq_mhz=freq_entry.freq_mhz,
+                mode=freq_entry.mode,
+                signal_strength_db=signal_strength,
+                label=freq_entry.label,
+                first_seen=datetime.utcnow(),
+                last_seen=datetime.utcnow()
             )
+            self.detections[freq_entry.freq_mhz] = detection
+        
+        if freq_entry.freq_mhz in self.active_detections:
+            event_bus.publish("detection_update", {
+                "freq_mhz": detection.freq_mhz,
+                "signal_strength_db": detection.signal_strength_db,
+                "last_seen": detection.last_seen.isoformat()
+            })
+        else:
+            self.active_detections.add(freq_entry.freq_mhz)
+            event_bus.publish("detection_start", detection.model_dump(mode="json"))
+        return detection
+    
+    def _expire_detections(self):
+        """Publish detection_end for detections that are no longer active and drop them.
+        
+        Their history stays in the activity store.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=DETECTION_ACTIVE_SECONDS)
+        for freq_mhz in list(self.active_detections):
+            detection = self.detections.get(freq_mhz)
+            if detection is None or detection.last_seen <= cutoff:
+                self.active_detections.discard(freq_mhz)
+                self.detections.pop(freq_mhz, None)
+                event_bus.publish("detection_end", {"freq_mhz": freq_mhz})
+    
+    async def _scan_frequency(self, freq_entry: FrequencyEntry) -> bool:
+        """Scan a single frequency; returns True if a signal was found."""
+        try:
+            # Check for signal (timed with the thread pool handoff)
+            with _stage_detect.time():
+                has_signal, signal_strength = await asyncio.to_thread(
+                    self.signal_detector.detect_signal,
+                    freq_entry
+                )
+            self._record_activity(freq_entry, has_signal, signal_strength)
             
+            detection = None
             if has_signal:
                 logger.info(f"Signal detected: {freq_entry.freq_mhz} MHz ({signal_strength:.1f} dB)")
-                
-                # Update or create detection
-                if freq_entry.freq_mhz in self.detections:
-                    detection = self.detections[freq_entry.freq_mhz]
-                    detection.last_seen = datetime.utcnow()
-                    detection.signal_strength_db = signal_strength
-                else:
-                    detection = Detection(
-                        freq_mhz=freq_entry.freq_mhz,
-                        mode=freq_entry.mode,
-                        signal_strength_db=signal_strength,
-                        label=freq_entry.label,
-                        first_seen=datetime.utcnow(),
-                        last_seen=datetime.utcnow()
-                    )
-                    self.detections[freq_entry.freq_mhz] = detection
-                
-                # Start recording if not already recording
-                if not self.audio_pipeline.is_recording():
-                    await self._start_recording(freq_entry, detection)
-                elif self.recording_freq == freq_entry.freq_mhz:
-                    # Continue recording on same frequency
-                    await self._continue_recording(detection)
-                else:
-                    # Different frequency has signal, stop current and start new
-                    await self._stop_recording()
-                    await self._start_recording(freq_entry, detection)
-            else:
-                # No signal on this frequency
-                if self.recording_freq == freq_entry.freq_mhz:
-                    # We were recording this freq, check if we should stop
-                    elapsed = (datetime.utcnow() - self.recording_start_time).total_seconds()
-                    if elapsed > scanner_config.signal_timeout_seconds:
-                        logger.info(f"Signal timeout on {freq_entry.freq_mhz} MHz")
-                        await self._stop_recording()
+                detection = self._update_detection(freq_entry, signal_strength)
+            
+            self._handle_recording(freq_entry, detection, has_signal)
+            return has_signal
         
         except Exception as e:
             logger.error(f"Error scanning {freq_entry.freq_mhz} MHz: {e}")
+            return False
     
-    async def _start_recording(self, freq_entry: FrequencyEntry, detection: Detection):
-        """Start recording a frequency."""
-        try:
-            success = await asyncio.to_thread(
-                self.audio_pipeline.start_recording,
-                freq_entry
-            )
-            
-            if success:
-                self.recording_freq = freq_entry.freq_mhz
-                self.recording_start_time = datetime.utcnow()
-                logger.info(f"Started recording: {freq_entry.freq_mhz} MHz")
-        except Exception as e:
-            logger.error(f"Failed to start recording: {e}")
+    def _handle_recording(self, freq_entry: FrequencyEntry, detection: Optional[Detection], has_signal: bool):
+        """Start, continue or stop recording based on a scan result.
+        
+        Only queues events for the recording manager, so the scan loop never
+        waits on recorder processes or session assembly.
+        """
+        freq_mhz = freq_entry.freq_mhz
+        manager = self.recording_manager
+        
+        if has_signal:
+            if manager.is_recording(freq_mhz):
+                # Continue recording on same frequency
+                manager.sessions[freq_mhz].note_detection(detection)
+                self._continue_recording(freq_mhz)
+            elif self._tone_rejected(freq_mhz):
+                # Same transmission as one the tone squelch discarded
+                pass
+            else:
+                if not manager.has_free_recorder():
+                    # All recorders busy: hand the longest-running one to the new signal
+                    oldest = manager.oldest_session()
+                    if oldest:
+                        manager.request_stop(oldest.freq_entry.freq_mhz)
+                preroll = self.signal_detector.take_preroll(freq_entry)
+                if manager.request_start(freq_entry, preroll):
+                    manager.sessions[freq_mhz].note_detection(detection)
+                    logger.info(f"Recording requested: {freq_mhz} MHz")
+        elif manager.is_recording(freq_mhz):
+            # Stop once the signal has been gone long enough
+            detection = self.detections.get(freq_mhz)
+            last_seen = detection.last_seen if detection else manager.sessions[freq_mhz].start_time
+            silent = (datetime.utcnow() - last_seen).total_seconds()
+            if silent > scanner_config.signal_timeout_seconds:
+                logger.info(f"Signal timeout on {freq_mhz} MHz")
+                manager.request_stop(freq_mhz)
     
-    async def _continue_recording(self, detection: Detection):
-        """Continue recording, check if we should stop due to max duration."""
-        if not self.recording_start_time:
+    def _continue_recording(self, freq_mhz: float):
+        """Continue recording, check if we should stop due to max duration or a dead recorder."""
+        session = self.recording_manager.sessions.get(freq_mhz)
+        if not session:
             return
         
-        elapsed = (datetime.utcnow() - self.recording_start_time).total_seconds()
+        elapsed = (datetime.utcnow() - session.start_time).total_seconds()
+        
+        # Drop transmissions without the frequency's CTCSS/DCS setting
+        if scanner_config.tone_squelch and (session.freq_entry.ctcss is not None or session.freq_entry.dcs is not None):
+            matches = session.tone_matches()
+            if matches is False or (matches is None and elapsed >= scanner_config.tone_squelch_seconds):
+                logger.info(f"Tone squelch on {freq_mhz} MHz (decoded CTCSS {session.ctcss_tone}, DCS {session.dcs_code})")
+                self.tone_rejected[freq_mhz] = datetime.utcnow()
+                self.recording_manager.request_stop(freq_mhz, discard=True)
+                return
         
         # Stop if max session duration reached
         if elapsed >= scanner_config.max_session_duration_seconds:
             logger.info(f"Max session duration reached: {elapsed:.1f}s")
-            await self._stop_recording()
+            self.recording_manager.request_stop(freq_mhz)
+        elif elapsed > scanner_config.signal_timeout_seconds and not self.recording_manager.recorder_alive(freq_mhz):
+            logger.warning(f"Recorder for {freq_mhz} MHz died, releasing it")
+            self.recording_manager.request_stop(freq_mhz)
     
-    async def _stop_recording(self):
-        """Stop recording and assemble session."""
-        try:
-            chunk_files = await asyncio.to_thread(self.audio_pipeline.stop_recording)
-            
-            if chunk_files and len(chunk_files) > 0:
-                # Assemble session
-                first_chunk = chunk_files[0]
-                session_name = first_chunk.name.rsplit('_part', 1)[0] + ".ogg"
-                session_path = first_chunk.parent / session_name
-                
-                success = await asyncio.to_thread(
-                    assemble_session,
-                    chunk_files,
-                    session_path
-                )
-                
-                if success:
-                    logger.info(f"Session created: {session_path}")
-                    # Update detection with recording ID
-                    if self.recording_freq in self.detections:
-                        self.detections[self.recording_freq].recording_id = session_path.stem
-            
-            self.recording_freq = None
-            self.recording_start_time = None
-            
-        except Exception as e:
-            logger.error(f"Error stopping recording: {e}")
+    def _tone_rejected(self, freq_mhz: float) -> bool:
+        """Check if a hit continues a transmission the tone squelch discarded."""
+        last_hit = self.tone_rejected.get(freq_mhz)
+        if last_hit is None:
+            return False
+        now = datetime.utcnow()
+        if (now - last_hit).total_seconds() > scanner_config.signal_timeout_seconds:
+            # The signal went away in between: a new transmission
+            del self.tone_rejected[freq_mhz]
+            return False
+        self.tone_rejected[freq_mhz] = now
+        return True
+    
+    def _on_session_finalized(self, freq_mhz: float, session_path: Path):
+        """Link a finalized session to its detection."""
+        if freq_mhz in self.detections:
+            self.detections[freq_mhz].recording_id = session_path.stem
+            event_bus.publish("detection_update", {
+                "freq_mhz": freq_mhz,
+                "recording_id": session_path.stem
+            })
+    
+    def get_stats(self) -> ScanStats:
+        """Scan throughput, overall and while sessions are being finalized."""
+        manager = self.recording_manager
+        return ScanStats(
+            hops_total=self.hops_total,
+            hops_per_second=self.hops_total / self.scan_seconds if self.scan_seconds else 0.0,
+            hops_during_finalize=self.hops_during_finalize,
+            finalize_seconds=self.finalize_seconds,
+            hops_per_second_during_finalize=(self.hops_during_finalize / self.finalize_seconds
+                                             if self.finalize_seconds else 0.0),
+            active_recordings=len(manager.sessions),
+            finalizing_sessions=manager.finalizing_count,
+            recorders=len(manager.slots),
+            frequencies=len(self.frequency_list),
+            duplicates_removed=self.plan.duplicates_removed if self.plan else 0,
+            estimated_pass_seconds=(self.plan.estimated_pass_seconds(scanner_config.detection_mode)
+                                    if self.plan else 0.0)
+        )
     
     def get_detections(self) -> List[Detection]:
-        """Get list of active detections (seen in last 60 seconds)."""
-        cutoff = datetime.utcnow() - timedelta(seconds=60)
-        active = [d for d in self.detections.values() if d.last_seen > cutoff]
-        return sorted(active, key=lambda d: d.last_seen, reverse=True)
+        """Get list of active detections (seen in last 60 seconds), newest first.
+        
+        The dict is kept in last_seen order, so this walks back from the
+        newest and stops at the first expired one: no filter or sort.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=DETECTION_ACTIVE_SECONDS)
+        active = []
+        for detection in reversed(self.detections.values()):
+            if detection.last_seen <= cutoff:
+                break
+            active.append(detection)
+        return active
     
     def is_running(self) -> bool:
         """Check if scanner is running."""
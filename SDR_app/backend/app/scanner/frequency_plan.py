@@ -0,0 +1,109 @@
+"""Compiled scan plan: deduplicated frequencies bucketed into tuner windows."""
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from backend.app.config import scanner_config
+from backend.app.frequency_groups import GROUP_DEFINITIONS, get_group
+from backend.app.models import FrequencyEntry
+from backend.app.scanner.sweep_detector import Passband, plan_passbands
+
+logger = logging.getLogger("scanner")
+
+# Compiled plans kept for reuse
+PLAN_CACHE_SIZE = 8
+
+class FrequencyPlan:
+    """The frequencies of one scan, compiled once.
+    
+    entries are sorted by frequency with one entry per frequency (Hz);
+    windows group them into passbands of the sweep sample rate.
+    """
+    
+    def __init__(self, key: str, entries: List[FrequencyEntry], windows: List[Passband],
+                 duplicates_removed: int, unknown_groups: List[str]):
+        self.key = key
+        self.entries = entries
+        self.windows = windows
+        self.duplicates_removed = duplicates_removed
+        self.unknown_groups = unknown_groups
+    
+    def estimated_pass_seconds(self, detection_mode: str) -> float:
+        """Time for one pass with no activity.
+        
+        Hop mode counts the longest listen per frequency; an early
+        decision makes real passes shorter.
+        """
+        if detection_mode == "sweep":
+            per_window = scanner_config.sweep_capture_seconds + scanner_config.scan_delay_seconds
+            return len(self.windows) * per_window
+        if detection_mode == "channelizer":
+            return len(self.windows) * scanner_config.default_dwell_seconds
+        per_hop = scanner_config.detect_max_seconds + scanner_config.scan_delay_seconds
+        return len(self.entries) * per_hop
+
+def plan_key(group_names: List[str], custom_frequencies: List[FrequencyEntry]) -> str:
+    """Hash of everything a plan is built from."""
+    source = {
+        "groups": list(group_names),
+        "custom": [entry.model_dump(mode="json") for entry in custom_frequencies],
+        "sample_rate": scanner_config.sweep_sample_rate,
+        "usable_fraction": scanner_config.sweep_usable_fraction,
+    }
+    return hashlib.sha1(json.dumps(source, sort_keys=True).encode()).hexdigest()
+
+def compile_plan(group_names: List[str], custom_frequencies: List[FrequencyEntry],
+                 key: Optional[str] = None) -> FrequencyPlan:
+    """Build the plan for a scan.
+    
+    A frequency listed more than once (e.g. in both GMRS and FRS) is
+    scanned once. Custom entries win over group entries, then earlier
+    groups over later ones.
+    """
+    unique: Dict[int, FrequencyEntry] = {}
+    unknown = []
+    total = 0
+    sources = [custom_frequencies]
+    for name in group_names:
+        if name in GROUP_DEFINITIONS:
+            sources.append(get_group(name).frequencies)
+        else:
+            unknown.append(name)
+    for entries in sources:
+        for entry in entries:
+            total += 1
+            unique.setdefault(int(round(entry.freq_mhz * 1e6)), entry)
+    
+    entries = [unique[freq_hz] for freq_hz in sorted(unique)]
+    windows = plan_passbands(entries, scanner_config.sweep_sample_rate, scanner_config.sweep_usable_fraction)
+    return FrequencyPlan(key or plan_key(group_names, custom_frequencies), entries, windows,
+                         total - len(entries), unknown)
+
+class PlanCache:
+    """Compiled plans by key, least recently used evicted first."""
+    
+    def __init__(self, max_size: int = PLAN_CACHE_SIZE):
+        self.max_size = max_size
+        self.plans: "OrderedDict[str, FrequencyPlan]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, group_names: List[str], custom_frequencies: List[FrequencyEntry]) -> FrequencyPlan:
+        """Return the plan for this selection, compiling it if needed."""
+        key = plan_key(group_names, custom_frequencies)
+        plan = self.plans.get(key)
+        if plan is not None:
+            self.plans.move_to_end(key)
+            self.hits += 1
+            return plan
+        
+        self.misses += 1
+        plan = compile_plan(group_names, custom_frequencies, key)
+        self.plans[key] = plan
+        while len(self.plans) > self.max_size:
+            self.plans.popitem(last=False)
+        return plan
+
+# Global plan cache
+plan_cache = PlanCache()
@@ -0,0 +1,238 @@
+"""Raw IQ sample sources for wideband detection."""
+import asyncio
+import concurrent.futures
+import subprocess
+import logging
+import os
+import signal
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+import numpy as np
+from backend.app.config import scanner_config
+from backend.app.metrics import subprocess_spawns
+from backend.app.scanner.rtl_tcp_client import RtlTcpClient
+
+logger = logging.getLogger("scanner")
+
+def iq_from_bytes(raw: bytes) -> np.ndarray:
+    """Convert interleaved unsigned 8-bit IQ (rtl-sdr format) to complex64 in [-1, 1]."""
+    samples = np.frombuffer(raw, dtype=np.uint8)
+    if len(samples) % 2:
+        samples = samples[:-1]
+    iq = samples.astype(np.float32)
+    iq -= 127.5
+    iq /= 127.5
+    return iq.view(np.complex64)
+
+class IQSource:
+    """Base class for raw IQ sample sources.
+    
+    Sources are synchronous and are called from a worker thread by the engine.
+    """
+    
+    def read_iq(self, center_freq_hz: int, sample_rate: int, num_samples: int) -> np.ndarray:
+        """Tune to center_freq_hz and return num_samples complex64 samples."""
+        raise NotImplementedError
+    
+    def stream_iq(self, center_freq_hz: int, sample_rate: int, block_samples: int) -> Iterator[np.ndarray]:
+        """Yield consecutive blocks of block_samples until the caller stops iterating.
+        
+        Blocks must be contiguous, with nothing dropped between them: the
+        channelizer's overlap-save filter and the pre-roll audio rely on it.
+        """
+        while True:
+            yield self.read_iq(center_freq_hz, sample_rate, block_samples)
+    
+    def close(self):
+        """Release any resources held by the source."""
+        pass
+
+class RtlSdrIQSource(IQSource):
+    """Capture IQ with the rtl_sdr command-line tool (one process per capture)."""
+    
+    # Samples dropped after tuning while the PLL and AGC settle
+    SETTLE_SAMPLES = 16384
+    
+    def __init__(self, device: Optional[int] = None, gain: int = 40):
+        self.device = scanner_config.scanner_device if device is None else device
+        self.gain = gain
+    
+    def read_iq(self, center_freq_hz: int, sample_rate: int, num_samples: int) -> np.ndarray:
+        """Capture num_samples from the dongle at center_freq_hz."""
+        total = num_samples + self.SETTLE_SAMPLES
+        cmd = [
+            "rtl_sdr",
+            "-d", str(self.device),
+            "-f", str(center_freq_hz),
+            "-s", str(sample_rate),
+            "-g", str(self.gain),
+            "-n", str(total),
+            "-"
+        ]
+        logger.debug(f"Running: {' '.join(cmd)}")
+        
+        # Allow generous time for USB open plus the capture itself
+        timeout = 5 + total / sample_rate
+        subprocess_spawns.labels("rtl_sdr").inc()
+        result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+        
+        iq = iq_from_bytes(result.stdout)[self.SETTLE_SAMPLES:]
+        if len(iq) < num_samples:
+            stderr_output = result.stderr.decode('utf-8', errors='ignore')
+            raise RuntimeError(f"rtl_sdr returned {len(iq)} of {num_samples} samples: {stderr_output[:200]}")
+        return iq
+    
+    def stream_iq(self, center_freq_hz: int, sample_rate: int, block_samples: int) -> Iterator[np.ndarray]:
+        """Stream blocks from one rtl_sdr process, killed when the caller stops."""
+        cmd = [
+            "rtl_sdr",
+            "-d", str(self.device),
+            "-f", str(center_freq_hz),
+            "-s", str(sample_rate),
+            "-g", str(self.gain),
+            "-"
+        ]
+        logger.debug(f"Running: {' '.join(cmd)}")
+        
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            preexec_fn=os.setsid  # Create process group for cleanup
+        )
+        subprocess_spawns.labels("rtl_sdr").inc()
+        block_bytes = block_samples * 2
+        buffer = bytearray(block_bytes)
+        view = memoryview(buffer)
+        
+        try:
+            # Discard samples captured while the tuner settles
+            remaining = self.SETTLE_SAMPLES * 2
+            while remaining > 0:
+                chunk = process.stdout.read(min(remaining, block_bytes))
+                if not chunk:
+                    raise RuntimeError("rtl_sdr exited before producing samples")
+                remaining -= len(chunk)
+            
+            while True:
+                filled = 0
+                while filled < block_bytes:
+                    count = process.stdout.readinto(view[filled:])
+                    if not count:
+                        raise RuntimeError("rtl_sdr stream ended")
+                    filled += count
+                yield iq_from_bytes(buffer)
+        finally:
+            try:
+                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+                process.wait(timeout=1)
+            except Exception:
+                try:
+                    os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+                    process.wait(timeout=1)
+                except Exception:
+                    pass
+
+class FileIQSource(IQSource):
+    """Replay IQ captures from disk instead of a dongle.
+    
+    The directory holds unsigned 8-bit interleaved files (rtl_sdr output).
+    A capture named "<center_freq_hz>.cu8" is used for that tuning; otherwise
+    "default.cu8" is used. Files are read as a loop so successive captures
+    advance through the recording.
+    """
+    
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._cache: Dict[Path, np.ndarray] = {}
+        self._offsets: Dict[Path, int] = {}
+    
+    def _resolve(self, center_freq_hz: int) -> Path:
+        """Find the capture file for a tuning."""
+        for name in (f"{center_freq_hz}.cu8", "default.cu8"):
+            path = self.directory / name
+            if path.exists():
+                return path
+        raise FileNotFoundError(f"No IQ capture for {center_freq_hz} Hz in {self.directory}")
+    
+    def read_iq(self, center_freq_hz: int, sample_rate: int, num_samples: int) -> np.ndarray:
+        """Return the next num_samples from the capture for center_freq_hz."""
+        path = self._resolve(center_freq_hz)
+        if path not in self._cache:
+            self._cache[path] = iq_from_bytes(path.read_bytes())
+            self._offsets[path] = 0
+        
+        iq = self._cache[path]
+        if len(iq) == 0:
+            raise RuntimeError(f"Empty IQ capture: {path}")
+        
+        start = self._offsets[path]
+        indices = (start + np.arange(num_samples)) % len(iq)
+        self._offsets[path] = (start + num_samples) % len(iq)
+        return iq[indices]
+
+class RtlTcpIQSource(IQSource):
+    """Read IQ from a persistent rtl_tcp connection.
+    
+    The client lives on the event loop; captures requested from the
+    detector's worker thread are scheduled onto it.
+    """
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, host: str, port: int):
+        self.loop = loop
+        self.client = RtlTcpClient(
+            host, port,
+            max_sample_rate=scanner_config.sweep_sample_rate,
+            retune_skip_bytes=scanner_config.rtl_tcp_retune_skip_bytes
+        )
+    
+    def read_iq(self, center_freq_hz: int, sample_rate: int, num_samples: int) -> np.ndarray:
+        """Capture num_samples through the shared rtl_tcp connection."""
+        future = asyncio.run_coroutine_threadsafe(
+            self.client.capture(center_freq_hz, sample_rate, num_samples),
+            self.loop
+        )
+        raw = future.result(timeout=10 + num_samples / sample_rate)
+        return iq_from_bytes(raw)
+    
+    def stream_iq(self, center_freq_hz: int, sample_rate: int, block_samples: int) -> Iterator[np.ndarray]:
+        """Yield gapless blocks from the connection's ring buffer.
+        
+        Unlike repeated read_iq calls, samples that arrive while the caller
+        processes a block are not skipped.
+        """
+        stream = self.client.stream(center_freq_hz, sample_rate, block_samples)
+        timeout = 10 + block_samples / sample_rate
+        try:
+            while True:
+                future = asyncio.run_coroutine_threadsafe(stream.__anext__(), self.loop)
+                try:
+                    raw = future.result(timeout=timeout)
+                except concurrent.futures.TimeoutError:
+                    future.cancel()
+                    raise
+                except StopAsyncIteration:
+                    return
+                yield iq_from_bytes(raw)
+        finally:
+            if not self.loop.is_closed():
+                asyncio.run_coroutine_threadsafe(stream.aclose(), self.loop)
+    
+    def close(self):
+        """Close the rtl_tcp connection from the event loop thread."""
+        self.loop.call_soon_threadsafe(self.client.close)
+
+def create_iq_source() -> IQSource:
+    """Build the IQ source selected in the scanner configuration.
+    
+    The "rtl_tcp" source must be created from the event loop thread.
+    """
+    if scanner_config.iq_source == "rtl_tcp":
+        return RtlTcpIQSource(asyncio.get_running_loop(),
+                              scanner_config.rtl_tcp_host,
+                              scanner_config.rtl_tcp_port)
+    if scanner_config.iq_source == "file":
+        if not scanner_config.iq_file_dir:
+            raise ValueError("iq_file_dir must be set for the file IQ source")
+        return FileIQSource(Path(scanner_config.iq_file_dir))
+    return RtlSdrIQSource()
@@ -0,0 +1,158 @@
+"""Incremental kernel log reader that tracks USB / RTL-SDR errors."""
+import errno
+import logging
+import os
+import re
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger("scanner")
+
+# Checked in order; the first match wins
+ERROR_PATTERNS = [
+    ("rtlsdr", re.compile(r"(rtl2832|rtl28xxu|r820t|dvb_usb|dvb-usb).*(error|fail|timeout)")),
+    ("usb_disconnect", re.compile(r"usb [\d\-.]+: usb disconnect")),
+    ("usb_reset", re.compile(r"usb [\d\-.]+: reset .*usb device")),
+    ("usb_error", re.compile(r"usb.*(error|fail)")),
+]
+
+def parse_kmsg_record(line: str) -> Optional[Tuple[float, str]]:
+    """Parse one /dev/kmsg record: "prio,seq,usec,flags[,...];message".
+    
+    Returns (seconds since boot, message), or None for continuation lines
+    and malformed records.
+    """
+    if not line or line[0] == " ":
+        return None
+    header, sep, message = line.partition(";")
+    if not sep:
+        return None
+    fields = header.split(",")
+    if len(fields) < 3:
+        return None
+    try:
+        timestamp = int(fields[2]) / 1e6
+    except ValueError:
+        return None
+    return timestamp, message.rstrip("\n")
+
+def classify_message(message: str) -> Optional[str]:
+    """Return the error category of a kernel message, or None."""
+    lower = message.lower()
+    if "usb" not in lower and "rtl" not in lower and "r820t" not in lower:
+        return None
+    for category, pattern in ERROR_PATTERNS:
+        if pattern.search(lower):
+            return category
+    return None
+
+class KmsgReader:
+    """Read only new kernel log records and keep a sliding window of errors.
+    
+    /dev/kmsg returns one record per read and starts at the oldest record
+    still in the ring buffer, so the reader seeks to the end on open and
+    only sees what is logged afterwards. Record timestamps are
+    CLOCK_MONOTONIC microseconds, which is the clock time.monotonic() uses.
+    
+    Any regular file with the same record format works too (for testing);
+    pass from_start=True to read it from the beginning.
+    """
+    
+    def __init__(self, path: str = "/dev/kmsg", window_seconds: float = 300.0,
+                 from_start: bool = False, clock=time.monotonic):
+        self.path = path
+        self.window_seconds = window_seconds
+        self.from_start = from_start
+        self.clock = clock
+        self.events: Deque[Tuple[float, str]] = deque()
+        self.totals: Dict[str, int] = {}
+        self.records_read = 0
+        self.lost_records = 0
+        self.available = True
+        self._fd: Optional[int] = None
+        self._partial = b""
+    
+    def _open(self) -> bool:
+        """Open the log; logs a warning once if it cannot be read."""
+        if self._fd is not None:
+            return True
+        if not self.available:
+            return False
+        try:
+            self._fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            if not self.from_start:
+                os.lseek(self._fd, 0, os.SEEK_END)
+            return True
+        except OSError as e:
+            logger.warning(f"Cannot read kernel log {self.path}: {e}; USB error tracking disabled")
+            self.available = False
+            self._fd = None
+            return False
+    
+    def close(self):
+        """Close the log."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+    
+    def poll(self) -> int:
+        """Process records logged since the last poll; returns new errors."""
+        if not self._open():
+            return 0
+        
+        new_errors = 0
+        while True:
+            try:
+                chunk = os.read(self._fd, 8192)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.EPIPE:
+                    # Records were overwritten before we read them
+                    self.lost_records += 1
+                    continue
+                logger.warning(f"Error reading kernel log: {e}")
+                break
+            if not chunk:
+                break
+            
+            data = self._partial + chunk
+            lines = data.split(b"\n")
+            self._partial = lines.pop()
+            for raw in lines:
+                record = parse_kmsg_record(raw.decode("utf-8", errors="replace"))
+                if record is None:
+                    continue
+                self.records_read += 1
+                category = classify_message(record[1])
+                if category:
+                    self.events.append((record[0], category))
+                    self.totals[category] = self.totals.get(category, 0) + 1
+                    new_errors += 1
+        
+        self._expire()
+        return new_errors
+    
+    def _expire(self):
+        """Drop events that fell out of the window."""
+        cutoff = self.clock() - self.window_seconds
+        while self.events and self.events[0][0] < cutoff:
+            self.events.popleft()
+    
+    def error_count(self) -> int:
+        """Errors within the window."""
+        self._expire()
+        return len(self.events)
+    
+    def error_rate_per_minute(self) -> float:
+        """Errors per minute over the window."""
+        return self.error_count() * 60.0 / self.window_seconds
+    
+    def window_counts(self) -> Dict[str, int]:
+        """Errors within the window by category."""
+        self._expire()
+        counts: Dict[str, int] = {}
+        for _, category in self.events:
+            counts[category] = counts.get(category, 0) + 1
+        return counts
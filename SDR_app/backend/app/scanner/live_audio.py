@@ -0,0 +1,101 @@
+"""Fan the encoded Ogg stream of an active recording out to live listeners."""
+import asyncio
+import threading
+from collections import deque
+from typing import AsyncIterator, Deque, List, Set, Tuple
+from backend.app.scanner.ogg import OggPage
+
+class LiveAudioBuffer:
+    """Bounded buffer of Ogg pages shared by every listener of one recording.
+    
+    The session writer thread appends pages as the encoder produces them
+    and never waits for listeners: the buffer keeps the last max_pages pages
+    and a listener that falls behind skips ahead to the oldest one kept.
+    The stream's header pages (OpusHead/OpusTags) are kept separately so
+    listeners joining mid-stream still get a playable Ogg stream.
+    """
+    
+    def __init__(self, max_pages: int = 64):
+        self.header_pages: List[bytes] = []
+        self.headers_complete = False
+        self.pages: Deque[bytes] = deque(maxlen=max_pages)
+        self.next_seq = 0  # Sequence number of the next page appended
+        self.closed = False
+        self.listeners = 0
+        self.skipped_pages = 0
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+    
+    def _notify(self):
+        for loop, event in list(self._waiters):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Loop closed
+                self._waiters.discard((loop, event))
+    
+    def append(self, page: bytes, is_header: bool = False):
+        """Add one page's bytes."""
+        with self._lock:
+            if is_header and not self.headers_complete:
+                self.header_pages.append(page)
+            else:
+                self.headers_complete = True
+                self.pages.append(page)
+                self.next_seq += 1
+        self._notify()
+    
+    def close(self):
+        """Mark the end of the stream."""
+        with self._lock:
+            self.closed = True
+            self.headers_complete = True
+        self._notify()
+    
+    def add_page(self, page: OggPage):
+        """Add a page read from the encoder (called from the writer thread)."""
+        # Header pages come first and carry granule position 0
+        self.append(page.raw, is_header=not self.headers_complete and page.granule_position == 0)
+    
+    async def stream(self) -> AsyncIterator[bytes]:
+        """Yield the header pages, then live pages from the current position."""
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        self._waiters.add(waiter)
+        self.listeners += 1
+        try:
+            # Wait for the stream headers
+            while True:
+                event.clear()
+                with self._lock:
+                    ready = self.headers_complete
+                    headers = list(self.header_pages)
+                if ready:
+                    break
+                await event.wait()
+            if headers:
+                yield b"".join(headers)
+            
+            # Start at the live edge
+            with self._lock:
+                seq = self.next_seq
+            while True:
+                event.clear()
+                with self._lock:
+                    oldest = self.next_seq - len(self.pages)
+                    if seq < oldest:
+                        self.skipped_pages += oldest - seq
+                        seq = oldest
+                    start = len(self.pages) - (self.next_seq - seq)
+                    chunk = [self.pages[i] for i in range(start, len(self.pages))]
+                    closed = self.closed
+                if chunk:
+                    seq += len(chunk)
+                    yield b"".join(chunk)
+                    continue
+                if closed:
+                    return
+                await event.wait()
+        finally:
+            self.listeners -= 1
+            self._waiters.discard(waiter)
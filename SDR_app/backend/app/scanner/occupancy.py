@@ -0,0 +1,293 @@
+"""Per-frequency occupancy history in memory-mapped arrays, for heatmaps."""
+import logging
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from numpy.lib.format import open_memmap
+from backend.app.config import scanner_config, OCCUPANCY_DIR
+
+logger = logging.getLogger("scanner")
+
+# One row per tracked frequency
+CHANNEL_DTYPE = np.dtype([
+    ("freq_hz", np.int64),
+    ("created", np.uint32),  # Unix time the row was (re)assigned
+    ("last_seen", np.uint32),  # Unix time of the last sample
+])
+
+# One hop, at 1 s resolution
+RAW_DTYPE = np.dtype([
+    ("time", np.uint32),  # Unix time (0 = empty slot)
+    ("row", np.uint16),
+    ("power_db", np.int8),  # NO_POWER when unknown
+    ("occupied", np.uint8),
+])
+
+# One frequency in one rollup bucket
+CELL_DTYPE = np.dtype([
+    ("visits", np.uint16),
+    ("hits", np.uint16),
+    ("peak_db", np.int8),  # Strongest hit, NO_POWER if none
+])
+
+NO_POWER = -128
+COUNT_MAX = np.iinfo(np.uint16).max
+
+# Heatmap resolutions
+RESOLUTIONS = {"second": 1, "minute": 60, "hour": 3600}
+
+def _open_array(path: Path, dtype: np.dtype, shape: Tuple[int, ...], fill=0) -> np.memmap:
+    """Open a .npy file as a memmap, (re)creating it if its layout differs."""
+    if path.exists():
+        try:
+            array = open_memmap(str(path), mode="r+")
+            if array.dtype == dtype and array.shape == shape:
+                return array
+            logger.info(f"Occupancy file {path.name} has a different layout; starting it afresh")
+            del array
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not open {path.name} ({e}); starting it afresh")
+    array = open_memmap(str(path), mode="w+", dtype=dtype, shape=shape)
+    if fill:
+        array[...] = fill
+    return array
+
+class _RollupTier:
+    """Ring of fixed-length buckets, one cell per (bucket, frequency)."""
+    
+    def __init__(self, directory: Path, name: str, seconds: int, buckets: int, rows: int):
+        self.seconds = seconds
+        self.buckets = buckets
+        # Bucket-major, so a bucket's cells (all frequencies) are contiguous
+        self.cells = _open_array(directory / f"{name}.npy", CELL_DTYPE, (buckets, rows))
+        self.ids = _open_array(directory / f"{name}_ids.npy", np.dtype(np.int64), (buckets,), fill=-1)
+        # Plain ndarray views: element access on a memmap is several times slower
+        self._visits = np.asarray(self.cells)["visits"]
+        self._hits = np.asarray(self.cells)["hits"]
+        self._peaks = np.asarray(self.cells)["peak_db"]
+        self._ids = np.asarray(self.ids)
+    
+    def add(self, row: int, now: int, occupied: bool, power_db: int):
+        bucket = now // self.seconds
+        column = bucket % self.buckets
+        if self._ids[column] != bucket:
+            self.cells[column] = (0, 0, NO_POWER)
+            self._ids[column] = bucket
+        if self._visits[column, row] < COUNT_MAX:
+            self._visits[column, row] += 1
+        if occupied:
+            if self._hits[column, row] < COUNT_MAX:
+                self._hits[column, row] += 1
+            if power_db > self._peaks[column, row]:
+                self._peaks[column, row] = power_db
+    
+    def clear_row(self, row: int):
+        self.cells[:, row] = (0, 0, NO_POWER)
+    
+    def oldest_bucket(self, now: float) -> int:
+        """First bucket still held (the oldest may be partly overwritten)."""
+        return int(now) // self.seconds - self.buckets
+    
+    def matrix(self, rows: np.ndarray, first_bucket: int, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """visits, hits and peak_db as (len(rows), count) arrays."""
+        visits = np.zeros((len(rows), count), dtype=np.int64)
+        hits = np.zeros_like(visits)
+        peaks = np.full((len(rows), count), NO_POWER, dtype=np.int8)
+        wanted = np.arange(first_bucket, first_bucket + count)
+        columns = wanted % self.buckets
+        held = np.flatnonzero(self.ids[columns] == wanted)
+        if len(held) and len(rows):
+            cells = self.cells[columns[held]][:, rows]
+            visits[:, held] = cells["visits"].T
+            hits[:, held] = cells["hits"].T
+            peaks[:, held] = cells["peak_db"].T
+        return visits, hits, peaks
+
+class OccupancyStore:
+    """Power and occupancy of every scanned frequency over time.
+    
+    Every hop is appended to a ring of 1 s samples (about a day at the
+    scan rate) and counted into per-minute and per-hour buckets at the
+    same time, so the rollups need no separate pass. All arrays are
+    fixed-size .npy files mapped into memory: they survive restarts,
+    cost no heap, and only the pages in use stay resident. A week of
+    hourly history for 2,000 frequencies is 1.7 MB.
+    """
+    
+    def __init__(self, directory: Path = OCCUPANCY_DIR, max_channels: Optional[int] = None,
+                 raw_samples: Optional[int] = None, minute_buckets: Optional[int] = None,
+                 hour_buckets: Optional[int] = None, clock=time.time):
+        self.directory = Path(directory)
+        self.max_channels = min(max_channels or scanner_config.occupancy_max_channels, COUNT_MAX)
+        self.raw_samples = raw_samples or scanner_config.occupancy_raw_samples
+        self.minute_buckets = minute_buckets or scanner_config.occupancy_minute_buckets
+        self.hour_buckets = hour_buckets or scanner_config.occupancy_hour_buckets
+        self.clock = clock
+        self.channels: Optional[np.memmap] = None
+        self.raw: Optional[np.memmap] = None
+        self.raw_head: Optional[np.memmap] = None
+        self.tiers: Dict[int, _RollupTier] = {}
+        self.rows: Dict[int, int] = {}  # freq_hz -> row
+        self._lock = threading.Lock()
+    
+    def _open(self):
+        """Map the files on first use. Caller holds the lock."""
+        if self.channels is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.channels = _open_array(self.directory / "channels.npy", CHANNEL_DTYPE, (self.max_channels,))
+        self.raw = _open_array(self.directory / "raw.npy", RAW_DTYPE, (self.raw_samples,))
+        self.raw_head = _open_array(self.directory / "raw_head.npy", np.dtype(np.int64), (1,))
+        self.tiers = {
+            60: _RollupTier(self.directory, "minute", 60, self.minute_buckets, self.max_channels),
+            3600: _RollupTier(self.directory, "hour", 3600, self.hour_buckets, self.max_channels),
+        }
+        self._last_seen = np.asarray(self.channels)["last_seen"]
+        self._raw = np.asarray(self.raw)
+        self._raw_head = np.asarray(self.raw_head)
+        self.rows = {int(freq): row for row, freq in enumerate(self.channels["freq_hz"]) if freq}
+        logger.info(f"Occupancy history: {len(self.rows)} frequencies, {self.disk_bytes() / 1e6:.1f} MB mapped")
+    
+    def _row(self, freq_hz: int, now: int) -> int:
+        row = self.rows.get(freq_hz)
+        if row is not None:
+            return row
+        if len(self.rows) < self.max_channels:
+            row = int(np.flatnonzero(self.channels["freq_hz"] == 0)[0])
+        else:
+            # Reuse the row of the frequency scanned longest ago
+            row = int(np.argmin(self.channels["last_seen"]))
+            del self.rows[int(self.channels[row]["freq_hz"])]
+            for tier in self.tiers.values():
+                tier.clear_row(row)
+        # Raw samples from before created belong to the previous owner
+        self.channels[row] = (freq_hz, now, now)
+        self.rows[freq_hz] = row
+        return row
+    
+    def record(self, freq_hz: int, has_signal: bool, power_db: Optional[float] = None):
+        """Add one hop's result."""
+        now = int(self.clock())
+        power = NO_POWER if power_db is None else min(127, max(NO_POWER + 1, round(power_db)))
+        with self._lock:
+            self._open()
+            row = self._row(freq_hz, now)
+            self._last_seen[row] = now
+            head = int(self._raw_head[0])
+            self._raw[head] = (now, row, power, has_signal)
+            self._raw_head[0] = (head + 1) % self.raw_samples
+            for tier in self.tiers.values():
+                tier.add(row, now, has_signal, power)
+    
+    def _raw_matrix(self, rows: np.ndarray, first: int, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Like _RollupTier.matrix, from the 1 s samples."""
+        visits = np.zeros((len(rows), count), dtype=np.int64)
+        hits = np.zeros_like(visits)
+        peaks = np.full((len(rows), count), NO_POWER, dtype=np.int8)
+        raw = self.raw
+        times = raw["time"]
+        selected = np.flatnonzero((times >= first) & (times < first + count))
+        if not len(selected) or not len(rows):
+            return visits, hits, peaks
+        samples = raw[selected]
+        # Map store rows to output rows (-1 = not requested)
+        output_row = np.full(self.max_channels, -1, dtype=np.int64)
+        output_row[rows] = np.arange(len(rows))
+        out = output_row[samples["row"]]
+        current = samples["time"] >= self.channels["created"][samples["row"]]
+        keep = (out >= 0) & current
+        out, samples = out[keep], samples[keep]
+        columns = samples["time"].astype(np.int64) - first
+        occupied = samples["occupied"].astype(bool)
+        np.add.at(visits, (out, columns), 1)
+        np.add.at(hits, (out[occupied], columns[occupied]), 1)
+        np.maximum.at(peaks, (out[occupied], columns[occupied]), samples["power_db"][occupied])
+        return visits, hits, peaks
+    
+    def _choose_resolution(self, since: float, until: float, max_columns: int) -> int:
+        """Finest resolution that fits max_columns and still holds since."""
+        now = self.clock()
+        for seconds in (1, 60, 3600):
+            if _column_count(since, until, seconds) > max_columns:
+                continue
+            if seconds == 1 or int(since) // seconds >= self.tiers[seconds].oldest_bucket(now):
+                return seconds
+        return 3600
+    
+    def heatmap(self, since: float, until: float, resolution: Optional[str] = None,
+                freq_min_hz: Optional[int] = None, freq_max_hz: Optional[int] = None,
+                max_columns: Optional[int] = None) -> Dict:
+        """Occupancy and peak power matrices, one row per frequency.
+        
+        Columns are buckets of resolution ("second", "minute", "hour", or
+        None to pick the finest that fits max_columns). Occupancy is the
+        share of hops with a signal, None where the frequency was not
+        scanned. Raises ValueError if the request needs too many columns.
+        """
+        max_columns = max_columns or scanner_config.occupancy_max_columns
+        with self._lock:
+            self._open()
+            if resolution is None:
+                seconds = self._choose_resolution(since, until, max_columns)
+            else:
+                seconds = RESOLUTIONS[resolution]
+            first = int(since) // seconds
+            count = _column_count(since, until, seconds)
+            if count > max_columns:
+                raise ValueError(f"{count} columns requested; the limit is {max_columns}")
+            
+            freqs = sorted(
+                freq for freq in self.rows
+                if (freq_min_hz is None or freq >= freq_min_hz) and (freq_max_hz is None or freq <= freq_max_hz)
+            )
+            rows = np.array([self.rows[freq] for freq in freqs], dtype=np.int64)
+            if seconds == 1:
+                visits, hits, peaks = self._raw_matrix(rows, first, count)
+            else:
+                visits, hits, peaks = self.tiers[seconds].matrix(rows, first, count)
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            occupancy = np.round(hits / visits, 3)
+        return {
+            "resolution_seconds": seconds,
+            "start": float(first * seconds),
+            "frequencies_mhz": [freq / 1e6 for freq in freqs],
+            "occupancy": _rows_with_gaps(occupancy, visits > 0),
+            "peak_power_db": _rows_with_gaps(peaks, peaks != NO_POWER),
+        }
+    
+    def flush(self):
+        """Write dirty pages back to the files."""
+        with self._lock:
+            if self.channels is None:
+                return
+            for array in (self.channels, self.raw, self.raw_head):
+                array.flush()
+            for tier in self.tiers.values():
+                tier.cells.flush()
+                tier.ids.flush()
+    
+    def disk_bytes(self) -> int:
+        """Size of the mapped files (fixed by the configuration)."""
+        if self.channels is None:
+            return 0
+        arrays = [self.channels, self.raw, self.raw_head]
+        for tier in self.tiers.values():
+            arrays.extend((tier.cells, tier.ids))
+        return sum(array.nbytes for array in arrays)
+
+def _column_count(since: float, until: float, seconds: int) -> int:
+    """Buckets of seconds touched by [since, until)."""
+    return max(1, math.ceil(until / seconds) - int(since) // seconds)
+
+def _rows_with_gaps(values: np.ndarray, present: np.ndarray) -> List[List]:
+    """Nested lists with None where present is False."""
+    cells = values.astype(object)
+    cells[~present] = None
+    return cells.tolist()
+
+# Global occupancy store instance
+occupancy_store = OccupancyStore()
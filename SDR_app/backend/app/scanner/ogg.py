@@ -0,0 +1,300 @@
+"""Minimal Ogg page reader and writer, and a stream stitcher."""
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+OGG_CAPTURE = b"OggS"
+# capture, version, header type, granule position, serial, sequence, CRC, segment count
+OGG_HEADER = struct.Struct("<4sBBqIIIB")
+
+# Header type flags
+FLAG_CONTINUED = 0x01
+FLAG_BOS = 0x02
+FLAG_EOS = 0x04
+
+# Offset of the CRC field within the page header
+CRC_OFFSET = 22
+
+# Largest possible page: header, 255 lacing values and 255 * 255 body bytes
+MAX_PAGE_SIZE = OGG_HEADER.size + 255 + 255 * 255
+
+# Opus granule positions count 48 kHz samples whatever the input rate
+OPUS_GRANULE_RATE = 48000
+OPUS_HEAD = b"OpusHead"
+
+# Bit-reversed value of every byte. Ogg's CRC is the unreflected form of
+# zlib's CRC-32, so reversing the bits lets zlib compute it in C.
+_REVERSE_BITS = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+
+def ogg_crc(data: bytes) -> int:
+    """Checksum of a page, computed with its CRC field zeroed."""
+    # Leading zero bytes don't change a zero-initialised CRC; xoring them
+    # with zlib's all-ones initial value cancels it out.
+    crc = zlib.crc32(b"\xff\xff\xff\xff" + data.translate(_REVERSE_BITS)) ^ 0xFFFFFFFF
+    return int(f"{crc:032b}"[::-1], 2)
+
+def build_page(header_type: int, granule_position: int, serial: int, sequence: int,
+               packets: List[bytes]) -> bytes:
+    """Build a page holding whole packets (each under 64 KiB in total)."""
+    table = bytearray()
+    for packet in packets:
+        table.extend(b"\xff" * (len(packet) // 255))
+        table.append(len(packet) % 255)
+    if len(table) > 255:
+        raise ValueError("Too many packet segments for one Ogg page")
+    header = OGG_HEADER.pack(OGG_CAPTURE, 0, header_type, granule_position,
+                             serial, sequence, 0, len(table))
+    page = bytearray(header + table + b"".join(packets))
+    struct.pack_into("<I", page, CRC_OFFSET, ogg_crc(page))
+    return bytes(page)
+
+class OggPage:
+    """One Ogg page: parsed header fields plus the raw page bytes."""
+    __slots__ = ("header_type", "granule_position", "serial", "sequence", "raw")
+    
+    def __init__(self, header_type: int, granule_position: int, serial: int, sequence: int, raw: bytes):
+        self.header_type = header_type
+        self.granule_position = granule_position
+        self.serial = serial
+        self.sequence = sequence
+        self.raw = raw
+    
+    @property
+    def is_bos(self) -> bool:
+        return bool(self.header_type & FLAG_BOS)
+    
+    @property
+    def is_eos(self) -> bool:
+        return bool(self.header_type & FLAG_EOS)
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    """Read exactly size bytes; None if the stream ends first."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+def read_page(stream: BinaryIO) -> Optional[OggPage]:
+    """Read the next page from a stream, skipping any garbage before it."""
+    header = _read_exact(stream, OGG_HEADER.size)
+    if header is None:
+        return None
+    
+    # Resynchronise on the capture pattern if the stream is not page-aligned
+    while header[:4] != OGG_CAPTURE:
+        index = header.find(OGG_CAPTURE, 1)
+        keep = header[index:] if index > 0 else header[-3:]
+        more = _read_exact(stream, OGG_HEADER.size - len(keep))
+        if more is None:
+            return None
+        header = keep + more
+    
+    _, _, header_type, granule, serial, sequence, _, segments = OGG_HEADER.unpack(header)
+    table = _read_exact(stream, segments)
+    if table is None:
+        return None
+    body = _read_exact(stream, sum(table))
+    if body is None:
+        return None
+    return OggPage(header_type, granule, serial, sequence, header + table + body)
+
+def iter_pages(stream: BinaryIO) -> Iterator[OggPage]:
+    """Yield pages until the end of the stream."""
+    while True:
+        page = read_page(stream)
+        if page is None:
+            return
+        yield page
+
+def scan_pages(stream: BinaryIO) -> List[Tuple[int, int, OggPage]]:
+    """(offset, length, page) of each page in a file, seeking past the bodies.
+    
+    The pages only hold their header in raw. Stops at the first
+    incomplete or corrupt page, so a truncated file yields its whole pages.
+    """
+    pages = []
+    file_size = os.fstat(stream.fileno()).st_size
+    offset = stream.seek(0)
+    while True:
+        header = _read_exact(stream, OGG_HEADER.size)
+        if header is None or header[:4] != OGG_CAPTURE:
+            break
+        _, _, header_type, granule, serial, sequence, _, segments = OGG_HEADER.unpack(header)
+        table = _read_exact(stream, segments)
+        if table is None:
+            break
+        end = offset + OGG_HEADER.size + segments + sum(table)
+        if end > file_size:
+            break
+        stream.seek(end)
+        pages.append((offset, end - offset, OggPage(header_type, granule, serial, sequence, header)))
+        offset = end
+    return pages
+
+def _copy_range(source: BinaryIO, dest: BinaryIO, length: int):
+    """Append the first length bytes of source to dest, in the kernel if possible."""
+    dest.flush()
+    copied = 0
+    try:
+        while copied < length:
+            if hasattr(os, "copy_file_range"):
+                n = os.copy_file_range(source.fileno(), dest.fileno(), length - copied, copied)
+            else:
+                n = os.sendfile(dest.fileno(), source.fileno(), copied, length - copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        # Not supported for these files; copy the rest in user space
+        pass
+    
+    dest.seek(0, os.SEEK_END)
+    source.seek(copied)
+    remaining = length - copied
+    while remaining:
+        chunk = source.read(min(remaining, 1 << 20))
+        if not chunk:
+            break
+        dest.write(chunk)
+        remaining -= len(chunk)
+
+def _rewrite_page(raw: bytes, header_type: int, granule_position: int, serial: int, sequence: int) -> bytes:
+    """Return the page with new header fields and a fresh CRC."""
+    page = bytearray(raw)
+    struct.pack_into("<BqIII", page, 5, header_type, granule_position, serial, sequence, 0)
+    struct.pack_into("<I", page, CRC_OFFSET, ogg_crc(page))
+    return bytes(page)
+
+def stitch_files(sources: List[Path], output_path: Path) -> int:
+    """Join Ogg files of the same codec setup into one logical stream.
+    
+    The first file is copied untouched (in the kernel where possible)
+    except for its last page. Later files lose their header pages, and
+    their pages take the first file's serial, continue its sequence
+    numbers and have their granule positions offset by the audio before
+    them. Only the final page keeps the end-of-stream flag. Returns the
+    number of pages rewritten.
+    """
+    files = []
+    for source in sources:
+        f = open(source, "rb")
+        pages = scan_pages(f)
+        if pages:
+            files.append((f, pages))
+        else:
+            f.close()
+    if not files:
+        raise ValueError("No complete Ogg pages in the source files")
+    
+    rewritten = 0
+    try:
+        with open(output_path, "wb") as out:
+            serial = files[0][1][0][2].serial
+            sequence = 0
+            granule_offset = 0
+            for index, (f, pages) in enumerate(files):
+                if index == 0:
+                    copy_length, _, last_page = pages[-1]
+                    _copy_range(f, out, copy_length)
+                    sequence = last_page.sequence
+                    rewrite = pages[-1:]
+                else:
+                    # The stream headers precede the first audio page
+                    skip = 0
+                    while skip < len(pages) and pages[skip][2].granule_position == 0:
+                        skip += 1
+                    rewrite = pages[skip:]
+                if not rewrite:
+                    continue
+                
+                start = rewrite[0][0]
+                f.seek(start)
+                data = f.read(rewrite[-1][0] + rewrite[-1][1] - start)
+                last_file = index == len(files) - 1
+                output = []
+                granule = granule_offset
+                for i, (offset, length, page) in enumerate(rewrite):
+                    header_type = page.header_type & ~FLAG_EOS
+                    if index > 0:
+                        header_type &= ~FLAG_BOS
+                    if last_file and i == len(rewrite) - 1:
+                        header_type |= FLAG_EOS
+                    # -1 marks a page on which no packet ends
+                    if page.granule_position != -1:
+                        granule = granule_offset + page.granule_position
+                        page_granule = granule
+                    else:
+                        page_granule = -1
+                    raw = data[offset - start:offset - start + length]
+                    output.append(_rewrite_page(raw, header_type, page_granule, serial, sequence))
+                    sequence += 1
+                out.write(b"".join(output))
+                rewritten += len(rewrite)
+                granule_offset = granule
+    finally:
+        for f, _ in files:
+            f.close()
+    return rewritten
+
+def last_granule_position(stream: BinaryIO) -> Optional[int]:
+    """Granule position of the last complete page that has one.
+    
+    Reads only the tail of the file: the last page starts within
+    MAX_PAGE_SIZE of the end. Candidate pages are checked against their
+    CRC, so audio bytes that happen to spell OggS are not mistaken for one.
+    """
+    file_size = os.fstat(stream.fileno()).st_size
+    tail_start = max(0, file_size - 2 * MAX_PAGE_SIZE)
+    stream.seek(tail_start)
+    tail = stream.read(file_size - tail_start)
+    
+    index = len(tail)
+    while True:
+        index = tail.rfind(OGG_CAPTURE, 0, index)
+        if index < 0:
+            return None
+        header = tail[index:index + OGG_HEADER.size]
+        if len(header) == OGG_HEADER.size:
+            _, _, _, granule, _, _, crc, segments = OGG_HEADER.unpack(header)
+            table = tail[index + OGG_HEADER.size:index + OGG_HEADER.size + segments]
+            end = index + OGG_HEADER.size + segments + sum(table)
+            if len(table) == segments and end <= len(tail) and granule != -1:
+                page = bytearray(tail[index:end])
+                struct.pack_into("<I", page, CRC_OFFSET, 0)
+                if ogg_crc(bytes(page)) == crc:
+                    return granule
+
+def opus_pre_skip(stream: BinaryIO) -> int:
+    """Pre-skip (priming samples) from the OpusHead packet on the first page."""
+    stream.seek(0)
+    page = read_page(stream)
+    if page is None:
+        return 0
+    body_start = OGG_HEADER.size + page.raw[OGG_HEADER.size - 1]
+    head = page.raw[body_start:body_start + 12]
+    if head[:8] != OPUS_HEAD or len(head) < 12:
+        return 0
+    return struct.unpack_from("<H", head, 10)[0]
+
+def opus_duration(path: Path) -> Optional[float]:
+    """Length in seconds of an Ogg Opus file, from its last granule position.
+    
+    Reads the first page and the tail only, whatever the file size.
+    Returns None if the file holds no usable page.
+    """
+    try:
+        with open(path, "rb") as f:
+            granule = last_granule_position(f)
+            if granule is None:
+                return None
+            pre_skip = opus_pre_skip(f)
+    except OSError:
+        return None
+    return max(0, granule - pre_skip) / OPUS_GRANULE_RATE
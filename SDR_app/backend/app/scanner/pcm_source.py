@@ -0,0 +1,176 @@
+"""Demodulated PCM sources feeding the audio pipeline."""
+import logging
+import math
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import BinaryIO, Optional
+import numpy as np
+from backend.app.config import scanner_config
+from backend.app.metrics import subprocess_spawns
+from backend.app.models import FrequencyEntry, ModulationType
+
+logger = logging.getLogger("scanner")
+
+# All sources produce 16-bit signed little-endian mono PCM at this rate
+PCM_SAMPLE_RATE = 48000
+
+def pcm_seconds(pcm: Optional[bytes]) -> float:
+    """Duration of a block of source-format PCM."""
+    return len(pcm) / 2 / PCM_SAMPLE_RATE if pcm else 0.0
+
+class PcmSource:
+    """Base class: produce s16le mono 48 kHz PCM for a frequency.
+    
+    start() returns a readable binary stream that the encoder uses as
+    stdin; once the encoder has it, release_output() closes our copy.
+    """
+    
+    def start(self, freq_entry: FrequencyEntry) -> BinaryIO:
+        raise NotImplementedError
+    
+    def release_output(self):
+        """Close the parent's copy of the output stream."""
+        pass
+    
+    def stop(self):
+        raise NotImplementedError
+    
+    def is_running(self) -> bool:
+        raise NotImplementedError
+
+class RtlFmSource(PcmSource):
+    """Demodulate with rtl_fm on a dongle."""
+    
+    def __init__(self, device: int):
+        self.device = device
+        self.process: Optional[subprocess.Popen] = None
+    
+    def get_params(self, freq_entry: FrequencyEntry) -> list:
+        """Get rtl_fm parameters based on modulation."""
+        freq_hz = int(freq_entry.freq_mhz * 1e6)
+        
+        # Base parameters
+        params = [
+            "rtl_fm",
+            "-d", str(self.device),
+            "-f", str(freq_hz),
+            "-g", str(scanner_config.default_squelch_db),
+        ]
+        
+        # Modulation-specific parameters
+        if freq_entry.mode == ModulationType.NFM:
+            params.extend(["-M", "fm", "-s", "24k", "-r", "48k"])
+        elif freq_entry.mode == ModulationType.FM:
+            params.extend(["-M", "fm", "-s", "50k", "-r", "48k"])
+        elif freq_entry.mode == ModulationType.WFM:
+            params.extend(["-M", "wbfm", "-s", "200k", "-r", "48k"])
+        elif freq_entry.mode == ModulationType.AM:
+            params.extend(["-M", "am", "-s", "24k", "-r", "48k"])
+        else:
+            # Default to NFM
+            params.extend(["-M", "fm", "-s", "24k", "-r", "48k"])
+        
+        params.append("-")  # Output to stdout
+        return params
+    
+    def start(self, freq_entry: FrequencyEntry) -> BinaryIO:
+        params = self.get_params(freq_entry)
+        logger.info(f"Starting rtl_fm: {' '.join(params)}")
+        
+        self.process = subprocess.Popen(
+            ["nice", "-n", str(scanner_config.nice_level)] + params,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            preexec_fn=os.setsid  # Create new process group
+        )
+        subprocess_spawns.labels("rtl_fm").inc()
+        return self.process.stdout
+    
+    def release_output(self):
+        # rtl_fm then gets SIGPIPE if the encoder exits
+        if self.process and self.process.stdout:
+            self.process.stdout.close()
+    
+    def stop(self):
+        if self.process:
+            try:
+                self.process.terminate()
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                self.process.wait()
+            self.process = None
+    
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+class SyntheticPcmSource(PcmSource):
+    """Generate a tone in real time instead of using a dongle (for testing).
+    
+    The tone is offset by the frequency's kHz so different channels are
+    audibly different.
+    """
+    
+    def __init__(self, tone_hz: float = 1000.0, amplitude: float = 0.3, block_seconds: float = 0.02):
+        self.tone_hz = tone_hz
+        self.amplitude = amplitude
+        self.block_seconds = block_seconds
+        self._output: Optional[BinaryIO] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def start(self, freq_entry: FrequencyEntry) -> BinaryIO:
+        read_fd, write_fd = os.pipe()
+        self._output = os.fdopen(read_fd, "rb", buffering=0)
+        self._stop.clear()
+        tone = self.tone_hz + (int(freq_entry.freq_mhz * 1000) % 10) * 100
+        self._thread = threading.Thread(target=self._generate, args=(write_fd, tone), daemon=True)
+        self._thread.start()
+        return self._output
+    
+    def release_output(self):
+        if self._output:
+            self._output.close()
+            self._output = None
+    
+    def _generate(self, write_fd: int, tone_hz: float):
+        """Write PCM blocks at the real-time rate until stopped."""
+        block = int(PCM_SAMPLE_RATE * self.block_seconds)
+        phase_step = 2 * math.pi * tone_hz / PCM_SAMPLE_RATE
+        scale = self.amplitude * 32767
+        sample = 0
+        next_time = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                t = np.arange(sample, sample + block)
+                pcm = (np.sin(t * phase_step) * scale).astype("<i2")
+                os.write(write_fd, pcm.tobytes())
+                sample += block
+                next_time += self.block_seconds
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    self._stop.wait(delay)
+        except OSError:
+            # Reader went away
+            pass
+        finally:
+            os.close(write_fd)
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.release_output()
+    
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+def create_pcm_source(device: int) -> PcmSource:
+    """Build the PCM source selected in the scanner configuration."""
+    if scanner_config.audio_source == "synthetic":
+        return SyntheticPcmSource()
+    return RtlFmSource(device)
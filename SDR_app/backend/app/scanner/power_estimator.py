@@ -0,0 +1,99 @@
+"""Vectorized power estimation, adaptive noise floor and early-exit decisions."""
+import math
+from functools import lru_cache
+from typing import Dict, Optional
+import numpy as np
+
+@lru_cache(maxsize=8)
+def _hann_window(fft_size: int) -> np.ndarray:
+    """Return a cached Hann window."""
+    return np.hanning(fft_size).astype(np.float32)
+
+def averaged_psd(iq: np.ndarray, fft_size: int) -> np.ndarray:
+    """Averaged power spectrum (Welch, no overlap), DC-centred.
+    
+    Scaled so a full-scale complex tone reads 1.0 (0 dBFS) in its bin.
+    """
+    segments = len(iq) // fft_size
+    if segments == 0:
+        raise ValueError(f"Capture of {len(iq)} samples is shorter than FFT size {fft_size}")
+    
+    window = _hann_window(fft_size)
+    # Remove the rtl-sdr DC offset so the centre bin does not read as a carrier
+    blocks = iq[:segments * fft_size].reshape(segments, fft_size)
+    blocks = (blocks - iq.mean()) * window
+    spectrum = np.fft.fft(blocks, axis=1)
+    power = (spectrum.real ** 2 + spectrum.imag ** 2).mean(axis=0)
+    power /= float(window.sum()) ** 2
+    return np.fft.fftshift(power)
+
+def band_power(psd: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Sum PSD bins lo..hi (inclusive) for many bands at once via a prefix sum."""
+    cumulative = np.concatenate(([0.0], np.cumsum(psd)))
+    return cumulative[hi + 1] - cumulative[lo]
+
+class NoiseFloorTracker:
+    """Per-frequency noise floor estimate in dBFS.
+    
+    Follows quiet measurements with an asymmetric moving average: it drops
+    quickly when the band gets quieter and rises slowly, so a signal that
+    slips past the detector cannot drag the floor up with it.
+    """
+    
+    def __init__(self, rise_rate: float = 0.05, fall_rate: float = 0.3):
+        self.rise_rate = rise_rate
+        self.fall_rate = fall_rate
+        self.floors: Dict[int, float] = {}
+    
+    def get(self, freq_hz: int) -> Optional[float]:
+        """Return the floor for a frequency, or None if not measured yet."""
+        return self.floors.get(freq_hz)
+    
+    def update(self, freq_hz: int, power_db: float) -> float:
+        """Fold a quiet measurement into the floor and return the new floor."""
+        floor = self.floors.get(freq_hz)
+        if floor is None:
+            floor = power_db
+        else:
+            rate = self.fall_rate if power_db < floor else self.rise_rate
+            floor += rate * (power_db - floor)
+        self.floors[freq_hz] = floor
+        return floor
+
+class SequentialDecision:
+    """Decide whether the mean SNR exceeds a threshold, stopping early when sure.
+    
+    After min_blocks, the decision is made as soon as the threshold lies
+    outside mean ± z standard errors; at max_blocks the mean decides.
+    """
+    
+    def __init__(self, threshold_db: float, z: float = 3.0, min_blocks: int = 2,
+                 max_blocks: int = 20, min_sigma_db: float = 1.0):
+        self.threshold_db = threshold_db
+        self.z = z
+        self.min_blocks = min_blocks
+        self.max_blocks = max_blocks
+        self.min_sigma_db = min_sigma_db
+        self.blocks = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+    
+    def add(self, snr_db: float) -> Optional[bool]:
+        """Add one block's SNR; returns the decision once confident, else None."""
+        self.blocks += 1
+        delta = snr_db - self.mean
+        self.mean += delta / self.blocks
+        self._m2 += delta * (snr_db - self.mean)
+        
+        if self.blocks < self.min_blocks:
+            return None
+        if self.blocks >= self.max_blocks:
+            return self.mean >= self.threshold_db
+        
+        sigma = max(math.sqrt(self._m2 / (self.blocks - 1)), self.min_sigma_db)
+        margin = self.z * sigma / math.sqrt(self.blocks)
+        if self.mean - margin > self.threshold_db:
+            return True
+        if self.mean + margin < self.threshold_db:
+            return False
+        return None
@@ -0,0 +1,292 @@
+"""Recording lifecycle off the scan loop: one worker task per recorder."""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+from backend.app.catalog import recording_catalog
+from backend.app.config import scanner_config
+from backend.app.events import event_bus
+from backend.app.metrics import detection_to_record_seconds, scan_stage_seconds
+from backend.app.models import Detection, FrequencyEntry, Recording
+from backend.app.scanner.audio_pipeline import AudioPipeline, assemble_session
+from backend.app.scanner.ogg import opus_duration
+from backend.app.scanner.pcm_source import PcmSource, pcm_seconds
+from backend.app.scanner.peaks import PeakMeter
+from backend.app.scanner.storage import storage_accountant
+from backend.app.scanner.tone_decoder import ToneDecoder
+
+logger = logging.getLogger("scanner")
+
+_stage_start = scan_stage_seconds.labels("record_start")
+_stage_stop = scan_stage_seconds.labels("record_stop")
+_stage_finalize = scan_stage_seconds.labels("finalize")
+
+class RecordingSession:
+    """An active recording as seen by the scan loop."""
+    __slots__ = ("freq_entry", "start_time", "end_time", "slot",
+                 "signal_strength_db", "preroll", "tones", "peaks", "discard", "requested")
+    
+    def __init__(self, freq_entry: FrequencyEntry, slot: "_RecorderSlot", preroll: Optional[bytes] = None):
+        self.freq_entry = freq_entry
+        self.preroll = preroll  # s16le PCM from detection, recorded first
+        # The recording starts with the pre-roll audio. The file name and the
+        # catalog both use this one timestamp, at the file name's resolution.
+        start_time = datetime.utcnow() - timedelta(seconds=pcm_seconds(preroll))
+        self.start_time = start_time.replace(microsecond=0)
+        self.end_time: Optional[datetime] = None
+        self.slot = slot
+        self.signal_strength_db: Optional[float] = None
+        # Fed the recorded audio by the pipeline
+        self.tones = ToneDecoder() if scanner_config.tone_decode_enabled else None
+        self.peaks = PeakMeter() if scanner_config.waveform_peaks_enabled else None
+        self.discard = False  # Delete instead of cataloging (tone squelch)
+        self.requested = time.monotonic()  # When the scan loop asked for the recording
+    
+    @property
+    def ctcss_tone(self) -> Optional[float]:
+        return self.tones.ctcss_tone if self.tones else None
+    
+    @property
+    def dcs_code(self) -> Optional[int]:
+        return self.tones.dcs_code if self.tones else None
+    
+    def tone_matches(self) -> Optional[bool]:
+        """Whether the decoded squelch tone is the frequency's; None if unknown yet."""
+        entry = self.freq_entry
+        if self.ctcss_tone is None and self.dcs_code is None:
+            return None
+        if entry.ctcss is not None and self.ctcss_tone is not None and abs(self.ctcss_tone - entry.ctcss) < 0.5:
+            return True
+        return entry.dcs is not None and self.dcs_code == entry.dcs
+    
+    def note_detection(self, detection: Detection):
+        """Keep the strongest reading and report the squelch tone decoded so far."""
+        if self.signal_strength_db is None or detection.signal_strength_db > self.signal_strength_db:
+            self.signal_strength_db = detection.signal_strength_db
+        if self.ctcss_tone is not None:
+            detection.ctcss_tone = self.ctcss_tone
+        if self.dcs_code is not None:
+            detection.dcs_code = self.dcs_code
+
+class _RecorderSlot:
+    """One audio pipeline (dongle) and the queue of events for it."""
+    __slots__ = ("index", "pipeline", "queue", "task", "session")
+    
+    def __init__(self, index: int, device: int, source_factory: Optional[Callable[[], PcmSource]] = None):
+        self.index = index
+        self.pipeline = AudioPipeline(device=device, source_factory=source_factory)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.session: Optional[RecordingSession] = None
+
+class RecordingManager:
+    """Start, stop and finalize recordings without blocking the scan loop.
+    
+    The scan loop only enqueues events. Each recorder has its own worker
+    task that runs the blocking pipeline calls in a thread, and session
+    assembly runs as a separate task so the recorder is free again as soon
+    as its processes have exited.
+    """
+    
+    def __init__(self, on_finalized: Optional[Callable[[float, Path], None]] = None):
+        self.on_finalized = on_finalized
+        self.slots: List[_RecorderSlot] = []
+        self.sessions: Dict[float, RecordingSession] = {}  # freq_mhz -> session
+        self.finalizing_count = 0  # Stops and assemblies in progress
+        self._assembly_tasks: Set[asyncio.Task] = set()
+    
+    def start(self, source_factory: Optional[Callable[[], PcmSource]] = None, count: Optional[int] = None):
+        """Create the recorders and start the workers.
+        
+        By default there is one recorder per configured device. With a
+        source_factory (e.g. channels of the channelizer), count recorders
+        take their audio from it instead of a dongle.
+        """
+        if source_factory:
+            self.slots = [_RecorderSlot(index, scanner_config.scanner_device, source_factory)
+                          for index in range(count or 1)]
+            description = "from the channelizer"
+        else:
+            devices = scanner_config.recorder_devices or [scanner_config.scanner_device]
+            self.slots = [_RecorderSlot(index, device) for index, device in enumerate(devices)]
+            description = f"on devices {devices}"
+        self.sessions = {}
+        for slot in self.slots:
+            slot.task = asyncio.create_task(self._worker(slot))
+        logger.info(f"Recording manager started with {len(self.slots)} recorder(s) {description}")
+    
+    async def shutdown(self):
+        """Stop every session, wait for finalization, then stop the workers."""
+        for freq_mhz in list(self.sessions):
+            self.request_stop(freq_mhz)
+        
+        for slot in self.slots:
+            await slot.queue.join()
+        if self._assembly_tasks:
+            await asyncio.gather(*self._assembly_tasks, return_exceptions=True)
+        
+        for slot in self.slots:
+            if slot.task:
+                slot.task.cancel()
+                try:
+                    await slot.task
+                except asyncio.CancelledError:
+                    pass
+        self.slots = []
+    
+    def is_recording(self, freq_mhz: float) -> bool:
+        """Check if a frequency is being recorded."""
+        return freq_mhz in self.sessions
+    
+    def has_free_recorder(self) -> bool:
+        """Check if any recorder is idle."""
+        return any(slot.session is None for slot in self.slots)
+    
+    def oldest_session(self) -> Optional[RecordingSession]:
+        """Return the session that has been recording the longest."""
+        if not self.sessions:
+            return None
+        return min(self.sessions.values(), key=lambda s: s.start_time)
+    
+    def request_start(self, freq_entry: FrequencyEntry, preroll: Optional[bytes] = None) -> bool:
+        """Reserve an idle recorder and queue a start; False if all are busy.
+        
+        preroll is PCM captured during detection that the recording starts with.
+        """
+        if freq_entry.freq_mhz in self.sessions:
+            return True
+        slot = next((s for s in self.slots if s.session is None), None)
+        if slot is None:
+            return False
+        
+        session = RecordingSession(freq_entry, slot, preroll)
+        slot.session = session
+        self.sessions[freq_entry.freq_mhz] = session
+        slot.queue.put_nowait(("start", session))
+        return True
+    
+    def request_stop(self, freq_mhz: float, discard: bool = False):
+        """Release the recorder for a frequency and queue its stop.
+        
+        With discard the recorded audio is deleted instead of cataloged.
+        """
+        session = self.sessions.pop(freq_mhz, None)
+        if session is None:
+            return
+        session.slot.session = None
+        session.end_time = datetime.utcnow()
+        session.discard = discard
+        self.finalizing_count += 1
+        session.slot.queue.put_nowait(("stop", session))
+    
+    def recorder_alive(self, freq_mhz: float) -> bool:
+        """Check if the recording processes for a frequency are still running."""
+        session = self.sessions.get(freq_mhz)
+        return session is not None and session.slot.pipeline.is_recording()
+    
+    async def _worker(self, slot: _RecorderSlot):
+        """Process start/stop events for one recorder in order."""
+        while True:
+            action, session = await slot.queue.get()
+            try:
+                if action == "start":
+                    await self._start(slot, session)
+                else:
+                    await self._stop(slot, session)
+            except Exception as e:
+                logger.error(f"Recorder {slot.index} failed to {action} {session.freq_entry.freq_mhz} MHz: {e}")
+            finally:
+                slot.queue.task_done()
+    
+    async def _start(self, slot: _RecorderSlot, session: RecordingSession):
+        """Start the pipeline for a session."""
+        preroll, session.preroll = session.preroll, None
+        with _stage_start.time():
+            success = await asyncio.to_thread(slot.pipeline.start_recording, session.freq_entry, preroll,
+                                               session.tones, session.peaks, session.start_time)
+        if success:
+            detection_to_record_seconds.observe(time.monotonic() - session.requested)
+            logger.info(f"Started recording: {session.freq_entry.freq_mhz} MHz (recorder {slot.index})")
+            event_bus.publish("recording_start", {
+                "freq_mhz": session.freq_entry.freq_mhz,
+                "label": session.freq_entry.label,
+                "recorder": slot.index,
+                "start_time": session.start_time.isoformat(),
+                "preroll_seconds": pcm_seconds(preroll)
+            })
+        elif self.sessions.get(session.freq_entry.freq_mhz) is session:
+            # Free the recorder so the next hit can retry
+            self.sessions.pop(session.freq_entry.freq_mhz)
+            slot.session = None
+    
+    async def _stop(self, slot: _RecorderSlot, session: RecordingSession):
+        """Stop the pipeline and hand the chunks to an assembly task."""
+        try:
+            with _stage_stop.time():
+                chunk_files = await asyncio.to_thread(slot.pipeline.stop_recording)
+            if chunk_files and session.discard:
+                await asyncio.to_thread(self._discard, chunk_files)
+                logger.info(f"Discarded recording of {session.freq_entry.freq_mhz} MHz (tone squelch)")
+            elif chunk_files:
+                self.finalizing_count += 1
+                task = asyncio.create_task(self._assemble(session, chunk_files))
+                self._assembly_tasks.add(task)
+                task.add_done_callback(self._assembly_tasks.discard)
+        finally:
+            self.finalizing_count -= 1
+    
+    def _discard(self, chunk_files: List[Path]):
+        """Delete the files of a discarded session."""
+        for chunk in chunk_files:
+            chunk.unlink(missing_ok=True)
+        storage_accountant.remove_files(chunk_files)
+    
+    async def _assemble(self, session: RecordingSession, chunk_files: List[Path]):
+        """Assemble chunks into a session file and add it to the catalog."""
+        try:
+            first_chunk = chunk_files[0]
+            session_name = first_chunk.name.rsplit('_part', 1)[0] + ".ogg"
+            session_path = first_chunk.parent / session_name
+            
+            with _stage_finalize.time():
+                recording = await asyncio.to_thread(self._assemble_and_catalog, session, chunk_files, session_path)
+            if recording:
+                logger.info(f"Session created: {session_path}")
+                event_bus.publish("recording_finalized", recording.model_dump(mode="json"))
+                if self.on_finalized:
+                    self.on_finalized(session.freq_entry.freq_mhz, session_path)
+        except Exception as e:
+            logger.error(f"Error finalizing session: {e}")
+        finally:
+            self.finalizing_count -= 1
+    
+    def _assemble_and_catalog(self, session: RecordingSession, chunk_files: List[Path],
+                              session_path: Path) -> Optional[Recording]:
+        """Blocking part of finalization, run in a worker thread."""
+        if not assemble_session(chunk_files, session_path):
+            return None
+        
+        freq_entry = session.freq_entry
+        end_time = session.end_time or datetime.utcnow()
+        # The audio's own length, from the last page's granule position
+        duration = opus_duration(session_path)
+        if duration is None:
+            duration = (end_time - session.start_time).total_seconds()
+        recording = Recording(
+            id=session_path.stem,
+            freq_mhz=freq_entry.freq_mhz,
+            mode=freq_entry.mode,
+            start_time=session.start_time,
+            end_time=end_time,
+            duration_seconds=duration,
+            file_size_bytes=session_path.stat().st_size,
+            file_path=session_path.name,
+            ctcss_tone=session.ctcss_tone,
+            dcs_code=session.dcs_code,
+            label=freq_entry.label,
+            signal_strength_db=session.signal_strength_db
+        )
+        recording_catalog.add(recording, peaks=session.peaks.to_bytes() if session.peaks else None)
+        return recording
@@ -1,13 +1,21 @@
 """Resource monitoring and adaptive throttling for Pi2B."""
+import asyncio
 import psutil
 import time
 import logging
-from typing import Dict, Optional
+from collections import deque
+from typing import Deque, Dict, List, Optional
 from backend.app.config import resource_thresholds, throttle_state, scanner_config
+from backend.app.events import event_bus
+from backend.app.metrics import scan_stage_seconds
 from backend.app.models import ResourceUsage
+from backend.app.scanner.kmsg import KmsgReader
+from backend.app.scanner.storage import storage_accountant
 
 logger = logging.getLogger("scanner")
 
+_stage_sample = scan_stage_seconds.labels("resource_sample")
+
 class ResourceMonitor:
     """Monitor system resources and trigger adaptive throttling."""
     
@@ -15,10 +23,21 @@ class ResourceMonitor:
         self.baseline_swap_mb = 0
         self.last_throttle_time = 0
         self.throttle_hysteresis = resource_thresholds.hysteresis_seconds
-        self.usb_error_count = 0
+        self.kmsg_reader = KmsgReader(window_seconds=resource_thresholds.usb_error_window_seconds)
+        
+        # Background sampler state
+        self.latest: Optional[ResourceUsage] = None
+        self.latest_time = 0.0
+        self.latest_usb_errors = 0
+        self.samples: Deque[ResourceUsage] = deque(maxlen=scanner_config.resource_history_size)
+        self._task: Optional[asyncio.Task] = None
         
         # Record baseline
         self._record_baseline()
+        
+        # Prime the CPU counters so the first non-blocking sample has a reference
+        psutil.cpu_times_percent(interval=None)
+        psutil.cpu_percent(interval=None)
     
     def _record_baseline(self):
         """Record baseline resource usage."""
@@ -30,28 +49,27 @@ class ResourceMonitor:
             logger.error(f"Failed to record baseline: {e}")
     
     def get_resource_usage(self) -> ResourceUsage:
-        """Get current resource usage."""
+        """Measure current resource usage.
+        
+        CPU figures cover the time since the previous call, so this does not
+        block; the sampler calls it on a fixed cadence.
+        """
         try:
             # CPU usage (per-core times)
-            cpu_times = psutil.cpu_times_percent(interval=0.5)
-            cpu_percent = psutil.cpu_percent(interval=0)
+            cpu_times = psutil.cpu_times_percent(interval=None)
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             # Memory
             mem = psutil.virtual_memory()
             swap = psutil.swap_memory()
             
             # Disk (recordings directory)
-            from backend.app.config import RECORDINGS_DIR, BASE_DIR
+            from backend.app.config import BASE_DIR
             disk = psutil.disk_usage(str(BASE_DIR))
             
-            # Calculate recordings size
-            recordings_size_bytes = 0
-            if RECORDINGS_DIR.exists():
-                for f in RECORDINGS_DIR.rglob("*.ogg"):
-                    try:
-                        recordings_size_bytes += f.stat().st_size
-                    except:
-                        pass
+            # Recordings size (running total, no directory walk)
+            storage_accountant.ensure_scanned()
+            recordings_size_bytes = storage_accountant.total_bytes
             
             return ResourceUsage(
                 cpu_percent=cpu_percent,
@@ -81,24 +99,79 @@ class ResourceMonitor:
             )
     
     def check_usb_errors(self) -> int:
-        """Check for USB errors in dmesg (simple count)."""
+        """Read new kernel log records and return USB errors within the window."""
         try:
-            import subprocess
-            result = subprocess.run(
-                ["dmesg", "-T"],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            if result.returncode == 0:
-                # Count USB-related error lines
-                error_count = sum(1 for line in result.stdout.lower().split('\n') 
-                                if 'usb' in line and ('error' in line or 'fail' in line))
-                return error_count
+            self.kmsg_reader.window_seconds = resource_thresholds.usb_error_window_seconds
+            self.kmsg_reader.poll()
+            return self.kmsg_reader.error_count()
         except Exception as e:
             logger.warning(f"Could not check USB errors: {e}")
         return 0
     
+    def get_snapshot(self) -> ResourceUsage:
+        """Return the latest sample, measuring once if the sampler has not run yet."""
+        if self.latest is None:
+            self.sample()
+        return self.latest
+    
+    def get_smoothed_usage(self, count: Optional[int] = None) -> Optional[ResourceUsage]:
+        """Average of the most recent samples (None before the first sample)."""
+        count = count or scanner_config.resource_smoothing_samples
+        recent: List[ResourceUsage] = list(self.samples)[-count:]
+        if not recent:
+            return None
+        if len(recent) == 1:
+            return recent[0]
+        
+        fields = recent[-1].model_dump()
+        for name in fields:
+            fields[name] = sum(getattr(s, name) for s in recent) / len(recent)
+        return ResourceUsage(**fields)
+    
+    def sample(self) -> ResourceUsage:
+        """Take one sample, store it and update throttling."""
+        with _stage_sample.time():
+            resources = self.get_resource_usage()
+            self.latest_usb_errors = self.check_usb_errors()
+        self.latest = resources
+        self.latest_time = time.time()
+        self.samples.append(resources)
+        event_bus.publish("resources", resources.model_dump())
+        
+        smoothed = self.get_smoothed_usage() or resources
+        should_throttle, reason = self.should_throttle(smoothed)
+        
+        if should_throttle:
+            self.apply_throttle(reason)
+        elif self.should_release_throttle(smoothed):
+            self.release_throttle()
+        
+        return resources
+    
+    def start(self):
+        """Start the background sampler (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sample_loop())
+    
+    async def stop(self):
+        """Stop the background sampler."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _sample_loop(self):
+        """Sample resources every resource_sample_seconds."""
+        while True:
+            try:
+                await asyncio.to_thread(self.sample)
+            except Exception as e:
+                logger.error(f"Resource sampling failed: {e}")
+            await asyncio.sleep(scanner_config.resource_sample_seconds)
+    
     def should_throttle(self, resources: ResourceUsage) -> tuple[bool, Optional[str]]:
         """Determine if throttling should be activated."""
         reasons = []
@@ -120,11 +193,10 @@ class ResourceMonitor:
         if swap_growth > resource_thresholds.swap_growth_mb_max:
             reasons.append(f"Swap growth: {swap_growth:.1f} MB > {resource_thresholds.swap_growth_mb_max} MB")
         
-        # Check USB errors
-        current_usb_errors = self.check_usb_errors()
-        if current_usb_errors > self.usb_error_count + resource_thresholds.usb_error_count_max:
-            reasons.append(f"USB errors: {current_usb_errors} new errors")
-            self.usb_error_count = current_usb_errors
+        # Check USB errors within the sliding window (counted by the latest sample)
+        current_usb_errors = self.latest_usb_errors
+        if current_usb_errors > resource_thresholds.usb_error_count_max:
+            reasons.append(f"USB errors: {current_usb_errors} in last {resource_thresholds.usb_error_window_seconds}s")
         
         if reasons:
             return True, "; ".join(reasons)
@@ -158,12 +230,14 @@ class ResourceMonitor:
             throttle_state.chunk_duration_seconds = 45  # Increase chunk to 45s
             throttle_state.skip_frequencies = 1  # Skip every other frequency
             self.last_throttle_time = time.time()
+            event_bus.publish("throttle", throttle_state.model_dump())
         else:
             # Already throttled, escalate if needed
             if throttle_state.chunk_duration_seconds < 60:
                 throttle_state.chunk_duration_seconds = 60
                 throttle_state.skip_frequencies = 2  # Skip 2 out of 3 frequencies
                 logger.warning("Escalating throttle: increased chunk to 60s, skip 2/3 frequencies")
+                event_bus.publish("throttle", throttle_state.model_dump())
     
     def release_throttle(self):
         """Release throttling measures."""
@@ -175,19 +249,11 @@ class ResourceMonitor:
             throttle_state.chunk_duration_seconds = scanner_config.chunk_duration_seconds
             throttle_state.skip_frequencies = 0
             throttle_state.paused = False
+            event_bus.publish("throttle", throttle_state.model_dump())
     
     def monitor_and_adjust(self) -> ResourceUsage:
-        """Monitor resources and adjust throttling."""
-        resources = self.get_resource_usage()
-        
-        should_throttle, reason = self.should_throttle(resources)
-        
-        if should_throttle:
-            self.apply_throttle(reason)
-        elif self.should_release_throttle(resources):
-            self.release_throttle()
-        
-        return resources
+        """Monitor resources and adjust throttling (one synchronous sample)."""
+        return self.sample()
 
 # Global monitor instance
 resource_monitor = ResourceMonitor()
@@ -0,0 +1,185 @@
+"""Retention: delete expired recordings and keep the archive under its cap."""
+import asyncio
+import heapq
+import logging
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+from backend.app.catalog import parse_recording_filename, recording_catalog
+from backend.app.config import scanner_config, RECORDINGS_DIR
+from backend.app.events import event_bus
+from backend.app.scanner.storage import storage_accountant
+
+logger = logging.getLogger("scanner")
+
+GIB = 1024 ** 3
+
+class PrunePlan:
+    """Files chosen for deletion by one retention pass."""
+    
+    def __init__(self, files: List[Tuple[Path, int]], expired: int, total_bytes: int, free_bytes: int):
+        self.files = files  # (path, size), oldest first
+        self.expired = expired  # How many of them are past retention_days
+        self.total_bytes = total_bytes
+        self.free_bytes = free_bytes
+    
+    @property
+    def bytes(self) -> int:
+        return sum(size for _, size in self.files)
+
+class RetentionManager:
+    """Prune recordings on a schedule, in the backend.
+    
+    Sizes come from the storage accountant and recording times from the
+    file names, so planning touches the disk only for free space. One
+    pass picks every expired file plus, from a heap ordered by age, just
+    enough of the oldest to bring the archive back under the low-water
+    mark; deletions then run in small batches with a pause in between.
+    Files of sessions still being written are never touched.
+    """
+    
+    def __init__(self, directory: Path = RECORDINGS_DIR):
+        self.directory = Path(directory)
+        self.last_run: Optional[datetime] = None
+        self.files_deleted = 0
+        self.bytes_freed = 0
+        self._task: Optional[asyncio.Task] = None
+        # Scheduled and requested passes never run at the same time
+        self._run_lock = asyncio.Lock()
+    
+    def _recorded_at(self, path: Path) -> float:
+        """Recording start (Unix time) from the file name, else its mtime."""
+        metadata = parse_recording_filename(path.name)
+        if metadata:
+            return (metadata["timestamp"] - datetime(1970, 1, 1)).total_seconds()
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return 0.0
+    
+    def plan(self, now: Optional[datetime] = None) -> PrunePlan:
+        """Choose the files to delete (no deletions)."""
+        storage_accountant.ensure_scanned()
+        sizes = storage_accountant.snapshot()
+        total = sum(sizes.values())
+        try:
+            free = shutil.disk_usage(self.directory).free
+        except OSError:
+            free = 0
+        
+        now = now or datetime.utcnow()
+        cutoff = (now - timedelta(days=scanner_config.retention_days) - datetime(1970, 1, 1)).total_seconds()
+        cap = scanner_config.storage_cap_gb * GIB
+        
+        # Bytes to free: down to the low-water mark once the high-water mark
+        # is crossed, and enough to restore the free space margin
+        need = 0
+        if total > cap * scanner_config.storage_high_water_fraction:
+            need = total - int(cap * scanner_config.storage_low_water_fraction)
+        min_free = int(scanner_config.storage_min_free_gb * GIB)
+        if free < min_free:
+            margin = int(cap * (scanner_config.storage_high_water_fraction - scanner_config.storage_low_water_fraction))
+            need = max(need, min_free + margin - free)
+        
+        expired: List[Tuple[float, Path, int]] = []
+        heap: List[Tuple[float, str, int]] = []
+        for key, size in sizes.items():
+            if "_part" in key:
+                continue
+            path = self.directory / key
+            recorded_at = self._recorded_at(path)
+            if recorded_at < cutoff:
+                expired.append((recorded_at, path, size))
+            else:
+                heap.append((recorded_at, key, size))
+        
+        expired.sort(key=lambda item: item[0])
+        files = [(path, size) for _, path, size in expired]
+        freed = sum(size for _, size in files)
+        if freed < need:
+            heapq.heapify(heap)
+            while heap and freed < need:
+                _, key, size = heapq.heappop(heap)
+                files.append((self.directory / key, size))
+                freed += size
+        return PrunePlan(files, len(expired), total, free)
+    
+    def _delete(self, files: List[Tuple[Path, int]]) -> int:
+        """Delete a batch and drop it from the catalog and the accountant."""
+        paths = [path for path, _ in files]
+        freed = 0
+        for path, size in files:
+            try:
+                path.unlink()
+                freed += size
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not delete {path}: {e}")
+        storage_accountant.remove_files(paths)
+        recording_catalog.delete_many([path.stem for path in paths])
+        return freed
+    
+    def _batches(self, plan: PrunePlan) -> List[List[Tuple[Path, int]]]:
+        size = max(1, scanner_config.retention_batch_size)
+        return [plan.files[i:i + size] for i in range(0, len(plan.files), size)]
+    
+    def _report(self, plan: PrunePlan, freed: int, elapsed: float):
+        self.last_run = datetime.utcnow()
+        if not plan.files:
+            logger.debug(f"Retention: nothing to prune ({plan.total_bytes / GIB:.2f} GB used)")
+            return
+        self.files_deleted += len(plan.files)
+        self.bytes_freed += freed
+        logger.info(f"Retention: deleted {len(plan.files)} recordings ({plan.expired} expired), "
+                    f"freed {freed / (1024 * 1024):.1f} MB in {elapsed:.1f}s")
+        event_bus.publish("storage_pruned", {
+            "files": len(plan.files),
+            "expired": plan.expired,
+            "bytes_freed": freed
+        })
+    
+    async def run(self) -> PrunePlan:
+        """One pass: plan in a thread, then delete batch by batch.
+        
+        A pass requested while another is running waits for it.
+        """
+        async with self._run_lock:
+            start = time.monotonic()
+            plan = await asyncio.to_thread(self.plan)
+            freed = 0
+            for index, batch in enumerate(self._batches(plan)):
+                if index:
+                    await asyncio.sleep(scanner_config.retention_batch_pause_seconds)
+                freed += await asyncio.to_thread(self._delete, batch)
+            self._report(plan, freed, time.monotonic() - start)
+            return plan
+    
+    def start(self):
+        """Start the periodic pruning."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        """Stop the periodic pruning."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _loop(self):
+        """Prune now, then every retention_interval_seconds."""
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Retention pass failed: {e}")
+            await asyncio.sleep(scanner_config.retention_interval_seconds)
+
+# Global retention manager instance
+retention_manager = RetentionManager()
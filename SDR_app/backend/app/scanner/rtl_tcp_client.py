@@ -0,0 +1,266 @@
+"""Persistent rtl_tcp client streaming IQ into a reusable ring buffer."""
+import asyncio
+import logging
+import socket
+import struct
+from typing import AsyncIterator, Optional
+import numpy as np
+
+logger = logging.getLogger("scanner")
+
+# rtl_tcp command opcodes (5-byte packets: uint8 command, uint32 big-endian parameter)
+CMD_SET_FREQUENCY = 0x01
+CMD_SET_SAMPLE_RATE = 0x02
+CMD_SET_GAIN_MODE = 0x03
+CMD_SET_GAIN = 0x04
+CMD_SET_FREQ_CORRECTION = 0x05
+CMD_SET_AGC_MODE = 0x08
+
+# Server greeting: "RTL0", tuner type, gain count
+HEADER_SIZE = 12
+
+# rtl_tcp hands samples over in USB transfers of this size (its default)
+RTL_TCP_TRANSFER_BYTES = 256 * 1024
+
+class IQRingBuffer:
+    """Fixed-size byte ring written by the socket and read by the detector.
+    
+    Positions are absolute byte counts since the stream started, so a reader
+    can ask for "n bytes starting at position p" and detect if they were
+    overwritten.
+    """
+    
+    def __init__(self, capacity_bytes: int):
+        self.capacity = capacity_bytes
+        self.buffer = np.zeros(capacity_bytes, dtype=np.uint8)
+        self.total_written = 0
+    
+    def writable_view(self, max_bytes: int) -> memoryview:
+        """Return a view of contiguous free space at the write position."""
+        offset = self.total_written % self.capacity
+        size = min(max_bytes, self.capacity - offset) if max_bytes > 0 else self.capacity - offset
+        return memoryview(self.buffer)[offset:offset + size]
+    
+    def commit(self, nbytes: int):
+        """Advance the write position after nbytes were written into the view."""
+        self.total_written += nbytes
+    
+    def read(self, start: int, nbytes: int) -> np.ndarray:
+        """Copy nbytes starting at absolute position start."""
+        if start + nbytes > self.total_written:
+            raise ValueError("Requested data has not been received yet")
+        if self.total_written - start > self.capacity:
+            raise ValueError("Requested data was overwritten (reader too slow)")
+        
+        offset = start % self.capacity
+        end = offset + nbytes
+        if end <= self.capacity:
+            return self.buffer[offset:end].copy()
+        return np.concatenate((self.buffer[offset:], self.buffer[:end - self.capacity]))
+
+class _RtlTcpProtocol(asyncio.BufferedProtocol):
+    """Receive the rtl_tcp header, then stream samples straight into the ring."""
+    
+    def __init__(self, ring: IQRingBuffer):
+        self.ring = ring
+        self.header = bytearray()
+        self._header_buf = bytearray(HEADER_SIZE)
+        self.header_received = asyncio.Event()
+        self.data_received = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.transport: Optional[asyncio.Transport] = None
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def get_buffer(self, sizehint: int):
+        if len(self.header) < HEADER_SIZE:
+            return memoryview(self._header_buf)[:HEADER_SIZE - len(self.header)]
+        return self.ring.writable_view(sizehint)
+    
+    def buffer_updated(self, nbytes: int):
+        if len(self.header) < HEADER_SIZE:
+            self.header.extend(self._header_buf[:nbytes])
+            if len(self.header) == HEADER_SIZE:
+                self.header_received.set()
+            return
+        self.ring.commit(nbytes)
+        self.data_received.set()
+    
+    def connection_lost(self, exc):
+        if exc:
+            logger.warning(f"rtl_tcp connection lost: {exc}")
+        self.closed.set()
+        self.header_received.set()
+        self.data_received.set()
+
+class RtlTcpClient:
+    """Long-lived rtl_tcp connection that retunes with command packets."""
+    
+    def __init__(self, host: str, port: int, buffer_seconds: float = 0.5,
+                 max_sample_rate: int = 2400000, gain_db: float = 40.0,
+                 retune_skip_bytes: int = RTL_TCP_TRANSFER_BYTES):
+        self.host = host
+        self.port = port
+        self.gain_db = gain_db
+        self.retune_skip_bytes = retune_skip_bytes
+        self.ring = IQRingBuffer(int(max_sample_rate * 2 * buffer_seconds))
+        self.tuner_type: Optional[int] = None
+        self.gain_count: Optional[int] = None
+        self._protocol: Optional[_RtlTcpProtocol] = None
+        self._frequency: Optional[int] = None
+        self._sample_rate: Optional[int] = None
+        self._receive_buffer_bytes = 0
+        self._lock = asyncio.Lock()
+    
+    def is_connected(self) -> bool:
+        """Check if the connection is open."""
+        return self._protocol is not None and not self._protocol.closed.is_set()
+    
+    async def connect(self, timeout: float = 5.0):
+        """Open the connection and read the server header."""
+        loop = asyncio.get_running_loop()
+        _, protocol = await asyncio.wait_for(
+            loop.create_connection(lambda: _RtlTcpProtocol(self.ring), self.host, self.port),
+            timeout=timeout
+        )
+        await asyncio.wait_for(protocol.header_received.wait(), timeout=timeout)
+        if protocol.closed.is_set() or bytes(protocol.header[:4]) != b"RTL0":
+            protocol.transport.close()
+            raise ConnectionError(f"Invalid rtl_tcp header from {self.host}:{self.port}")
+        
+        self._protocol = protocol
+        self.tuner_type, self.gain_count = struct.unpack(">II", bytes(protocol.header[4:12]))
+        self._frequency = None
+        self._sample_rate = None
+        sock = protocol.transport.get_extra_info("socket")
+        try:
+            self._receive_buffer_bytes = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) if sock else 0
+        except OSError:
+            self._receive_buffer_bytes = 0
+        logger.info(f"Connected to rtl_tcp at {self.host}:{self.port} (tuner {self.tuner_type}, {self.gain_count} gains)")
+        
+        # Fixed manual gain, matching the rtl_fm detector
+        self._send_command(CMD_SET_GAIN_MODE, 1)
+        self._send_command(CMD_SET_GAIN, int(self.gain_db * 10))
+    
+    def close(self):
+        """Close the connection."""
+        if self._protocol and self._protocol.transport:
+            self._protocol.transport.close()
+        self._protocol = None
+    
+    def _send_command(self, command: int, param: int):
+        """Send a 5-byte rtl_tcp command packet."""
+        if not self.is_connected():
+            raise ConnectionError("rtl_tcp not connected")
+        self._protocol.transport.write(struct.pack(">BI", command, param & 0xFFFFFFFF))
+    
+    def set_frequency(self, freq_hz: int):
+        """Retune the dongle."""
+        self._send_command(CMD_SET_FREQUENCY, freq_hz)
+        self._frequency = freq_hz
+    
+    def set_sample_rate(self, sample_rate: int):
+        """Change the sample rate."""
+        self._send_command(CMD_SET_SAMPLE_RATE, sample_rate)
+        self._sample_rate = sample_rate
+    
+    def set_gain(self, gain_db: float):
+        """Set a manual tuner gain in dB."""
+        self._send_command(CMD_SET_GAIN_MODE, 1)
+        self._send_command(CMD_SET_GAIN, int(gain_db * 10))
+        self.gain_db = gain_db
+    
+    async def _wait_for_bytes(self, position: int, timeout: float):
+        """Wait until the ring has received data up to position."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.ring.total_written < position:
+            if self._protocol.closed.is_set():
+                raise ConnectionError("rtl_tcp connection closed")
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"Timed out waiting for IQ from {self.host}:{self.port}")
+            self._protocol.data_received.clear()
+            try:
+                await asyncio.wait_for(self._protocol.data_received.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+    
+    @property
+    def retune_discard_bytes(self) -> int:
+        """Bytes skipped after a retune: data that may predate the new frequency.
+        
+        That is whatever sits in the socket receive buffer plus the
+        transfers rtl_tcp has already queued (retune_skip_bytes).
+        """
+        return self.retune_skip_bytes + self._receive_buffer_bytes
+    
+    async def _tune(self, center_freq_hz: int, sample_rate: int) -> int:
+        """Connect and retune if needed; returns the ring position of fresh data.
+        
+        Samples already in flight when retuning are discarded by skipping
+        retune_discard_bytes past the retune point. Caller holds the lock.
+        """
+        if not self.is_connected():
+            await self.connect()
+        
+        retuned = False
+        if self._sample_rate != sample_rate:
+            self.set_sample_rate(sample_rate)
+            retuned = True
+        if self._frequency != center_freq_hz:
+            self.set_frequency(center_freq_hz)
+            retuned = True
+        
+        start = self.ring.total_written
+        if retuned:
+            start += self.retune_discard_bytes
+        # Keep I/Q pairs aligned
+        return start - start % 2
+    
+    async def _read_block(self, start: int, nbytes: int, sample_rate: int) -> np.ndarray:
+        """Wait for nbytes at ring position start and copy them. Caller holds the lock."""
+        timeout = 2.0 + max(0, start - self.ring.total_written + nbytes) / (sample_rate * 2)
+        await self._wait_for_bytes(start + nbytes, timeout)
+        return self.ring.read(start, nbytes)
+    
+    async def capture(self, center_freq_hz: int, sample_rate: int, num_samples: int) -> np.ndarray:
+        """Tune if needed and return num_samples of raw uint8 IQ (2 bytes per sample).
+        
+        The capture starts at the newest data, or after the in-flight data
+        when this retunes.
+        """
+        nbytes = num_samples * 2
+        if nbytes > self.ring.capacity:
+            raise ValueError(f"Capture of {num_samples} samples exceeds ring buffer capacity")
+        
+        async with self._lock:
+            start = await self._tune(center_freq_hz, sample_rate)
+            return await self._read_block(start, nbytes, sample_rate)
+    
+    async def stream(self, center_freq_hz: int, sample_rate: int, block_samples: int) -> AsyncIterator[np.ndarray]:
+        """Tune if needed, then yield consecutive blocks of raw uint8 IQ.
+        
+        Each block starts where the previous one ended, however long the
+        consumer spent on it, so the blocks form one gapless stream. Raises
+        ValueError if the consumer fell so far behind that the ring
+        overwrote the next block, and ConnectionError if another caller
+        retuned the dongle or the connection dropped in between.
+        """
+        nbytes = block_samples * 2
+        if nbytes > self.ring.capacity:
+            raise ValueError(f"Block of {block_samples} samples exceeds ring buffer capacity")
+        
+        async with self._lock:
+            position = await self._tune(center_freq_hz, sample_rate)
+        while True:
+            async with self._lock:
+                if not self.is_connected():
+                    raise ConnectionError("rtl_tcp connection closed")
+                if (self._frequency, self._sample_rate) != (center_freq_hz, sample_rate):
+                    raise ConnectionError("rtl_tcp was retuned during the stream")
+                block = await self._read_block(position, nbytes, sample_rate)
+            position += nbytes
+            yield block
@@ -0,0 +1,163 @@
+"""Frequency visit scheduling policies for the scan loop."""
+import heapq
+import logging
+import time
+from typing import Dict, List, Optional
+from backend.app.config import scanner_config, throttle_state
+from backend.app.models import FrequencyEntry
+from backend.app.scanner.activity import ActivityStore
+
+logger = logging.getLogger("scanner")
+
+class ScanScheduler:
+    """Base class for scan schedulers.
+    
+    The engine asks for the next frequency, scans it, then reports the
+    result so the scheduler can adapt.
+    """
+    
+    def reset(self, frequency_list: List[FrequencyEntry],
+              activity: Optional[ActivityStore] = None):
+        """Start scheduling a new frequency list, seeded with past activity."""
+        raise NotImplementedError
+    
+    def next_frequency(self) -> Optional[FrequencyEntry]:
+        """Return the next frequency, or None at the end of a pass."""
+        raise NotImplementedError
+    
+    def record_result(self, freq_entry: FrequencyEntry, has_signal: bool):
+        """Report the outcome of scanning freq_entry."""
+        pass
+
+class RoundRobinScheduler(ScanScheduler):
+    """Visit frequencies in list order; throttling skips every Nth index."""
+    
+    def __init__(self):
+        self.frequency_list: List[FrequencyEntry] = []
+        self.index = 0
+    
+    def reset(self, frequency_list: List[FrequencyEntry],
+              activity: Optional[ActivityStore] = None):
+        self.frequency_list = list(frequency_list)
+        self.index = 0
+    
+    def next_frequency(self) -> Optional[FrequencyEntry]:
+        if self.index >= len(self.frequency_list):
+            # End of pass, wrap around on the next call
+            self.index = 0
+            return None
+        
+        freq_entry = self.frequency_list[self.index]
+        self.index += throttle_state.skip_frequencies + 1
+        return freq_entry
+
+class _ChannelState:
+    """Scheduling state for one frequency."""
+    __slots__ = ("entry", "weight", "pass_value", "last_hit")
+    
+    def __init__(self, entry: FrequencyEntry, weight: float):
+        self.entry = entry
+        self.weight = weight
+        self.pass_value = 0.0
+        self.last_hit: Optional[float] = None
+
+class AdaptiveScheduler(ScanScheduler):
+    """Stride scheduler weighted by recent activity.
+    
+    Each frequency is visited in proportion to its weight. A hit resets the
+    weight to the maximum so busy channels are revisited often; every empty
+    visit multiplies it by backoff, so dead channels back off exponentially
+    down to min_weight. While throttled, channels below the hot threshold
+    get their share divided by (skip_frequencies + 1) instead of arbitrary
+    indexes being dropped.
+    
+    A pass is len(frequency_list) visits, so the engine keeps its
+    end-of-pass pacing.
+    """
+    
+    def __init__(self, backoff: Optional[float] = None, min_weight: Optional[float] = None,
+                 hot_seconds: Optional[float] = None, clock=time.monotonic):
+        self.backoff = scanner_config.scheduler_backoff if backoff is None else backoff
+        self.min_weight = scanner_config.scheduler_min_weight if min_weight is None else min_weight
+        self.hot_seconds = scanner_config.scheduler_hot_seconds if hot_seconds is None else hot_seconds
+        self.clock = clock
+        self.channels: List[_ChannelState] = []
+        self.index_by_freq: Dict[float, int] = {}
+        self._heap: List[tuple] = []
+        self._outstanding: Optional[int] = None
+        self._visits_in_pass = 0
+    
+    def reset(self, frequency_list: List[FrequencyEntry],
+              activity: Optional[ActivityStore] = None):
+        self.channels = []
+        self.index_by_freq = {}
+        self._heap = []
+        self._outstanding = None
+        self._visits_in_pass = 0
+        
+        # Channels active within the hot window start at full weight
+        recent_cutoff = time.time() - self.hot_seconds
+        for index, entry in enumerate(frequency_list):
+            last_seen = activity.last_seen(int(round(entry.freq_mhz * 1e6))) if activity else None
+            hot = last_seen is not None and last_seen > recent_cutoff
+            self.channels.append(_ChannelState(entry, 1.0 if hot else 0.5))
+            self.index_by_freq.setdefault(entry.freq_mhz, index)
+            self._heap.append((0.0, index))
+        heapq.heapify(self._heap)
+    
+    def _effective_weight(self, channel: _ChannelState) -> float:
+        """Weight after applying throttling to low-priority channels."""
+        if throttle_state.active and channel.weight < 1.0:
+            return channel.weight / (throttle_state.skip_frequencies + 1)
+        return channel.weight
+    
+    def _reschedule(self, index: int):
+        """Push a channel back onto the heap one stride further on."""
+        channel = self.channels[index]
+        channel.pass_value += 1.0 / self._effective_weight(channel)
+        heapq.heappush(self._heap, (channel.pass_value, index))
+    
+    def next_frequency(self) -> Optional[FrequencyEntry]:
+        if not self.channels:
+            return None
+        
+        # A visit without a reported result still advances
+        if self._outstanding is not None:
+            self._reschedule(self._outstanding)
+            self._outstanding = None
+        
+        if self._visits_in_pass >= len(self.channels):
+            self._visits_in_pass = 0
+            return None
+        
+        _, index = heapq.heappop(self._heap)
+        self._outstanding = index
+        self._visits_in_pass += 1
+        return self.channels[index].entry
+    
+    def record_result(self, freq_entry: FrequencyEntry, has_signal: bool):
+        index = self._outstanding
+        if index is None or self.channels[index].entry is not freq_entry:
+            index = self.index_by_freq.get(freq_entry.freq_mhz)
+            if index is None:
+                return
+        channel = self.channels[index]
+        
+        if has_signal:
+            channel.weight = 1.0
+            channel.last_hit = self.clock()
+        elif channel.last_hit is None or self.clock() - channel.last_hit > self.hot_seconds:
+            channel.weight = max(self.min_weight, channel.weight * self.backoff)
+        
+        if index == self._outstanding:
+            self._outstanding = None
+            self._reschedule(index)
+
+def create_scheduler(policy: Optional[str] = None) -> ScanScheduler:
+    """Build the scheduler selected in the scanner configuration."""
+    policy = policy or scanner_config.scheduler_policy
+    if policy == "adaptive":
+        return AdaptiveScheduler()
+    if policy != "round_robin":
+        logger.warning(f"Unknown scheduler policy {policy}, using round_robin")
+    return RoundRobinScheduler()
@@ -0,0 +1,93 @@
+"""Write a recording session as one growing Ogg/Opus file."""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional
+from backend.app.scanner.live_audio import LiveAudioBuffer
+from backend.app.scanner.ogg import iter_pages, read_page
+
+logger = logging.getLogger("scanner")
+
+class OggSessionWriter:
+    """Copy the encoder's Ogg pages into a single session file.
+    
+    Only whole pages are written, and the file is flushed and synced every
+    flush_seconds, so a crash loses at most that much audio and leaves a
+    file that recover_session() can finalize. Each page is also handed to
+    the live audio buffer, if there is one.
+    """
+    
+    def __init__(self, path: Path, live_buffer: Optional[LiveAudioBuffer] = None,
+                 flush_seconds: float = 5.0):
+        self.path = Path(path)
+        self.live_buffer = live_buffer
+        self.flush_seconds = flush_seconds
+        self.pages_written = 0
+        self.bytes_written = 0
+        self.granule_position = 0
+        self._thread: Optional[threading.Thread] = None
+    
+    def run(self, stream: BinaryIO):
+        """Copy pages until the encoder's output ends (blocking)."""
+        try:
+            with open(self.path, "wb") as f:
+                last_flush = time.monotonic()
+                for page in iter_pages(stream):
+                    f.write(page.raw)
+                    self.pages_written += 1
+                    self.bytes_written += len(page.raw)
+                    if page.granule_position > 0:
+                        self.granule_position = page.granule_position
+                    if self.live_buffer:
+                        self.live_buffer.add_page(page)
+                    
+                    now = time.monotonic()
+                    if now - last_flush >= self.flush_seconds:
+                        f.flush()
+                        os.fdatasync(f.fileno())
+                        last_flush = now
+                
+                f.flush()
+                os.fdatasync(f.fileno())
+        except Exception as e:
+            logger.error(f"Session writer for {self.path.name} stopped: {e}")
+        finally:
+            if self.live_buffer:
+                self.live_buffer.close()
+    
+    def start(self, stream: BinaryIO):
+        """Run the writer in a daemon thread."""
+        self._thread = threading.Thread(target=self.run, args=(stream,), daemon=True)
+        self._thread.start()
+    
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the writer to finish; False if it is still running."""
+        if self._thread:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+def complete_length(path: Path) -> int:
+    """Length of the file up to the end of its last complete page."""
+    length = 0
+    with open(path, "rb") as f:
+        while read_page(f) is not None:
+            length = f.tell()
+    return length
+
+def recover_session(path: Path, session_path: Path) -> bool:
+    """Finalize a session file left behind by a crash.
+    
+    Drops a trailing partial page and renames the file. Returns False
+    (and removes the file) if it holds no complete page.
+    """
+    length = complete_length(path)
+    if length == 0:
+        path.unlink()
+        return False
+    if length < path.stat().st_size:
+        os.truncate(path, length)
+    path.rename(session_path)
+    return True
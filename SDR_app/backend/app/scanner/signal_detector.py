@@ -1,157 +1,156 @@
-"""Signal detection using rtl_power or simple squelch-based detection."""
-import subprocess
+"""Per-frequency signal detection from measured IQ channel power."""
 import logging
-import re
-import os
-import signal
+import math
 import time
+from typing import Optional
+import numpy as np
 from backend.app.config import scanner_config
+from backend.app.metrics import scan_stage_seconds
 from backend.app.models import FrequencyEntry
+from backend.app.scanner.demod import Demodulator, PcmRingBuffer
+from backend.app.scanner.iq_source import IQSource, RtlSdrIQSource
+from backend.app.scanner.power_estimator import (
+    NoiseFloorTracker, SequentialDecision, averaged_psd
+)
+from backend.app.scanner.sweep_detector import MODE_BANDWIDTH_HZ
 
 logger = logging.getLogger("scanner")
 
+# RTL2832U-supported rates with room for an off-centre channel
+NARROW_SAMPLE_RATE = 240000
+WIDE_SAMPLE_RATE = 1024000
+DETECT_FFT_SIZE = 1024
+DEFAULT_NOISE_FLOOR_DB = -50.0  # Reported when nothing could be measured
+
+# Where a detection spends its time
+_stage_start = scan_stage_seconds.labels("detect_start")  # Source start and tuner settling
+_stage_read = scan_stage_seconds.labels("detect_read")  # Waiting for further IQ blocks
+_stage_dsp = scan_stage_seconds.labels("detect_dsp")  # PSD, decision and pre-roll demodulation
+_stage_stop = scan_stage_seconds.labels("detect_stop")  # Stopping the stream (kill and wait)
+
 class SignalDetector:
     """Detect signals on frequencies."""
     
     def __init__(self):
-        self.noise_floor_db = -50  # Typical noise floor
+        self.noise_floor = NoiseFloorTracker()  # Per-frequency floor in dBFS
+        self.iq_source: Optional[IQSource] = None  # Shared IQ stream, set by the engine
+        self._fallback_source: Optional[IQSource] = None
+        # Audio of the last frequency listened to, handed to the recorder on a hit
+        self.preroll = PcmRingBuffer(scanner_config.preroll_seconds)
+    
+    def _get_source(self) -> IQSource:
+        """Return the attached IQ source, or a private rtl_sdr source."""
+        if self.iq_source is not None:
+            return self.iq_source
+        if self._fallback_source is None:
+            self._fallback_source = RtlSdrIQSource()
+        return self._fallback_source
     
     def detect_signal(self, freq_entry: FrequencyEntry) -> tuple[bool, float]:
         """Detect if signal is present on frequency.
         
-        Returns: (has_signal, signal_strength_db)
+        Returns: (has_signal, signal_strength_dbfs)
         
-        Uses rtl_fm with squelch-based detection (more reliable than rtl_power).
+        Streams IQ in short blocks and compares channel power with this
+        frequency's adaptive noise floor. Listening stops as soon as the
+        decision is confident, so empty channels cost a few blocks.
         """
+        freq_hz = int(round(freq_entry.freq_mhz * 1e6))
+        floor = self.noise_floor.get(freq_hz)
+        
         try:
-            freq_hz = int(freq_entry.freq_mhz * 1e6)
-            
-            # Determine sample rate based on modulation
-            if freq_entry.mode.value == "wfm":
-                sample_rate = "200k"
-                mode = "wbfm"
-            elif freq_entry.mode.value == "am":
-                sample_rate = "24k"
-                mode = "am"
-            else:  # fm, nfm
-                sample_rate = "24k"
-                mode = "fm"
-            
-            logger.info(f"Scanning {freq_entry.freq_mhz} MHz (mode: {mode}, rate: {sample_rate}, squelch: {scanner_config.default_squelch_db})")
-            
-            # Use rtl_fm with squelch for quick signal detection
-            # Run in background to avoid blocking, kill after timeout
-            cmd = [
-                "rtl_fm",
-                "-d", str(scanner_config.scanner_device),
-                "-f", str(freq_hz),
-                "-M", mode,
-                "-s", sample_rate,
-                "-l", str(scanner_config.default_squelch_db),  # Squelch level
-                "-g", "40",  # Fixed gain
-                "-E", "dc",  # DC blocking
-                "-"
-            ]
-            
-            logger.debug(f"Running: {' '.join(cmd)}")
-            
-            # Start process
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                preexec_fn=os.setsid  # Create process group for cleanup
+            bandwidth = MODE_BANDWIDTH_HZ.get(freq_entry.mode, 12500)
+            sample_rate = NARROW_SAMPLE_RATE if bandwidth * 4 <= NARROW_SAMPLE_RATE else WIDE_SAMPLE_RATE
+            block_samples = max(DETECT_FFT_SIZE, int(sample_rate * scanner_config.detect_block_seconds))
+            
+            # Tune a quarter of the sample rate above the channel, clear of the DC spike
+            offset_hz = sample_rate // 4
+            bin_hz = sample_rate / DETECT_FFT_SIZE
+            centre_bin = DETECT_FFT_SIZE // 2 - offset_hz / bin_hz
+            half_bins = max(1.0, bandwidth / 2 / bin_hz)
+            lo = int(round(centre_bin - half_bins))
+            hi = int(round(centre_bin + half_bins))
+            
+            decision = SequentialDecision(
+                scanner_config.detect_snr_threshold_db,
+                z=scanner_config.detect_confidence_z,
+                max_blocks=max(2, math.ceil(scanner_config.detect_max_seconds / scanner_config.detect_block_seconds))
             )
             
-            # Read output for 1 second
-            start_time = time.time()
-            output_data = b""
+            logger.info(f"Scanning {freq_entry.freq_mhz} MHz (mode: {freq_entry.mode.value}, rate: {sample_rate})")
             
-            while time.time() - start_time < 1.0:
-                try:
-                    chunk = process.stdout.read(4096)
-                    if chunk:
-                        output_data += chunk
-                    else:
-                        break
-                except:
-                    break
+            # Demodulate while listening so a hit already has its first seconds of audio
+            demodulator = None
+            self.preroll.clear(freq_hz)
+            if scanner_config.preroll_seconds > 0:
+                demodulator = Demodulator(freq_entry.mode, sample_rate, -offset_hz, bandwidth)
             
-            # Kill process and wait
+            channel_powers = []
+            has_signal = False
+            started = waited = time.monotonic()
+            first_block = read_seconds = 0.0
+            stream = self._get_source().stream_iq(freq_hz + offset_hz, sample_rate, block_samples)
             try:
-                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                process.wait(timeout=1)
-            except:
-                try:
-                    os.killpg(os.getpgid(process.pid), signal.SIGKILL)
-                    process.wait(timeout=1)
-                except:
-                    pass
+                for iq in stream:
+                    # The first block includes starting the source and the tuner settling
+                    received = time.monotonic()
+                    if channel_powers:
+                        read_seconds += received - waited
+                    else:
+                        first_block = received - waited
+                    
+                    psd = averaged_psd(iq, DETECT_FFT_SIZE)
+                    channel_power = float(psd[lo:hi + 1].sum())
+                    channel_powers.append(channel_power)
+                    if demodulator:
+                        self.preroll.write(demodulator.process(iq))
+                    
+                    if floor is None:
+                        # First visit: estimate the floor from out-of-channel bins
+                        floor = float(10 * np.log10(max(float(np.median(psd)) * (hi - lo + 1), 1e-20)))
+                    
+                    result = decision.add(10 * np.log10(max(channel_power, 1e-20)) - floor)
+                    if result is not None:
+                        has_signal = result
+                        break
+                    waited = time.monotonic()
+            finally:
+                closing = time.monotonic()
+                stream.close()
+                _stage_stop.observe(time.monotonic() - closing)
             
-            # Check stderr for errors
-            stderr_output = ""
-            if process.stderr:
-                try:
-                    stderr_output = process.stderr.read().decode('utf-8', errors='ignore')
-                    if stderr_output and len(stderr_output) > 0:
-                        logger.debug(f"rtl_fm stderr: {stderr_output[:200]}")
-                except:
-                    pass
+            if not channel_powers:
+                # The source ended before delivering a block: nothing was measured
+                logger.warning(f"No IQ received on {freq_entry.freq_mhz} MHz")
+                return False, floor if floor is not None else DEFAULT_NOISE_FLOOR_DB
             
-            output_size = len(output_data)
+            _stage_start.observe(first_block)
+            _stage_read.observe(read_seconds)
+            _stage_dsp.observe(closing - started - first_block - read_seconds)
             
-            # If we got significant audio output, signal is present
-            # FM broadcasts produce lots of data even with squelch
-            # Threshold: >5KB indicates signal (FM broadcast produces 24KB/sec at 24kHz sample rate)
-            has_signal = output_size > 5000
+            strength = float(10 * np.log10(max(sum(channel_powers) / len(channel_powers), 1e-20)))
             
             if has_signal:
-                # Estimate signal strength based on output size
-                estimated_strength = -40.0 + (output_size / 10000)
-                logger.info(f"✓ SIGNAL DETECTED: {freq_entry.freq_mhz} MHz - {output_size} bytes (~{estimated_strength:.1f}dB)")
-                return True, estimated_strength
+                if self.noise_floor.get(freq_hz) is None:
+                    self.noise_floor.update(freq_hz, floor)
+                logger.info(f"✓ SIGNAL DETECTED: {freq_entry.freq_mhz} MHz - {strength:.1f} dBFS "
+                            f"(SNR {strength - floor:.1f} dB, {decision.blocks} blocks)")
             else:
-                logger.debug(f"✗ No signal: {freq_entry.freq_mhz} MHz ({output_size} bytes)")
-                return False, self.noise_floor_db
+                # Quiet measurements train the floor
+                self.noise_floor.update(freq_hz, strength)
+                logger.debug(f"✗ No signal: {freq_entry.freq_mhz} MHz ({strength:.1f} dBFS, {decision.blocks} blocks)")
+            
+            return has_signal, strength
             
-        except subprocess.TimeoutExpired:
-            logger.warning(f"Signal detection timeout on {freq_entry.freq_mhz} MHz")
-            return False, self.noise_floor_db
         except Exception as e:
             logger.error(f"Signal detection error on {freq_entry.freq_mhz} MHz: {e}", exc_info=True)
-            return False, self.noise_floor_db
+            return False, floor if floor is not None else DEFAULT_NOISE_FLOOR_DB
     
-    def detect_ctcss(self, audio_chunk_path: str) -> float:
-        """Detect CTCSS tone from audio file.
-        
-        Returns: CTCSS tone in Hz, or None if not detected.
-        
-        Uses sox to analyze low frequencies for CTCSS (67-254 Hz).
-        """
-        try:
-            # Use sox to get spectral analysis of low frequencies
-            result = subprocess.run([
-                "sox",
-                audio_chunk_path,
-                "-n",
-                "stat",
-                "-freq"
-            ], capture_output=True, text=True, timeout=5)
-            
-            # Parse output for dominant frequency in CTCSS range
-            # This is a simplified implementation
-            # A more robust implementation would use multimon-ng
-            
-            if result.stderr:
-                # Look for frequency information in stderr (sox outputs to stderr)
-                freq_match = re.search(r'Rough frequency:\s+(\d+)', result.stderr)
-                if freq_match:
-                    freq = float(freq_match.group(1))
-                    if 67 <= freq <= 254:  # CTCSS range
-                        return freq
-            
-            return None
-            
-        except Exception as e:
-            logger.debug(f"CTCSS detection error: {e}")
+    def take_preroll(self, freq_entry: FrequencyEntry) -> Optional[bytes]:
+        """Return (once) the audio captured while detecting this frequency."""
+        freq_hz = int(round(freq_entry.freq_mhz * 1e6))
+        if self.preroll.tag != freq_hz or self.preroll.filled == 0:
             return None
+        audio = self.preroll.to_bytes()
+        self.preroll.clear()
+        return audio
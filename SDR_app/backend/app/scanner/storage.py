@@ -0,0 +1,182 @@
+"""Running total of recordings size, kept up to date by the pipeline."""
+import asyncio
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from backend.app.config import scanner_config, RECORDINGS_DIR
+
+logger = logging.getLogger("scanner")
+
+class StorageAccountant:
+    """Track the size of every recording file without walking the directory.
+    
+    The audio pipeline reports files as segments are closed, sessions are
+    assembled and recordings are deleted, so reading the total is O(1).
+    A background rescan reconciles the total with the disk to catch
+    anything changed behind our back (e.g. files deleted by hand).
+    """
+    
+    def __init__(self, directory: Path = RECORDINGS_DIR, suffix: str = ".ogg"):
+        self.directory = Path(directory)
+        self.suffix = suffix
+        self.total_bytes = 0
+        self.scanned = False
+        self.last_drift_bytes = 0
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Held for the whole of a reconcile, so only one scan runs at a time
+        self._reconcile_lock = threading.Lock()
+        self._pending: Optional[List[Tuple[str, Optional[int]]]] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def file_count(self) -> int:
+        """Number of files being tracked."""
+        return len(self._sizes)
+    
+    def snapshot(self) -> Dict[str, int]:
+        """Copy of the tracked sizes, by path relative to the directory."""
+        with self._lock:
+            return dict(self._sizes)
+    
+    def _key(self, path: Path) -> str:
+        path = Path(path)
+        try:
+            return str(path.relative_to(self.directory))
+        except ValueError:
+            return str(path)
+    
+    def _set(self, key: str, size: Optional[int]):
+        """Apply one change; size None removes the file. Caller holds the lock."""
+        old = self._sizes.pop(key, 0)
+        if size is not None:
+            self._sizes[key] = size
+        self.total_bytes += (size or 0) - old
+        if self._pending is not None:
+            self._pending.append((key, size))
+    
+    def add_files(self, paths: Iterable[Path]):
+        """Record new or grown files (stats each one once)."""
+        changes = []
+        for path in paths:
+            try:
+                changes.append((self._key(path), Path(path).stat().st_size))
+            except OSError:
+                changes.append((self._key(path), None))
+        with self._lock:
+            for key, size in changes:
+                self._set(key, size)
+    
+    def add_file(self, path: Path):
+        """Record a new or grown file."""
+        self.add_files([path])
+    
+    def remove_files(self, paths: Iterable[Path]):
+        """Record deleted files."""
+        with self._lock:
+            for path in paths:
+                self._set(self._key(path), None)
+    
+    def remove_file(self, path: Path):
+        """Record a deleted file."""
+        self.remove_files([path])
+    
+    def _scan(self) -> Dict[str, int]:
+        """Walk the directory tree and stat every recording."""
+        sizes: Dict[str, int] = {}
+        stack = [self.directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(Path(entry.path))
+                            elif entry.name.endswith(self.suffix):
+                                sizes[self._key(Path(entry.path))] = entry.stat().st_size
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+        return sizes
+    
+    def reconcile(self) -> int:
+        """Rescan the disk and replace the running total.
+        
+        Changes reported while the scan runs are replayed on top of it.
+        A reconcile that starts while another is running waits for it.
+        Returns the drift in bytes that the rescan corrected.
+        """
+        with self._reconcile_lock:
+            return self._reconcile()
+    
+    def _reconcile(self) -> int:
+        """Body of reconcile(); caller holds the reconcile lock."""
+        pending: List[Tuple[str, Optional[int]]] = []
+        with self._lock:
+            self._pending = pending
+        try:
+            sizes = self._scan()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        
+        with self._lock:
+            self._pending = None
+            for key, size in pending:
+                if size is None:
+                    sizes.pop(key, None)
+                else:
+                    sizes[key] = size
+            total = sum(sizes.values())
+            drift = total - self.total_bytes
+            self._sizes = sizes
+            self.total_bytes = total
+        
+        if self.scanned and drift:
+            logger.info(f"Storage reconcile corrected {drift / (1024 * 1024):+.1f} MB")
+        self.scanned = True
+        self.last_drift_bytes = drift
+        return drift
+    
+    def ensure_scanned(self):
+        """Run the initial scan if no reconcile has happened yet.
+        
+        If a scan is already running, wait for it instead of starting another.
+        """
+        if self.scanned:
+            return
+        with self._reconcile_lock:
+            if not self.scanned:
+                self._reconcile()
+    
+    def start(self):
+        """Start the periodic background reconcile."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reconcile_loop())
+    
+    async def stop(self):
+        """Stop the background reconcile."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _reconcile_loop(self):
+        """Reconcile now, then every storage_reconcile_seconds."""
+        while True:
+            try:
+                await asyncio.to_thread(self.reconcile)
+            except Exception as e:
+                logger.error(f"Storage reconcile failed: {e}")
+            await asyncio.sleep(scanner_config.storage_reconcile_seconds)
+
+# Global accountant instance
+storage_accountant = StorageAccountant()
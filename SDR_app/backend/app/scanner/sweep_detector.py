@@ -0,0 +1,113 @@
+"""Wideband FFT sweep detection: one IQ capture decides many channels."""
+import logging
+from typing import Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel
+from backend.app.config import scanner_config
+from backend.app.models import FrequencyEntry, ModulationType
+from backend.app.scanner.iq_source import IQSource, create_iq_source
+from backend.app.scanner.power_estimator import averaged_psd, band_power
+
+logger = logging.getLogger("scanner")
+
+# Occupied bandwidth used to integrate channel power, per modulation
+MODE_BANDWIDTH_HZ = {
+    ModulationType.NFM: 12500,
+    ModulationType.FM: 16000,
+    ModulationType.WFM: 200000,
+    ModulationType.AM: 10000,
+    ModulationType.USB: 3000,
+    ModulationType.LSB: 3000,
+}
+
+class Passband(BaseModel):
+    """A tuner window covering one or more frequencies."""
+    center_freq_hz: int
+    sample_rate: int
+    entries: List[FrequencyEntry]
+
+def plan_passbands(frequency_list: List[FrequencyEntry],
+                   sample_rate: int,
+                   usable_fraction: float = 0.8) -> List[Passband]:
+    """Group frequencies into as few tuner windows as possible.
+    
+    Entries are sorted by frequency and packed greedily while the occupied
+    span fits inside the usable part of the passband.
+    """
+    usable_hz = sample_rate * usable_fraction
+    passbands = []
+    entries: List[FrequencyEntry] = []
+    low_hz = high_hz = 0.0
+    
+    for entry in sorted(frequency_list, key=lambda e: e.freq_mhz):
+        half_bw = MODE_BANDWIDTH_HZ.get(entry.mode, 12500) / 2
+        freq_hz = entry.freq_mhz * 1e6
+        
+        if entries and (freq_hz + half_bw) - low_hz <= usable_hz:
+            entries.append(entry)
+            high_hz = max(high_hz, freq_hz + half_bw)
+            continue
+        
+        if entries:
+            passbands.append(Passband(center_freq_hz=int(round((low_hz + high_hz) / 2)),
+                                      sample_rate=sample_rate, entries=entries))
+        entries = [entry]
+        low_hz = freq_hz - half_bw
+        high_hz = freq_hz + half_bw
+    
+    if entries:
+        passbands.append(Passband(center_freq_hz=int(round((low_hz + high_hz) / 2)),
+                                  sample_rate=sample_rate, entries=entries))
+    return passbands
+
+class SweepDetector:
+    """Detect signals on every channel of a passband from a single capture."""
+    
+    def __init__(self, source: Optional[IQSource] = None):
+        self.source = source or create_iq_source()
+        self.noise_floor_db = -50.0  # Updated from the median PSD of each capture
+    
+    def detect_passband(self, passband: Passband) -> Dict[float, tuple[bool, float]]:
+        """Decide signal/no-signal for every entry in the passband.
+        
+        Returns: {freq_mhz: (has_signal, signal_strength_db)}
+        """
+        try:
+            fft_size = scanner_config.sweep_fft_size
+            num_samples = max(fft_size, int(passband.sample_rate * scanner_config.sweep_capture_seconds))
+            
+            iq = self.source.read_iq(passband.center_freq_hz, passband.sample_rate, num_samples)
+            psd = averaged_psd(iq, fft_size)
+            
+            bin_hz = passband.sample_rate / fft_size
+            noise_floor = max(float(np.median(psd)), 1e-20)
+            self.noise_floor_db = 10 * np.log10(noise_floor)
+            
+            # Integrate each channel with a prefix sum over the PSD
+            offsets = np.array([e.freq_mhz * 1e6 - passband.center_freq_hz for e in passband.entries])
+            half_bins = np.array([max(1, MODE_BANDWIDTH_HZ.get(e.mode, 12500) / 2 / bin_hz)
+                                  for e in passband.entries])
+            centre_bins = fft_size // 2 + offsets / bin_hz
+            lo = np.clip(np.round(centre_bins - half_bins).astype(int), 0, fft_size - 1)
+            hi = np.clip(np.round(centre_bins + half_bins).astype(int), 0, fft_size - 1)
+            
+            channel_power = band_power(psd, lo, hi)
+            channel_mean = channel_power / (hi - lo + 1)
+            
+            snr_db = 10 * np.log10(np.maximum(channel_mean, 1e-20) / noise_floor)
+            strength_db = 10 * np.log10(np.maximum(channel_power, 1e-20))
+            has_signal = snr_db >= scanner_config.sweep_snr_threshold_db
+            
+            results = {}
+            for entry, hit, strength, snr in zip(passband.entries, has_signal, strength_db, snr_db):
+                results[entry.freq_mhz] = (bool(hit), float(strength))
+                if hit:
+                    logger.info(f"✓ SIGNAL DETECTED: {entry.freq_mhz} MHz - {strength:.1f} dBFS (SNR {snr:.1f} dB)")
+            
+            logger.debug(f"Swept {len(passband.entries)} channels at {passband.center_freq_hz / 1e6:.4f} MHz "
+                         f"(noise floor {self.noise_floor_db:.1f} dBFS)")
+            return results
+        
+        except Exception as e:
+            logger.error(f"Sweep detection error at {passband.center_freq_hz / 1e6:.4f} MHz: {e}", exc_info=True)
+            return {entry.freq_mhz: (False, self.noise_floor_db) for entry in passband.entries}
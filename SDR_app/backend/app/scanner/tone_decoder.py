@@ -0,0 +1,207 @@
+"""Streaming CTCSS and DCS squelch tone decoder for recorded PCM."""
+from functools import lru_cache
+from typing import Dict, Optional
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from backend.app.scanner.demod import AUDIO_SAMPLE_RATE, lowpass_taps
+
+# The 50 standard CTCSS tones (Hz)
+CTCSS_TONES = (
+    67.0, 69.3, 71.9, 74.4, 77.0, 79.7, 82.5, 85.4, 88.5, 91.5,
+    94.8, 97.4, 100.0, 103.5, 107.2, 110.9, 114.8, 118.8, 123.0, 127.3,
+    131.8, 136.5, 141.3, 146.2, 151.4, 156.7, 159.8, 162.2, 165.5, 167.9,
+    171.3, 173.8, 177.3, 179.9, 183.5, 186.2, 189.9, 192.8, 196.6, 199.5,
+    203.5, 206.5, 210.7, 218.1, 225.7, 229.1, 233.6, 241.8, 250.3, 254.1,
+)
+
+# Standard DCS codes, written with their octal digits (D023 -> 23)
+DCS_CODES = (
+    23, 25, 26, 31, 32, 36, 43, 47, 51, 53, 54, 65, 71, 72, 73, 74,
+    114, 115, 116, 122, 125, 131, 132, 134, 143, 145, 152, 155, 156, 162, 165, 172, 174,
+    205, 212, 223, 225, 226, 243, 244, 245, 246, 251, 252, 255, 261, 263, 265, 266, 271, 274,
+    306, 311, 315, 325, 331, 332, 343, 346, 351, 356, 364, 365, 371,
+    411, 412, 413, 423, 431, 432, 445, 446, 452, 454, 455, 462, 464, 465, 466,
+    503, 506, 516, 523, 526, 532, 546, 565,
+    606, 612, 624, 627, 631, 632, 654, 662, 664,
+    703, 712, 723, 731, 732, 734, 743, 754,
+)
+
+DCS_BIT_RATE = 134.4
+DCS_WORD_BITS = 23
+# Generator of the (23,12) Golay code protecting each DCS word
+DCS_GOLAY_POLY = 0xC75
+
+# Sub-audible tones are analysed at 1.2 kHz, decimated in two stages
+BOXCAR_DECIMATION = 8
+FILTER_DECIMATION = 5
+TONE_SAMPLE_RATE = AUDIO_SAMPLE_RATE / BOXCAR_DECIMATION / FILTER_DECIMATION
+TONE_CUTOFF_HZ = 280
+TONE_FILTER_TAPS = 127
+
+WINDOW_SECONDS = 0.8  # Long enough to separate tones 2.3 Hz apart
+HOP_SECONDS = 0.1
+CTCSS_MIN_SHARE = 0.4  # Share of the sub-audible power the strongest tone must hold
+MIN_LEVEL = 1e-4  # Mean square (full scale = 1) below which nothing is decoded
+CONFIRM_COUNT = 3  # Consecutive agreeing analyses before a result is reported
+
+def _golay_remainder(value: int) -> int:
+    for bit in range(DCS_WORD_BITS - 1, 10, -1):
+        if value >> bit & 1:
+            value ^= DCS_GOLAY_POLY << (bit - 11)
+    return value
+
+def dcs_codeword(code: int) -> int:
+    """23-bit word sent for a DCS code, first transmitted bit in bit 0.
+    
+    The word is the 9 code bits, the fixed bits 100 and 11 Golay parity
+    bits (D023 -> 0x763813).
+    """
+    data = int(str(code), 8) | 0x800
+    # Systematic Golay word with the data on top, rotated to put it first
+    word = data << 11 | _golay_remainder(data << 11)
+    return word >> 11 | (word & 0x7FF) << 12
+
+@lru_cache(maxsize=1)
+def _dcs_lookup() -> Dict[int, int]:
+    """Every 23-bit window of a repeating DCS word (either polarity) -> code.
+    
+    Some codes are rotations of others; the normal-polarity and lower
+    code wins, as on a radio.
+    """
+    mask = (1 << DCS_WORD_BITS) - 1
+    table: Dict[int, int] = {}
+    for invert in (0, mask):
+        for code in DCS_CODES:
+            word = dcs_codeword(code) ^ invert
+            for shift in range(DCS_WORD_BITS):
+                rotated = (word >> shift | word << (DCS_WORD_BITS - shift)) & mask
+                table.setdefault(rotated, code)
+    return table
+
+class ToneDecoder:
+    """Decode the CTCSS tone or DCS code of s16le 48 kHz PCM as it streams.
+    
+    The audio is low-passed and decimated to 1.2 kHz. Every 100 ms the
+    last 0.8 s is analysed: single-bin DFTs at all 50 CTCSS frequencies
+    (a Goertzel bank, evaluated as one matrix product) and a DCS bit
+    slicer. The work per block is proportional to its length. Results are
+    sticky: ctcss_tone and dcs_code keep the last confirmed value.
+    """
+    
+    def __init__(self):
+        self.taps = lowpass_taps(TONE_CUTOFF_HZ, AUDIO_SAMPLE_RATE / BOXCAR_DECIMATION,
+                                 TONE_FILTER_TAPS, "blackman")
+        self.window_size = int(WINDOW_SECONDS * TONE_SAMPLE_RATE)
+        self.hop_size = int(HOP_SECONDS * TONE_SAMPLE_RATE)
+        n = np.arange(self.window_size)
+        self._shape = np.hanning(self.window_size).astype(np.float32)
+        self._bank = np.exp(-2j * np.pi * np.outer(CTCSS_TONES, n) / TONE_SAMPLE_RATE).astype(np.complex64)
+        # Amplitude of a full-window tone after the window and DFT
+        self._bank_gain = float(self._shape.sum()) / 2
+        self.reset()
+    
+    def reset(self):
+        """Forget the stream and any decoded result."""
+        self.ctcss_tone: Optional[float] = None
+        self.dcs_code: Optional[int] = None
+        self._odd_byte = b""
+        self._boxcar_rest = np.zeros(0, dtype=np.float32)
+        self._history = np.zeros(len(self.taps) - 1, dtype=np.float32)
+        self._skip = 0
+        self._window = np.zeros(self.window_size, dtype=np.float32)
+        self._filled = 0
+        self._pending = 0  # Samples since the last analysis
+        self._candidate = None
+        self._agree = 0
+    
+    def feed(self, pcm: bytes):
+        """Process raw s16le bytes (any length)."""
+        data = self._odd_byte + bytes(pcm)
+        usable = len(data) & ~1
+        self._odd_byte = data[usable:]
+        if usable:
+            self.process(np.frombuffer(data[:usable], dtype="<i2"))
+    
+    def process(self, samples: np.ndarray):
+        """Process a block of int16 samples."""
+        audio = np.concatenate((self._boxcar_rest, samples.astype(np.float32) / 32768))
+        whole = len(audio) - len(audio) % BOXCAR_DECIMATION
+        self._boxcar_rest = audio[whole:]
+        reduced = audio[:whole].reshape(-1, BOXCAR_DECIMATION).mean(axis=1)
+        
+        # Low-pass and keep every FILTER_DECIMATION-th output
+        filtered = np.concatenate((self._history, reduced))
+        self._history = filtered[len(filtered) - len(self._history):]
+        windows = sliding_window_view(filtered, len(self.taps))[self._skip::FILTER_DECIMATION]
+        consumed = self._skip + len(windows) * FILTER_DECIMATION
+        self._skip = consumed - (len(filtered) - len(self.taps) + 1)
+        tone_audio = windows @ self.taps[::-1]
+        
+        # Slide the analysis window a hop at a time
+        start = 0
+        while start < len(tone_audio):
+            step = min(len(tone_audio) - start, self.hop_size - self._pending)
+            self._window[:-step] = self._window[step:]
+            self._window[-step:] = tone_audio[start:start + step]
+            start += step
+            self._filled = min(self.window_size, self._filled + step)
+            self._pending += step
+            if self._pending == self.hop_size:
+                self._pending = 0
+                if self._filled == self.window_size:
+                    self._analyse()
+    
+    def _analyse(self):
+        x = self._window - self._window.mean()
+        level = float(np.mean(x * x))
+        result = None
+        if level >= MIN_LEVEL:
+            result = self._find_ctcss(x, level)
+            if result is None:
+                code = self._find_dcs(x)
+                if code is not None:
+                    result = ("dcs", code)
+        
+        if result is not None and result == self._candidate:
+            self._agree += 1
+        else:
+            self._candidate = result
+            self._agree = 1
+        if result is not None and self._agree >= CONFIRM_COUNT:
+            kind, value = result
+            if kind == "ctcss":
+                self.ctcss_tone = value
+            else:
+                self.dcs_code = value
+    
+    def _find_ctcss(self, x: np.ndarray, level: float) -> Optional[tuple]:
+        amplitudes = np.abs(self._bank @ (x * self._shape)) / self._bank_gain
+        best = int(np.argmax(amplitudes))
+        # A tone of amplitude A has mean square A^2 / 2
+        if amplitudes[best] ** 2 / 2 < CTCSS_MIN_SHARE * level:
+            return None
+        return ("ctcss", CTCSS_TONES[best])
+    
+    def _find_dcs(self, x: np.ndarray) -> Optional[int]:
+        """Slice bits at the phase with the widest eye and look up 23-bit words."""
+        bit_samples = TONE_SAMPLE_RATE / DCS_BIT_RATE
+        best_bits, best_score = None, 0.0
+        for phase in np.arange(0, bit_samples, 1.0):
+            positions = np.round(phase + bit_samples * np.arange(int((len(x) - phase) / bit_samples))).astype(int)
+            values = x[positions[positions < len(x)]]
+            score = float(np.mean(np.abs(values)))
+            if score > best_score:
+                best_bits, best_score = values > 0, score
+        if best_bits is None or len(best_bits) < 2 * DCS_WORD_BITS:
+            return None
+        
+        weights = 1 << np.arange(DCS_WORD_BITS, dtype=np.int64)
+        words = sliding_window_view(best_bits, DCS_WORD_BITS).astype(np.int64) @ weights
+        lookup = _dcs_lookup()
+        codes = [lookup.get(int(word)) for word in words]
+        # A real code repeats: require a full word's worth of matching windows
+        found = [code for code in codes if code is not None]
+        if not found:
+            return None
+        code = max(set(found), key=found.count)
+        return code if found.count(code) >= DCS_WORD_BITS else None
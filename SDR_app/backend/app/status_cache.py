@@ -0,0 +1,169 @@
+"""Cached system status with per-field TTLs and single-flight refresh."""
+import asyncio
+import logging
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional
+from backend.app.catalog import recording_catalog
+from backend.app.config import scanner_config, throttle_state
+from backend.app.models import SystemStatus
+from backend.app.scanner.engine import scanner_engine
+from backend.app.scanner.resource_monitor import resource_monitor
+
+logger = logging.getLogger("uvicorn")
+
+MONITORED_SERVICES = ["rtltcp.service", "scanner.service"]
+
+def get_ip_address() -> str:
+    """Get system IP address."""
+    try:
+        result = subprocess.run(
+            ["hostname", "-I"],
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        if result.returncode == 0:
+            ips = result.stdout.strip().split()
+            return ips[0] if ips else "unknown"
+    except Exception:
+        pass
+    return "unknown"
+
+def check_service_status(service_name: str) -> bool:
+    """Check if systemd service is running."""
+    return check_services_status([service_name])[service_name]
+
+def check_services_status(service_names: List[str]) -> Dict[str, bool]:
+    """Check several systemd services with one systemctl call."""
+    try:
+        result = subprocess.run(
+            ["systemctl", "is-active"] + service_names,
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        states = result.stdout.strip().split("\n")
+        return {name: (states[i].strip() == "active" if i < len(states) else False)
+                for i, name in enumerate(service_names)}
+    except Exception:
+        return {name: False for name in service_names}
+
+class CachedProbe:
+    """A value that is expensive to fetch, cached for ttl seconds.
+    
+    Concurrent callers share one in-flight refresh. Once a value exists,
+    a stale read returns it immediately and refreshes in the background,
+    so only the very first read ever waits for the probe.
+    """
+    
+    def __init__(self, name: str, fetch: Callable[[], Any], ttl: float, blocking: bool = True):
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self.blocking = blocking
+        self.value: Any = None
+        self.updated: Optional[float] = None
+        self.refreshes = 0
+        self._inflight: Optional[asyncio.Task] = None
+    
+    def is_fresh(self) -> bool:
+        return self.updated is not None and time.monotonic() - self.updated < self.ttl
+    
+    def refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already running."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._run())
+        return self._inflight
+    
+    async def _run(self) -> Any:
+        try:
+            if self.blocking:
+                value = await asyncio.to_thread(self.fetch)
+            else:
+                value = self.fetch()
+            self.value = value
+            self.updated = time.monotonic()
+            self.refreshes += 1
+        except Exception as e:
+            logger.warning(f"Status probe {self.name} failed: {e}")
+        return self.value
+    
+    async def get(self) -> Any:
+        """Return the cached value, refreshing it if stale."""
+        if self.is_fresh():
+            return self.value
+        task = self.refresh()
+        if self.updated is not None:
+            return self.value
+        return await asyncio.shield(task)
+
+class StatusAggregator:
+    """Build /api/status from cached probes.
+    
+    Subprocess probes run in worker threads. Service state and the IP
+    address change rarely, so a slow timer keeps them fresh and requests
+    never wait on systemctl or hostname.
+    """
+    
+    def __init__(self):
+        self.services = CachedProbe(
+            "services", lambda: check_services_status(MONITORED_SERVICES),
+            scanner_config.status_service_ttl_seconds
+        )
+        self.ip_address = CachedProbe("ip_address", get_ip_address, scanner_config.status_ip_ttl_seconds)
+        self.recordings = CachedProbe(
+            "recordings", recording_catalog.count, scanner_config.status_recordings_ttl_seconds
+        )
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the slow refresh timer for service state and IP address."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        """Stop the refresh timer."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _refresh_loop(self):
+        """Refresh slow-changing probes shortly before they expire."""
+        while True:
+            for probe in (self.services, self.ip_address):
+                if not probe.is_fresh():
+                    await probe.refresh()
+            interval = min(self.services.ttl, self.ip_address.ttl)
+            await asyncio.sleep(max(1.0, interval * 0.9))
+    
+    async def get_status(self) -> SystemStatus:
+        """Assemble the current status from cached values."""
+        services, ip_address, recordings_count = await asyncio.gather(
+            self.services.get(), self.ip_address.get(), self.recordings.get()
+        )
+        # Before the sampler's first pass, measure once off the event loop
+        # (it stats the whole recordings directory)
+        resources = resource_monitor.latest
+        if resources is None:
+            resources = await asyncio.to_thread(resource_monitor.get_snapshot)
+        
+        return SystemStatus(
+            rtltcp_running=services.get("rtltcp.service", False),
+            scanner_running=services.get("scanner.service", False),
+            scan_active=scanner_engine.is_running(),
+            resources=resources,
+            throttle_active=throttle_state.active,
+            throttle_reason=throttle_state.reason,
+            usb_errors=resource_monitor.latest_usb_errors,
+            active_detections=len(scanner_engine.get_detections()),
+            total_recordings=recordings_count or 0,
+            ip_address=ip_address or "unknown"
+        )
+
+# Global aggregator instance
+status_aggregator = StatusAggregator()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""CPU cost of the FFT channelizer for 8, 16 and 32 channels on one core.
+
+Feeds synthetic 2.4 MS/s IQ (NFM and AM carriers on a 12.5 kHz grid)
+through FFTChannelizer and reports CPU seconds per second of IQ; below
+100% means the channelizer keeps up in real time on a single core.
+Encoding (one ffmpeg per active channel) is not included.
+
+Usage: python3 scripts/bench_channelizer.py [--seconds 5] [--rate 2400000] [--channels 8 16 32]
+"""
+import argparse
+import os
+
+# Keep numpy on one core so the figures are per-core
+for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(variable, "1")
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.models import ModulationType
+from backend.app.scanner.channelizer import FFTChannelizer
+
+CHANNEL_SPACING_HZ = 12500
+BLOCK_SECONDS = 0.05
+
+def synthetic_iq(rate: int, offsets, seconds: float, rng: np.random.Generator) -> np.ndarray:
+    """Noise plus one modulated carrier per channel."""
+    t = np.arange(int(rate * seconds)) / rate
+    iq = (rng.standard_normal(len(t)) + 1j * rng.standard_normal(len(t))) * 0.002
+    for index, offset in enumerate(offsets):
+        tone = 300 + 50 * index
+        if index % 4 == 3:
+            iq += 0.02 * (1 + 0.5 * np.sin(2 * np.pi * tone * t)) * np.exp(2j * np.pi * offset * t)
+        else:
+            iq += 0.02 * np.exp(1j * (2 * np.pi * offset * t + 2500 / tone * np.sin(2 * np.pi * tone * t)))
+    return iq.astype(np.complex64)
+
+def main():
+    parser = argparse.ArgumentParser(description="Channelizer CPU benchmark")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Seconds of IQ per run")
+    parser.add_argument("--rate", type=int, default=2400000, help="IQ sample rate")
+    parser.add_argument("--channels", type=int, nargs="+", default=[8, 16, 32])
+    args = parser.parse_args()
+    
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+    
+    rng = np.random.default_rng(1)
+    block = int(args.rate * BLOCK_SECONDS)
+    print(f"{args.seconds:g} s of IQ at {args.rate / 1e6:g} MS/s, {BLOCK_SECONDS * 1000:g} ms blocks, one core")
+    print(f"{'channels':>8} {'cpu s':>8} {'load':>7} {'per channel':>12}")
+    
+    for count in args.channels:
+        offsets = [(i - count / 2) * CHANNEL_SPACING_HZ + CHANNEL_SPACING_HZ / 2 for i in range(count)]
+        modes = [ModulationType.AM if i % 4 == 3 else ModulationType.NFM for i in range(count)]
+        channelizer = FFTChannelizer(args.rate, offsets, [CHANNEL_SPACING_HZ] * count, modes)
+        iq = synthetic_iq(args.rate, offsets, args.seconds, rng)
+        
+        start = time.process_time()
+        for offset in range(0, len(iq) - block + 1, block):
+            channelizer.process(iq[offset:offset + block])
+        cpu = time.process_time() - start
+        
+        load = cpu / args.seconds * 100
+        print(f"{count:>8} {cpu:>8.2f} {load:>6.1f}% {load / count:>11.2f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Compare disk writes and finalize time of the two recording paths.
+
+"segment+concat" is the old pipeline: the segment muxer writes one chunk
+file per chunk_duration, then ffmpeg's concat demuxer copies every byte
+into the session file. "session writer" is the current pipeline: one
+growing file that is renamed when the session ends. Both are driven by
+the same synthetic Opus-sized packet stream, so ffmpeg is not needed;
+the concat copy is emulated page by page.
+
+Usage: python3 scripts/bench_session_io.py [--seconds 300] [--chunk 30] [--sessions 5] [--dir /home/pi/SDR_app/recordings]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.scanner.ogg import FLAG_BOS, FLAG_EOS, build_page, iter_pages
+from backend.app.scanner.session_writer import OggSessionWriter
+
+PACKET_SECONDS = 0.02  # Opus frame
+SAMPLES_PER_PACKET = 960  # 20 ms at 48 kHz
+SERIAL = 0x5D12
+
+def header_pages(serial: int):
+    """OpusHead and OpusTags pages."""
+    head = b"OpusHead" + bytes([1, 2]) + (312).to_bytes(2, "little") + (48000).to_bytes(4, "little") + bytes(3)
+    tags = b"OpusTags" + (4).to_bytes(4, "little") + b"bench" + bytes(4)
+    return [build_page(FLAG_BOS, 0, serial, 0, [head]), build_page(0, 0, serial, 1, [tags])]
+
+def audio_pages(seconds: float, bitrate_kbps: int, page_ms: int, serial: int, first_sequence: int = 2):
+    """Pages of fake Opus packets at the given bitrate."""
+    packet = os.urandom(int(bitrate_kbps * 1000 / 8 * PACKET_SECONDS))
+    per_page = max(1, int(page_ms / 1000 / PACKET_SECONDS))
+    total = int(seconds / PACKET_SECONDS)
+    granule = 0
+    sequence = first_sequence
+    for start in range(0, total, per_page):
+        count = min(per_page, total - start)
+        granule += count * SAMPLES_PER_PACKET
+        flags = FLAG_EOS if start + count >= total else 0
+        yield build_page(flags, granule, serial, sequence, [packet] * count)
+        sequence += 1
+
+def write_file(path: Path, pages):
+    with open(path, "wb") as f:
+        for page in pages:
+            f.write(page)
+        f.flush()
+        os.fsync(f.fileno())
+
+def segment_concat(directory: Path, args) -> tuple:
+    """Old path; returns (bytes written, finalize seconds)."""
+    written = 0
+    chunks = []
+    for index in range(int((args.seconds + args.chunk - 1) // args.chunk)):
+        length = min(args.chunk, args.seconds - index * args.chunk)
+        path = directory / f"session_part{index:03d}.ogg"
+        write_file(path, header_pages(SERIAL + index) +
+                   list(audio_pages(length, args.bitrate, args.page_ms, SERIAL + index)))
+        written += path.stat().st_size
+        chunks.append(path)
+    
+    start = time.perf_counter()
+    output = directory / "session.ogg"
+    with open(output, "wb") as out:
+        for index, chunk in enumerate(chunks):
+            with open(chunk, "rb") as f:
+                for page in iter_pages(f):
+                    # concat keeps the first chunk's headers only
+                    if index > 0 and page.granule_position == 0:
+                        continue
+                    out.write(page.raw)
+        out.flush()
+        os.fsync(out.fileno())
+    for chunk in chunks:
+        chunk.unlink()
+    finalize = time.perf_counter() - start
+    written += output.stat().st_size
+    output.unlink()
+    return written, finalize
+
+def session_writer(directory: Path, args) -> tuple:
+    """Current path; returns (bytes written, finalize seconds)."""
+    path = directory / "session_part000.ogg"
+    read_fd, write_fd = os.pipe()
+    
+    def encoder():
+        with os.fdopen(write_fd, "wb") as out:
+            for page in header_pages(SERIAL) + list(audio_pages(args.seconds, args.bitrate, args.page_ms, SERIAL)):
+                out.write(page)
+    
+    thread = threading.Thread(target=encoder)
+    thread.start()
+    with os.fdopen(read_fd, "rb") as stream:
+        OggSessionWriter(path, flush_seconds=5.0).run(stream)
+    thread.join()
+    
+    start = time.perf_counter()
+    output = directory / "session.ogg"
+    path.rename(output)
+    finalize = time.perf_counter() - start
+    written = output.stat().st_size
+    output.unlink()
+    return written, finalize
+
+def main():
+    parser = argparse.ArgumentParser(description="Recording write path benchmark")
+    parser.add_argument("--seconds", type=float, default=300.0, help="Session length")
+    parser.add_argument("--chunk", type=float, default=30.0, help="Old pipeline chunk length")
+    parser.add_argument("--bitrate", type=int, default=64, help="Opus bitrate (kbps)")
+    parser.add_argument("--page-ms", type=int, default=100, help="Ogg page duration")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--dir", type=Path, default=None, help="Directory on the disk to test (default: temp dir)")
+    args = parser.parse_args()
+    
+    directory = Path(tempfile.mkdtemp(prefix="bench_session_", dir=args.dir))
+    try:
+        print(f"{args.sessions} sessions of {args.seconds:g} s at {args.bitrate} kbps in {directory}")
+        print(f"{'path':<16} {'MB written':>11} {'finalize ms':>12}")
+        results = {}
+        for name, run in (("segment+concat", segment_concat), ("session writer", session_writer)):
+            written = 0
+            finalize = 0.0
+            for _ in range(args.sessions):
+                session_written, session_finalize = run(directory, args)
+                written += session_written
+                finalize += session_finalize
+            results[name] = written
+            print(f"{name:<16} {written / 1e6:>11.2f} {finalize / args.sessions * 1000:>12.2f}")
+        print(f"write reduction: {100 * (1 - results['session writer'] / results['segment+concat']):.1f}%")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ import './RecordingsList.css'
 function RecordingsList() {
   const [recordings, setRecordings] = useState([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   useEffect(() => {
     fetchRecordings()
@@ -13,10 +15,11 @@ function RecordingsList() {
   const fetchRecordings = async () => {
     setLoading(true)
     try {
-      const response = await fetch('/api/recordings')
+      const response = await fetch('/api/recordings?limit=100')
       if (response.ok) {
         const data = await response.json()
         setRecordings(data)
+        setNextCursor(response.headers.get('X-Next-Cursor'))
       }
     } catch (error) {
       console.error('Error fetching recordings:', error)
@@ -25,6 +28,23 @@ function RecordingsList() {
     }
   }
 
+  const fetchMore = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      const response = await fetch(`/api/recordings?limit=100&cursor=${encodeURIComponent(nextCursor)}`)
+      if (response.ok) {
+        const data = await response.json()
+        setRecordings(prev => [...prev, ...data])
+        setNextCursor(response.headers.get('X-Next-Cursor'))
+      }
+    } catch (error) {
+      console.error('Error fetching more recordings:', error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleDownload = (recording) => {
     window.open(`/api/recordings/${recording.id}`, '_blank')
   }
@@ -73,7 +93,7 @@ function RecordingsList() {
       <div className="recordings-header">
         <h2>Recordings</h2>
         <div className="recordings-stats">
-          <span>{recordings.length} total</span>
+          <span>{recordings.length}{nextCursor ? '+' : ''} total</span>
         </div>
       </div>
 
@@ -151,6 +171,17 @@ function RecordingsList() {
           ))}
         </div>
       )}
+
+      {nextCursor && (
+        <button
+          className="btn btn-secondary"
+          onClick={fetchMore}
+          disabled={loadingMore}
+          data-testid="load-more-recordings-btn"
+        >
+          <span>{loadingMore ? 'Loading...' : 'Load more'}</span>
+        </button>
+      )}
     </div>
   )
 }
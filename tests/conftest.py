@@ -0,0 +1,5 @@
+"""Make the backend package importable when pytest runs from the repo root."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "SDR_app"))
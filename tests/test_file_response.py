@@ -0,0 +1,57 @@
+"""Range header parsing and ranged file responses."""
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from backend.app.file_response import file_response, parse_range
+
+SIZE = 1000
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=900-", (900, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    # Syntactically invalid: ignored, so the whole file is sent
+    ("bytes=5-3", None),
+    ("bytes=a-5", None),
+    ("bytes=--5", None),
+    ("bytes=0-1,5-9", None),
+    ("items=0-5", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5000-6000", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_range(header, SIZE)
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "audio.ogg"
+    path.write_bytes(bytes(range(250)) * 4)
+    app = FastAPI()
+    
+    @app.get("/file")
+    async def get_file(request: Request):
+        return file_response(request, path, "audio/ogg", "no-cache")
+    
+    return TestClient(app)
+
+def test_reversed_range_returns_whole_file(client):
+    response = client.get("/file", headers={"Range": "bytes=5-3"})
+    assert response.status_code == 200
+    assert len(response.content) == SIZE
+    assert "content-range" not in response.headers
+
+def test_range_past_end_is_unsatisfiable(client):
+    response = client.get("/file", headers={"Range": "bytes=1000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{SIZE}"
+
+def test_partial_content(client):
+    response = client.get("/file", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 10-19/{SIZE}"
+    assert response.content == bytes(range(10, 20))
@@ -0,0 +1,99 @@
+"""KmsgReader on a fake kmsg file with a controlled clock."""
+from backend.app.scanner.kmsg import KmsgReader, classify_message, parse_kmsg_record
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+def _record(seconds: float, message: str, seq: int = 0) -> str:
+    return f"3,{seq},{int(seconds * 1e6)},-;{message}\n"
+
+def _append(path, text: str):
+    with open(path, "a") as f:
+        f.write(text)
+
+def test_parse_record():
+    assert parse_kmsg_record("6,1234,5000000,-;usb 1-1: new device\n") == (5.0, "usb 1-1: new device")
+    assert parse_kmsg_record(" SUBSYSTEM=usb\n") is None
+    assert parse_kmsg_record("garbage") is None
+    assert parse_kmsg_record("6,1,notanumber,-;x") is None
+
+def test_classify_messages():
+    assert classify_message("usb 1-1.2: USB disconnect, device number 4") == "usb_disconnect"
+    assert classify_message("usb 1-1: reset high-speed USB device number 3 using dwc_otg") == "usb_reset"
+    assert classify_message("r820t 1-001a: r820t_write: i2c wr failed=-32") == "rtlsdr"
+    assert classify_message("dvb_usb_rtl28xxu: usb_bulk_msg() failed=-110") == "rtlsdr"
+    assert classify_message("usb 1-1: device descriptor read/64, error -71") == "usb_error"
+    assert classify_message("usb 1-1: new high-speed USB device number 5") is None
+    assert classify_message("eth0: link up") is None
+
+def test_counts_errors_incrementally(tmp_path):
+    path = tmp_path / "kmsg"
+    _append(path, _record(1, "usb 1-1: device descriptor read/64, error -71", 1))
+    _append(path, _record(2, "eth0: link up", 2))
+    clock = FakeClock(10.0)
+    reader = KmsgReader(str(path), window_seconds=60, from_start=True, clock=clock)
+    
+    assert reader.poll() == 1
+    assert reader.records_read == 2
+    
+    # Only records appended since the last poll are read
+    _append(path, _record(5, "usb 1-1.2: USB disconnect, device number 4", 3))
+    _append(path, " SUBSYSTEM=usb\n")
+    _append(path, _record(6, "r820t 1-001a: r820t_write: i2c wr failed=-32", 4))
+    assert reader.poll() == 2
+    assert reader.records_read == 4
+    assert reader.error_count() == 3
+    assert reader.window_counts() == {"usb_error": 1, "usb_disconnect": 1, "rtlsdr": 1}
+    assert reader.error_rate_per_minute() == 3.0
+    reader.close()
+
+def test_partial_record_waits_for_newline(tmp_path):
+    path = tmp_path / "kmsg"
+    line = _record(1, "usb 1-1: reset high-speed USB device number 3", 1)
+    _append(path, line[:20])
+    reader = KmsgReader(str(path), from_start=True, clock=FakeClock(1.0))
+    
+    assert reader.poll() == 0
+    _append(path, line[20:])
+    assert reader.poll() == 1
+    assert reader.window_counts() == {"usb_reset": 1}
+    reader.close()
+
+def test_window_expires_old_errors(tmp_path):
+    path = tmp_path / "kmsg"
+    for seq, seconds in enumerate((100, 150, 290)):
+        _append(path, _record(seconds, "usb 1-1: device descriptor read/64, error -71", seq))
+    clock = FakeClock(300.0)
+    reader = KmsgReader(str(path), window_seconds=180, from_start=True, clock=clock)
+    
+    # 100 s is older than the 180 s window
+    reader.poll()
+    assert reader.error_count() == 2
+    
+    clock.now = 400.0
+    assert reader.error_count() == 1
+    clock.now = 471.0
+    assert reader.error_count() == 0
+    assert reader.window_counts() == {}
+    # Lifetime totals are kept
+    assert reader.totals == {"usb_error": 3}
+    reader.close()
+
+def test_skips_existing_records_by_default(tmp_path):
+    path = tmp_path / "kmsg"
+    _append(path, _record(1, "usb 1-1: device descriptor read/64, error -71", 1))
+    reader = KmsgReader(str(path), clock=FakeClock(2.0))
+    
+    assert reader.poll() == 0
+    _append(path, _record(2, "usb 1-1: device descriptor read/64, error -71", 2))
+    assert reader.poll() == 1
+    reader.close()
+
+def test_missing_log_disables_tracking(tmp_path):
+    reader = KmsgReader(str(tmp_path / "missing"))
+    assert reader.poll() == 0
+    assert not reader.available
@@ -0,0 +1,133 @@
+"""Ogg page CRCs and stitching of generated multi-chunk sessions."""
+import struct
+import pytest
+from backend.app.scanner.ogg import (
+    CRC_OFFSET, FLAG_BOS, FLAG_EOS, OPUS_GRANULE_RATE, build_page, iter_pages, ogg_crc,
+    opus_duration, stitch_files
+)
+
+PRE_SKIP = 312
+# 20 ms Opus packets
+PACKET_GRANULES = 960
+
+def _reference_crc(data: bytes) -> int:
+    """Bit-by-bit Ogg CRC-32 (polynomial 0x04C11DB7, no reflection, zero init)."""
+    crc = 0
+    for byte in data:
+        crc ^= byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+            crc &= 0xFFFFFFFF
+    return crc
+
+def _opus_head() -> bytes:
+    return b"OpusHead" + struct.pack("<BBHIhB", 1, 1, PRE_SKIP, 48000, 0, 0)
+
+def _write_chunk(path, serial: int, audio_pages: int, packets_per_page: int = 3) -> bytes:
+    """Write an Ogg Opus file like one ffmpeg segment: two header pages, then audio."""
+    pages = [
+        build_page(FLAG_BOS, 0, serial, 0, [_opus_head()]),
+        build_page(0, 0, serial, 1, [b"OpusTags" + bytes(8)]),
+    ]
+    granule = 0
+    for i in range(audio_pages):
+        granule += packets_per_page * PACKET_GRANULES
+        header_type = FLAG_EOS if i == audio_pages - 1 else 0
+        packets = [bytes([serial & 0xFF, i, k]) * 40 for k in range(packets_per_page)]
+        pages.append(build_page(header_type, granule, serial, 2 + i, packets))
+    data = b"".join(pages)
+    path.write_bytes(data)
+    return data
+
+def _read_pages(path):
+    with open(path, "rb") as f:
+        return list(iter_pages(f))
+
+def _crc_valid(raw: bytes) -> bool:
+    stored = struct.unpack_from("<I", raw, CRC_OFFSET)[0]
+    page = bytearray(raw)
+    struct.pack_into("<I", page, CRC_OFFSET, 0)
+    return ogg_crc(bytes(page)) == stored
+
+def _assert_single_stream(pages):
+    assert all(_crc_valid(page.raw) for page in pages)
+    assert [page.is_bos for page in pages] == [True] + [False] * (len(pages) - 1)
+    assert [page.is_eos for page in pages] == [False] * (len(pages) - 1) + [True]
+    assert {page.serial for page in pages} == {pages[0].serial}
+    assert [page.sequence for page in pages] == list(range(len(pages)))
+    granules = [page.granule_position for page in pages if page.granule_position != -1]
+    assert granules == sorted(granules)
+
+@pytest.mark.parametrize("data", [b"", b"OggS", bytes(range(256)) * 5])
+def test_ogg_crc_matches_reference(data):
+    assert ogg_crc(data) == _reference_crc(data)
+
+def test_build_page_has_valid_crc():
+    page = build_page(FLAG_BOS, 0, 1234, 0, [_opus_head(), b"x" * 600])
+    assert _crc_valid(page)
+
+def test_stitch_makes_one_logical_stream(tmp_path):
+    sources = [tmp_path / f"chunk{i}.ogg" for i in range(3)]
+    for i, (source, audio_pages) in enumerate(zip(sources, (4, 2, 5))):
+        _write_chunk(source, serial=1000 + i, audio_pages=audio_pages)
+    output = tmp_path / "session.ogg"
+    
+    rewritten = stitch_files(sources, output)
+    
+    pages = _read_pages(output)
+    # Header pages of later chunks are dropped
+    assert len(pages) == 2 + 4 + 2 + 5
+    # The first chunk is copied as-is except its last page
+    assert rewritten == 1 + 2 + 5
+    untouched = b"".join(page.raw for page in _read_pages(sources[0])[:-1])
+    assert output.read_bytes().startswith(untouched)
+    _assert_single_stream(pages)
+    assert pages[0].serial == 1000
+    assert pages[-1].granule_position == (4 + 2 + 5) * 3 * PACKET_GRANULES
+    assert opus_duration(output) == pytest.approx(((4 + 2 + 5) * 3 * PACKET_GRANULES - PRE_SKIP) / OPUS_GRANULE_RATE)
+
+def test_stitch_keeps_pages_without_granule(tmp_path):
+    first, second = tmp_path / "a.ogg", tmp_path / "b.ogg"
+    _write_chunk(first, serial=1, audio_pages=2)
+    pages = [
+        build_page(FLAG_BOS, 0, 2, 0, [_opus_head()]),
+        build_page(0, 0, 2, 1, [b"OpusTags" + bytes(8)]),
+        build_page(0, 2 * PACKET_GRANULES, 2, 2, [b"a" * 100, b"b" * 100]),
+        # A packet continued on the next page: no packet ends here
+        build_page(0, -1, 2, 3, [b"c" * 255]),
+        build_page(FLAG_EOS, 4 * PACKET_GRANULES, 2, 4, [b"d" * 10]),
+    ]
+    second.write_bytes(b"".join(pages))
+    output = tmp_path / "session.ogg"
+    
+    stitch_files([first, second], output)
+    
+    stitched = _read_pages(output)
+    _assert_single_stream(stitched)
+    offset = 2 * 3 * PACKET_GRANULES
+    assert [page.granule_position for page in stitched[-3:]] == [
+        offset + 2 * PACKET_GRANULES, -1, offset + 4 * PACKET_GRANULES
+    ]
+
+def test_stitch_drops_truncated_pages(tmp_path):
+    first, cut, empty = tmp_path / "a.ogg", tmp_path / "b.ogg", tmp_path / "c.ogg"
+    _write_chunk(first, serial=1, audio_pages=3)
+    # The encoder was killed in the middle of the last page
+    data = _write_chunk(cut, serial=2, audio_pages=3)
+    cut.write_bytes(data[:-50])
+    # Killed before a whole page was written
+    empty.write_bytes(data[:20])
+    output = tmp_path / "session.ogg"
+    
+    stitch_files([first, cut, empty], output)
+    
+    pages = _read_pages(output)
+    _assert_single_stream(pages)
+    assert len(pages) == 2 + 3 + 2
+    assert pages[-1].granule_position == (3 + 2) * 3 * PACKET_GRANULES
+
+def test_stitch_without_complete_pages_fails(tmp_path):
+    source = tmp_path / "a.ogg"
+    source.write_bytes(b"OggS\x00")
+    with pytest.raises(ValueError):
+        stitch_files([source], tmp_path / "session.ogg")
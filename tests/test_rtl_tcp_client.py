@@ -0,0 +1,269 @@
+"""RtlTcpClient against a local fake rtl_tcp server serving synthetic IQ."""
+import asyncio
+import struct
+import time
+import numpy as np
+from backend.app.scanner.iq_source import RtlTcpIQSource, iq_from_bytes
+from backend.app.scanner.rtl_tcp_client import (
+    RtlTcpClient, CMD_SET_FREQUENCY, CMD_SET_SAMPLE_RATE, CMD_SET_GAIN_MODE, CMD_SET_GAIN
+)
+
+# Tuner type (R820T) and gain count sent in the fake server's header
+TUNER_TYPE = 5
+GAIN_COUNT = 29
+# Stale bytes the fake server sends after a retune, like a queued USB transfer
+STALE_BYTES = 4096
+STALE_VALUE = 0xFF
+
+class FakeRtlTcpServer:
+    """Serve the RTL0 header, record command packets and send IQ on retune.
+    
+    Data is only sent in response to a frequency command: STALE_BYTES of
+    STALE_VALUE (samples from the old frequency), then burst_bytes of the
+    new frequency as a k % 251 counter, so every byte's origin is known.
+    """
+    
+    def __init__(self):
+        self.commands = []
+        self.burst_bytes = 0
+        self.command_received = asyncio.Event()
+        self._server = None
+    
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+    
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+    
+    async def _handle(self, reader, writer):
+        writer.write(b"RTL0" + struct.pack(">II", TUNER_TYPE, GAIN_COUNT))
+        await writer.drain()
+        try:
+            while True:
+                packet = await reader.readexactly(5)
+                command, param = struct.unpack(">BI", packet)
+                self.commands.append((command, param))
+                self.command_received.set()
+                if command == CMD_SET_FREQUENCY:
+                    writer.write(bytes([STALE_VALUE]) * STALE_BYTES)
+                    writer.write((np.arange(self.burst_bytes) % 251).astype(np.uint8).tobytes())
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+async def _wait_for_commands(server: FakeRtlTcpServer, count: int):
+    while len(server.commands) < count:
+        server.command_received.clear()
+        await asyncio.wait_for(server.command_received.wait(), timeout=2.0)
+
+def test_command_packets():
+    async def run():
+        server = FakeRtlTcpServer()
+        port = await server.start()
+        client = RtlTcpClient("127.0.0.1", port, gain_db=40.0)
+        try:
+            await client.connect()
+            assert (client.tuner_type, client.gain_count) == (TUNER_TYPE, GAIN_COUNT)
+            client.set_sample_rate(240000)
+            client.set_frequency(162550000)
+            client.set_gain(33.8)
+            await _wait_for_commands(server, 6)
+        finally:
+            client.close()
+            await server.close()
+        return server.commands
+    
+    assert asyncio.run(run()) == [
+        (CMD_SET_GAIN_MODE, 1),
+        (CMD_SET_GAIN, 400),
+        (CMD_SET_SAMPLE_RATE, 240000),
+        (CMD_SET_FREQUENCY, 162550000),
+        (CMD_SET_GAIN_MODE, 1),
+        (CMD_SET_GAIN, 338),
+    ]
+
+def test_command_packet_bytes():
+    async def run():
+        server = FakeRtlTcpServer()
+        port = await server.start()
+        client = RtlTcpClient("127.0.0.1", port)
+        try:
+            await client.connect()
+            client.set_frequency(0x1234ABCD)
+            await _wait_for_commands(server, 3)
+        finally:
+            client.close()
+            await server.close()
+        return server.commands[-1]
+    
+    # The server unpacked ">BI": one opcode byte, big-endian uint32 parameter
+    assert asyncio.run(run()) == (CMD_SET_FREQUENCY, 0x1234ABCD)
+
+def test_capture_skips_in_flight_data_across_ring_wrap():
+    sample_rate = 10000
+    async def run():
+        server = FakeRtlTcpServer()
+        port = await server.start()
+        client = RtlTcpClient("127.0.0.1", port, buffer_seconds=1.0,
+                              max_sample_rate=sample_rate, retune_skip_bytes=STALE_BYTES)
+        capacity = client.ring.capacity
+        results = []
+        try:
+            await client.connect()
+            discard = client.retune_discard_bytes
+            assert discard >= STALE_BYTES
+            
+            # First capture ends where the second one's start lands mid-ring
+            first_bytes = (capacity // 2 - 2 * discard) % capacity or capacity
+            second_bytes = capacity * 3 // 4
+            written = 0
+            for freq, nbytes in ((100000000, first_bytes), (101000000, second_bytes)):
+                start = written + discard
+                start -= start % 2
+                # New-frequency bytes the client skips along with the stale ones
+                skipped_fresh = start - written - STALE_BYTES
+                server.burst_bytes = skipped_fresh + nbytes
+                iq = await client.capture(freq, sample_rate, nbytes // 2)
+                wraps = start % capacity + nbytes > capacity
+                results.append((wraps, skipped_fresh, nbytes, iq))
+                written = client.ring.total_written
+        finally:
+            client.close()
+            await server.close()
+        return results
+    
+    results = asyncio.run(run())
+    # The second capture wraps around the end of the ring
+    assert results[1][0]
+    for _, skipped_fresh, nbytes, iq in results:
+        assert iq.dtype == np.uint8
+        assert len(iq) == nbytes
+        # No stale bytes, and exactly the new-frequency samples after the skip
+        expected = (np.arange(skipped_fresh, skipped_fresh + nbytes) % 251).astype(np.uint8)
+        np.testing.assert_array_equal(iq, expected)
+
+async def _start_stream(server: FakeRtlTcpServer, client: RtlTcpClient, sample_rate: int, total_bytes: int):
+    """Connect, then have the next retune answered with total_bytes of fresh IQ.
+    
+    Returns the number of fresh bytes the client skips after the retune.
+    """
+    await client.connect()
+    skipped_fresh = client.retune_discard_bytes - STALE_BYTES
+    server.burst_bytes = skipped_fresh + total_bytes
+    return skipped_fresh
+
+def test_stream_is_contiguous_for_slow_consumer():
+    sample_rate = 240000
+    block_bytes = 4000
+    blocks = 8
+    async def run():
+        server = FakeRtlTcpServer()
+        port = await server.start()
+        client = RtlTcpClient("127.0.0.1", port, max_sample_rate=2400000, retune_skip_bytes=STALE_BYTES)
+        received = []
+        try:
+            skipped_fresh = await _start_stream(server, client, sample_rate, blocks * block_bytes)
+            stream = client.stream(100000000, sample_rate, block_bytes // 2)
+            async for block in stream:
+                received.append(block)
+                if len(received) == blocks:
+                    break
+                # Processing time: data keeps arriving meanwhile
+                await asyncio.sleep(0.02)
+            await stream.aclose()
+        finally:
+            client.close()
+            await server.close()
+        return skipped_fresh, received
+    
+    skipped_fresh, received = asyncio.run(run())
+    assert [len(block) for block in received] == [block_bytes] * blocks
+    expected = (np.arange(skipped_fresh, skipped_fresh + blocks * block_bytes) % 251).astype(np.uint8)
+    np.testing.assert_array_equal(np.concatenate(received), expected)
+
+def test_stream_raises_when_ring_overwrote_next_block():
+    sample_rate = 10000
+    async def run():
+        server = FakeRtlTcpServer()
+        port = await server.start()
+        client = RtlTcpClient("127.0.0.1", port, buffer_seconds=1.0,
+                              max_sample_rate=sample_rate, retune_skip_bytes=STALE_BYTES)
+        capacity = client.ring.capacity
+        try:
+            await _start_stream(server, client, sample_rate, 3 * capacity)
+            stream = client.stream(100000000, sample_rate, 1000)
+            try:
+                # The burst can overrun the ring before even the first block is read
+                await stream.__anext__()
+                # Stall until the ring has wrapped past the next block
+                expected_total = client.retune_discard_bytes + 3 * capacity
+                while client.ring.total_written < expected_total:
+                    await asyncio.sleep(0.01)
+                await stream.__anext__()
+            except ValueError:
+                return True
+            return False
+        finally:
+            client.close()
+            await server.close()
+    
+    assert asyncio.run(run())
+
+def test_stream_stops_when_retuned_elsewhere():
+    async def run():
+        server = FakeRtlTcpServer()
+        port = await server.start()
+        client = RtlTcpClient("127.0.0.1", port, max_sample_rate=240000, retune_skip_bytes=STALE_BYTES)
+        try:
+            await _start_stream(server, client, 240000, 4000)
+            stream = client.stream(100000000, 240000, 1000)
+            await stream.__anext__()
+            client.set_frequency(101000000)
+            try:
+                await stream.__anext__()
+            except ConnectionError:
+                return True
+            return False
+        finally:
+            client.close()
+            await server.close()
+    
+    assert asyncio.run(run())
+
+def test_source_stream_is_contiguous_across_threads():
+    # The channelizer consumes stream_iq on a worker thread and spends time on each block
+    sample_rate = 240000
+    block_samples = 2000
+    blocks = 10
+    async def run():
+        server = FakeRtlTcpServer()
+        port = await server.start()
+        source = RtlTcpIQSource(asyncio.get_running_loop(), "127.0.0.1", port)
+        source.client.retune_skip_bytes = STALE_BYTES
+        try:
+            skipped_fresh = await _start_stream(server, source.client, sample_rate, blocks * block_samples * 2)
+            
+            def consume():
+                received = []
+                stream = source.stream_iq(100000000, sample_rate, block_samples)
+                for iq in stream:
+                    received.append(iq)
+                    if len(received) == blocks:
+                        break
+                    time.sleep(0.02)
+                stream.close()
+                return received
+            
+            received = await asyncio.to_thread(consume)
+        finally:
+            source.client.close()
+            await server.close()
+        return skipped_fresh, received
+    
+    skipped_fresh, received = asyncio.run(run())
+    expected = (np.arange(skipped_fresh, skipped_fresh + blocks * block_samples * 2) % 251).astype(np.uint8)
+    np.testing.assert_array_equal(np.concatenate(received), iq_from_bytes(expected.tobytes()))